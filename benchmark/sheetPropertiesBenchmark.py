@@ -0,0 +1,289 @@
+# sheetPropertiesBenchmark.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+"""
+Benchmark of the discovery and the actions of the SheetProperties Macro
+
+Runs the header search, the data rows ranges search, and the 'Set' and 'Clear' actions
+over synthetic in-memory spreadsheets of various shapes, without FreeCAD. For every
+shape and phase it reports the wall time, the number of calls to the sheet backend
+and the peak memory. The results can be saved as a JSON baseline, and later runs can
+be compared against such a baseline to catch regressions.
+
+Usage:
+    python sheetPropertiesBenchmark.py [--rows N] [--repeat N] [--shape NAME ...]
+                                       [--output baseline.json] [--compare baseline.json]
+                                       [--tolerance 0.25]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from SheetProperties.utils import Utils
+from SheetProperties.sheetsContext import SheetsContext
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+from SheetProperties.requestParameters import RequestParameters
+from SheetProperties.sheetPropertiesActions import SheetPropertiesActions
+
+PHASES = ['snapshot', 'findSheetHeaders', 'findDataRowsRanges',
+          'readAndSetProperties', 'clearProperties']
+
+UNITS_POOL = ['mm', 'deg', 'kg', '10 mm', 'N*m', 'mm/s', 'kg/m^3']
+INVALID_UNITS_POOL = ['bogus', 'mm mm', '10 xx', 'per cent']
+
+class SyntheticSheets:
+    """Generators of synthetic spreadsheets, one static method per shape"""
+
+    @staticmethod
+    def addDataRow(sheet, row, colAlias, colUnits, colValue, alias, units):
+        sheet.setContents(Utils.colNumberToColName(colAlias) + str(row), alias)
+        sheet.setContents(Utils.colNumberToColName(colUnits) + str(row), units)
+        sheet.setContents(Utils.colNumberToColName(colValue) + str(row), '=' + str(row))
+
+    @staticmethod
+    def addHeaders(sheet, row, colAlias, colUnits, colValue):
+        sheet.setContents(Utils.colNumberToColName(colAlias) + str(row), 'Alias')
+        sheet.setContents(Utils.colNumberToColName(colUnits) + str(row), 'Units')
+        sheet.setContents(Utils.colNumberToColName(colValue) + str(row), 'Value')
+
+    @staticmethod
+    def headersTop(rows):
+        """Headers on the first row, followed by dense data rows"""
+        sheet = InMemorySheetBackend('headersTop')
+        SyntheticSheets.addHeaders(sheet, 1, 1, 2, 3)
+        for row in range(2, rows + 2):
+            SyntheticSheets.addDataRow(sheet, row, 1, 2, 3, 'p' + str(row),
+                                       UNITS_POOL[row % len(UNITS_POOL)])
+        return sheet
+
+    @staticmethod
+    def headersBottom(rows):
+        """Headers far down and to the right, below a block of free text"""
+        sheet = InMemorySheetBackend('headersBottom')
+        for row in range(1, 96):
+            for col in range(1, 6):
+                sheet.setContents(Utils.colNumberToColName(col) + str(row),
+                                  'note {0} about the value'.format(row))
+        SyntheticSheets.addHeaders(sheet, 96, 95, 97, 99)
+        for row in range(97, rows + 97):
+            SyntheticSheets.addDataRow(sheet, row, 95, 97, 99, 'p' + str(row),
+                                       UNITS_POOL[row % len(UNITS_POOL)])
+        return sheet
+
+    @staticmethod
+    def sparse(rows):
+        """One data row out of three, with empty rows in between"""
+        sheet = InMemorySheetBackend('sparse')
+        SyntheticSheets.addHeaders(sheet, 1, 2, 3, 4)
+        for row in range(2, rows + 2, 3):
+            SyntheticSheets.addDataRow(sheet, row, 2, 3, 4, 'p' + str(row),
+                                       UNITS_POOL[row % len(UNITS_POOL)])
+        return sheet
+
+    @staticmethod
+    def gapsNearHint(rows):
+        """Short blocks of data rows separated by END_DATA_HINT - 1 empty rows"""
+        sheet = InMemorySheetBackend('gapsNearHint')
+        SyntheticSheets.addHeaders(sheet, 1, 2, 3, 4)
+        blockSize = 10
+        row = 2
+        while row < rows + 2:
+            for blockRow in range(row, row + blockSize):
+                SyntheticSheets.addDataRow(sheet, blockRow, 2, 3, 4, 'p' + str(blockRow),
+                                           UNITS_POOL[blockRow % len(UNITS_POOL)])
+            row += blockSize + RequestParameters.END_DATA_HINT - 1
+        return sheet
+
+    @staticmethod
+    def wide(rows):
+        """Many additional columns of data around the property columns"""
+        sheet = InMemorySheetBackend('wide')
+        SyntheticSheets.addHeaders(sheet, 1, 150, 151, 152)
+        for row in range(2, rows + 2):
+            SyntheticSheets.addDataRow(sheet, row, 150, 151, 152, 'p' + str(row),
+                                       UNITS_POOL[row % len(UNITS_POOL)])
+            for col in range(1, 300, 10):
+                sheet.setContents(Utils.colNumberToColName(col) + str(row), str(col * row))
+        return sheet
+
+    @staticmethod
+    def invalidUnits(rows):
+        """Invalid units and aliases mixed in the data rows"""
+        sheet = InMemorySheetBackend('invalidUnits')
+        SyntheticSheets.addHeaders(sheet, 1, 1, 2, 3)
+        for row in range(2, rows + 2):
+            if row % 3 == 0:
+                units = INVALID_UNITS_POOL[row % len(INVALID_UNITS_POOL)]
+            else:
+                units = UNITS_POOL[row % len(UNITS_POOL)]
+            alias = 'p' + str(row) if row % 7 else 'two words'
+            SyntheticSheets.addDataRow(sheet, row, 1, 2, 3, alias, units)
+        return sheet
+
+    @staticmethod
+    def multiTables(rows):
+        """Four tables, two side by side above two others side by side"""
+        sheet = InMemorySheetBackend('multiTables')
+        tableRows = rows // 4
+        for headersRow in (1, tableRows + 3):
+            for colAlias in (1, 5):
+                SyntheticSheets.addHeaders(sheet, headersRow, colAlias, colAlias + 1,
+                                           colAlias + 2)
+                for row in range(headersRow + 1, headersRow + tableRows + 1):
+                    SyntheticSheets.addDataRow(sheet, row, colAlias, colAlias + 1,
+                                               colAlias + 2, 'p{0}_{1}'.format(colAlias, row),
+                                               UNITS_POOL[row % len(UNITS_POOL)])
+        return sheet
+
+SHAPES = ['headersTop', 'headersBottom', 'sparse', 'gapsNearHint', 'wide', 'invalidUnits',
+          'multiTables']
+
+class Phases:
+    """Runs the benchmarked phases one after the other on a single spreadsheet"""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.context = SheetsContext([sheet])
+        self.requestParams = self.context.sheetToRequestParamsMap[sheet]
+        self.actions = SheetPropertiesActions(self.requestParams)
+
+    def reset(self):
+        """Drops every cached result, so each repetition measures the same work"""
+        self.context.validationCache.clear()
+        self.requestParams.resetAnalysisState()
+        self.sheet.aliases.clear()
+        self.sheet.displayUnits.clear()
+
+    def run(self, phase):
+        requestParams = self.requestParams
+        if phase == 'snapshot':
+            requestParams.snapshot = requestParams.takeSnapshot()
+        elif phase == 'findSheetHeaders':
+            requestParams.findSheetHeaders()
+        elif phase == 'findDataRowsRanges':
+            for table in requestParams.tables:
+                table.initHeadersToColumnMap()
+            requestParams.updateDataRowsRanges()
+        elif phase == 'readAndSetProperties':
+            self.actions.readAndSetTables(requestParams.getTablesRanges())
+        elif phase == 'clearProperties':
+            self.actions.clearTables(requestParams.getTablesRanges())
+
+def runShape(shape, rows, repeat):
+    """Returns {phase: {'Seconds', 'Calls', 'PeakBytes'}} for the given shape"""
+
+    sheet = getattr(SyntheticSheets, shape)(rows)
+    phases = Phases(sheet)
+    results = {phase: {'Seconds': None, 'Calls': {}, 'PeakBytes': 0} for phase in PHASES}
+
+    # the 'Ignoring invalid ...' messages of the actions are not part of the results
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        for iteration in range(repeat + 1):
+            # the last iteration measures the peak memory (tracemalloc slows down the code)
+            measureMemory = iteration == repeat
+            phases.reset()
+            for phase in PHASES:
+                callCountsBefore = dict(sheet.callCounts)
+                if measureMemory:
+                    tracemalloc.start()
+                startTime = time.perf_counter()
+                phases.run(phase)
+                elapsed = time.perf_counter() - startTime
+                if measureMemory:
+                    results[phase]['PeakBytes'] = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    continue
+
+                # keep the best time of all the repetitions
+                if results[phase]['Seconds'] is None or elapsed < results[phase]['Seconds']:
+                    results[phase]['Seconds'] = elapsed
+                results[phase]['Calls'] = {
+                    name: count - callCountsBefore.get(name, 0)
+                    for name, count in sheet.callCounts.items()
+                    if count != callCountsBefore.get(name, 0)}
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return results
+
+def compareResults(results, baseline, tolerance):
+    """
+    Returns the list of regressions of the results compared to a baseline
+
+    A regression is a phase taking more than (1 + tolerance) times its baseline wall time,
+    or making more calls of any kind to the sheet backend than in the baseline.
+    """
+    regressions = []
+    if baseline.get('Rows') != results['Rows']:
+        regressions.append('Baseline was measured with {0} rows, not {1}'.format(
+            baseline.get('Rows'), results['Rows']))
+        return regressions
+
+    for shape, shapeResults in results['Shapes'].items():
+        baselineShape = baseline['Shapes'].get(shape)
+        if baselineShape is None:
+            continue
+        for phase, phaseResults in shapeResults.items():
+            baselinePhase = baselineShape.get(phase)
+            if baselinePhase is None:
+                continue
+            if phaseResults['Seconds'] > baselinePhase['Seconds'] * (1 + tolerance):
+                regressions.append('{0}/{1}: {2:.4f}s instead of {3:.4f}s'.format(
+                    shape, phase, phaseResults['Seconds'], baselinePhase['Seconds']))
+            for name, count in phaseResults['Calls'].items():
+                baselineCount = baselinePhase['Calls'].get(name, 0)
+                if count > baselineCount:
+                    regressions.append('{0}/{1}: {2} {3}() calls instead of {4}'.format(
+                        shape, phase, count, name, baselineCount))
+
+    return regressions
+
+def main():
+    """Entry point"""
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000,
+                        help='number of data rows of each synthetic sheet')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of timed repetitions (the best time is kept)')
+    parser.add_argument('--shape', action='append', choices=SHAPES, dest='shapes',
+                        help='shape to run (default: all the shapes)')
+    parser.add_argument('--output', metavar='PATH', help='save the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results to a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative wall time increase when comparing')
+    args = parser.parse_args()
+
+    results = {'Rows': args.rows, 'Shapes': {}}
+    for shape in args.shapes or SHAPES:
+        results['Shapes'][shape] = runShape(shape, args.rows, args.repeat)
+        for phase in PHASES:
+            phaseResults = results['Shapes'][shape][phase]
+            print('{0:<14} {1:<22} {2:>9.4f}s {3:>10} calls {4:>10} bytes'.format(
+                shape, phase, phaseResults['Seconds'],
+                sum(phaseResults['Calls'].values()), phaseResults['PeakBytes']))
+
+    if args.output:
+        with open(args.output, 'w') as outputFile:
+            json.dump(results, outputFile, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, 'r') as baselineFile:
+            regressions = compareResults(results, json.load(baselineFile), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: ' + regression)
+        return 1 if regressions else 0
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,71 +1,86 @@
 # activeDocumentSheets.py
 # LGPL license; Copyright (C) 2018 Uri Benchetrit
 
+import os
 import FreeCAD as App
-import FreeCADGui
 import Spreadsheet
+if App.GuiUp:
+    # not available when running headless (e.g., FreeCADCmd)
+    import FreeCADGui
 from .utils import Utils
-from .requestParameters import RequestParameters
+from .sheetsContext import SheetsContext
+from .freeCADSheetBackend import FreeCADSheetBackend
+from .analysisCache import AnalysisCache
+from .callProfiler import CallProfiler
 from .preconditionError import PreconditionError
 
-class ActiveDocumentSheets:
+class ActiveDocumentSheets(SheetsContext):
     """
     Context of this script. Common to all sheets.
 
+    The context is bound to the active document by default, or to the given document
+    (e.g., a document opened by BatchRunner when running headless).
+    The spreadsheets are accessed through FreeCADSheetBackend adapters, and their
+    analysis results are cached across invocations (see SheetsContext for the
+    common attributes).
+
+    Profiling of the sheets calls is enabled by the 'Profiling' boolean parameter under
+    PARAMETERS_PATH (e.g., set with Tools > Edit parameters), or by providing a profiler.
+
     Attributes:
-        HEADER_UNITS                -- constant string defining the expected string for this header
-        HEADER_ALIAS                -- constant string defining the expected string for this header
-        HEADER_VALUE                -- constant string defining the expected string for this header
-        sheetToRequestParamsMap     -- maps spreadsheet reference to request params reference
-        sheetLabelToSheetMap        -- maps spreadsheet label to spreadsheet reference
-        headerToFunctionsMap        -- maps headers to respective setting and validation functions
+        PARAMETERS_PATH             -- path of the parameters group of this Macro
+        activeDocument              -- the document this context is bound to
         getSheets()                 -- returns all the spreadsheet included in the active document
         getSelectedSheet()          -- returns the spreadsheet found in the active document
+                                       (always None when running headless)
     """
 
-    # Constants
-    HEADER_UNITS = 'Units'
-    HEADER_ALIAS = 'Alias'
-    HEADER_VALUE = 'Value'
-
-    # Useful maps
-    sheetToRequestParamsMap = {}
-    sheetLabelToSheetMap = {}
-    # for each cell property data header associate a tuple in the format of:
-    #   Header name: (setting method name, validation method name)
-    # it is assumed that the setting methods belong to a 'Spreadsheet::Sheet' object,
-    # and the validation method belong to a 'RequestParameters' object.
-    headerToFunctionsMap = {HEADER_UNITS: ('setDisplayUnit', 'validateUnits'),
-                            HEADER_ALIAS: ('setAlias', 'validateAlias')}
-
-    def __init__(self):
+    PARAMETERS_PATH = 'User parameter:BaseApp/Preferences/Macros/SheetProperties'
+
+    def __init__(self, document=None, profiler=None):
+        if document is None:
+            document = App.ActiveDocument
+
         # Check preconditions
-        if App.ActiveDocument is None:
+        if document is None:
             raise PreconditionError('There is no active document')
 
-        self.activeDocument = App.ActiveDocument
+        self.activeDocument = document
 
         sheets = self.getSheets()
         if Utils.isEmpty(sheets):
             raise PreconditionError('No spreadsheets were found in the active document')
 
-        # Initialize useful maps
-        for sheet in sheets:
-            # Associate an instance of RequestParameters to each known sheet.
-            # This way, the request parameters can be cached for each sheet.
-            self.sheetToRequestParamsMap.update({sheet: RequestParameters(sheet, self)})
-            self.sheetLabelToSheetMap.update({sheet.Label: sheet})
+        # The analysis results of unchanged sheets are reused across invocations
+        # (the cache is dropped when FreeCAD is upgraded, as validation may differ)
+        cacheFilePath = os.path.join(App.getUserAppDataDir(), 'SheetProperties',
+                                     'analysisCache.json')
+        compatibilityTag = 'FreeCAD ' + '.'.join(App.Version()[0:3])
+
+        if profiler is None and App.ParamGet(self.PARAMETERS_PATH).GetBool('Profiling', False):
+            profiler = CallProfiler()
+
+        super(ActiveDocumentSheets, self).__init__(
+            sheets, AnalysisCache(cacheFilePath, compatibilityTag), profiler)
 
     def getSheets(self):
         """Returns the spreadsheet found in the active document"""
 
-        return App.ActiveDocument.findObjects('Spreadsheet::Sheet')
+        return self.activeDocument.findObjects('Spreadsheet::Sheet')
+
+    def createSheetBackend(self, sheet):
+        """Returns a FreeCADSheetBackend adapter of the given spreadsheet"""
+
+        return FreeCADSheetBackend(sheet)
 
     def getSelectedSheet(self):
         """Returns the first selected spreadsheet in the active document tree view"""
 
         result = None
 
+        if not App.GuiUp:
+            return result
+
         sel = FreeCADGui.Selection.getSelection()
         # Note: getSelection() returns an empty list if the selected object
         #       does not belong to the active document
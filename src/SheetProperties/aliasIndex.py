@@ -0,0 +1,115 @@
+# aliasIndex.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+class AliasIndex:
+    """
+    Index of the aliases claimed by the target cells of the spreadsheets.
+
+    A target cell claims the alias of its row in the Alias column. The claims of a
+    spreadsheet are replaced whenever the spreadsheet is analyzed or refreshed.
+    An alias claimed by more than one target cell of the same spreadsheet is a conflict.
+    The same alias in different spreadsheets is not (the expressions of FreeCAD refer to
+    it as 'sheet.alias').
+
+    Attributes:
+        sheetClaims                 -- dictionary of {sheet label : {cell location : alias}}
+                                       pairs, holding the claims of each spreadsheet
+        aliasOwners                 -- dictionary of {(sheet label, alias) : set of cell
+                                       locations} pairs, holding the claiming cells
+                                       of each alias of each spreadsheet
+        conflictingAliases          -- set of the (sheet label, alias) claimed by more
+                                       than one cell
+        setSheetClaims()            -- replaces all the claims of a spreadsheet
+        claim()                     -- records the claim of a cell
+        release()                   -- drops the claim of a cell
+        isClaimedByOther()          -- checks if an alias is claimed by another cell
+        getOwners()                 -- returns the cells claiming an alias
+        getConflicts()              -- returns the conflicting aliases and their owners
+    """
+
+    def __init__(self):
+        self.sheetClaims = {}
+        self.aliasOwners = {}
+        self.conflictingAliases = set()
+
+    def setSheetClaims(self, sheetLabel, claims):
+        """
+        Replaces all the claims of a spreadsheet
+
+        Args:
+            :param sheetLabel (str): The label of the spreadsheet
+            :param claims (dict): Dictionary of {cell location : alias} pairs
+        """
+        for cellLoc in list(self.sheetClaims.get(sheetLabel, {})):
+            self.release(sheetLabel, cellLoc)
+
+        for cellLoc, alias in claims.items():
+            self.claim(sheetLabel, cellLoc, alias)
+
+    def claim(self, sheetLabel, cellLoc, alias):
+        """Records the claim of an alias by a cell, replacing the previous claim of the cell"""
+        cellClaims = self.sheetClaims.setdefault(sheetLabel, {})
+        if cellClaims.get(cellLoc) == alias:
+            return
+        if cellLoc in cellClaims:
+            self.release(sheetLabel, cellLoc)
+
+        cellClaims[cellLoc] = alias
+        owners = self.aliasOwners.setdefault((sheetLabel, alias), set())
+        owners.add(cellLoc)
+        if len(owners) > 1:
+            self.conflictingAliases.add((sheetLabel, alias))
+
+    def release(self, sheetLabel, cellLoc):
+        """Drops the claim of a cell, if any"""
+        alias = self.sheetClaims.get(sheetLabel, {}).pop(cellLoc, None)
+        if alias is None:
+            return
+
+        key = (sheetLabel, alias)
+        owners = self.aliasOwners[key]
+        owners.discard(cellLoc)
+        if len(owners) < 2:
+            self.conflictingAliases.discard(key)
+        if not owners:
+            del self.aliasOwners[key]
+
+    def isClaimedByOther(self, alias, sheetLabel, cellLoc):
+        """
+        Checks if an alias is claimed by any cell of the same spreadsheet other than the
+        given one
+
+        Args:
+            :param alias (str): The alias
+            :param sheetLabel (str): The label of the spreadsheet of the cell
+            :param cellLoc (str): The location of the cell (e.g., 'C7')
+
+        Returns:
+            :return (bool): True if another cell claims the alias, False otherwise.
+        """
+        owners = self.aliasOwners.get((sheetLabel, alias))
+        if not owners:
+            return False
+
+        return len(owners) > 1 or cellLoc not in owners
+
+    def getOwners(self, alias, sheetLabel):
+        """
+        Returns the cells of a spreadsheet claiming an alias, as sorted
+        'sheet label.cell location' strings
+        """
+        return sorted('{0}.{1}'.format(sheetLabel, cellLoc)
+                      for cellLoc in self.aliasOwners.get((sheetLabel, alias), ()))
+
+    def getConflicts(self, sheetLabel):
+        """
+        Returns the conflicting aliases of a spreadsheet
+
+        Args:
+            :param sheetLabel (str): The label of the spreadsheet
+
+        Returns:
+            :return (dict): Dictionary of {alias : owners (see getOwners())} pairs
+        """
+        return {alias: self.getOwners(alias, sheetLabel)
+                for ownerLabel, alias in self.conflictingAliases if ownerLabel == sheetLabel}
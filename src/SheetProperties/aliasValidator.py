@@ -0,0 +1,75 @@
+# aliasValidator.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import re
+from .unitSymbols import UnitSymbols
+
+class AliasValidator:
+    """
+    Validates cell aliases with the rules of the spreadsheets of FreeCAD, without
+    calling FreeCAD.
+
+    An alias is valid if it:
+        - is an identifier: a letter followed by letters, digits or underscores.
+        - is not a cell address (e.g., 'A1', 'AB12'), which the expressions would read
+          as a reference to that cell.
+        - is not a reserved name (i.e., a unit symbol or a constant, see UnitSymbols).
+
+    The patterns are compiled once, and a whole column of aliases is validated in a
+    single call (see validateColumn()).
+
+    Attributes:
+        IDENTIFIER_PATTERN          -- compiled pattern of the valid identifiers
+        CELL_ADDRESS_PATTERN        -- compiled pattern of the cell addresses
+        getInvalidReason()          -- returns why an alias is invalid
+        isValid()                   -- checks if an alias is valid
+        validateColumn()            -- returns the validity of each alias of a column
+    """
+
+    IDENTIFIER_PATTERN = re.compile(r'[A-Za-z][_A-Za-z0-9]*\Z')
+    # the columns of FreeCAD are named by up to 2 upper case letters. any row number
+    # is read as a cell address by the expressions
+    CELL_ADDRESS_PATTERN = re.compile(r'[A-Z]{1,2}[0-9]+\Z')
+
+    @classmethod
+    def getInvalidReason(cls, alias):
+        """
+        Returns why an alias is invalid
+
+        Args:
+            :param alias (str): The candidate alias
+
+        Returns:
+            :return (str): The reason, or None if the alias is valid
+        """
+        if not cls.IDENTIFIER_PATTERN.match(alias):
+            return 'not an identifier'
+        if cls.CELL_ADDRESS_PATTERN.match(alias):
+            return 'a cell address'
+        if alias in UnitSymbols.RESERVED_NAMES:
+            return 'a reserved name'
+
+        return None
+
+    @classmethod
+    def isValid(cls, alias):
+        """Checks if an alias is valid (see getInvalidReason())"""
+        return cls.getInvalidReason(alias) is None
+
+    @classmethod
+    def validateColumn(cls, aliases):
+        """
+        Returns the validity of each alias of a column
+
+        Args:
+            :param aliases (list): The candidate aliases
+
+        Returns:
+            :return (list): True for each valid alias, False for each invalid one
+        """
+        identifierMatch = cls.IDENTIFIER_PATTERN.match
+        cellAddressMatch = cls.CELL_ADDRESS_PATTERN.match
+        reservedNames = UnitSymbols.RESERVED_NAMES
+
+        return [identifierMatch(alias) is not None and cellAddressMatch(alias) is None and
+                alias not in reservedNames for alias in aliases]
@@ -0,0 +1,127 @@
+# analysisCache.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import os
+import json
+import tempfile
+from collections import OrderedDict
+
+class AnalysisCache:
+    """
+    Persistent cache of the analysis results of spreadsheets (e.g., headers location,
+    data rows ranges), surviving across invocations of this Macro.
+
+    Each entry is keyed by the cache key of the spreadsheet (see SheetBackend), and is
+    validated by a fingerprint of the non-empty cells of the spreadsheet. An entry whose
+    fingerprint does not match the current content of the spreadsheet is ignored.
+    The least recently used entries are evicted when the cache is full.
+
+    The stored entries are saved once per session or batch (see save()), not on every
+    put(). The cache file is replaced atomically, so a reader never sees a partially
+    written file, and concurrent writers (e.g., parallel batch workers) only lose
+    each other's entries.
+
+    Attributes:
+        cacheFilePath           -- path of the JSON file holding the cache
+                                   (None for a cache that is not persisted)
+        compatibilityTag        -- identifies the environment in which the results are
+                                   valid. cache files of other environments are ignored
+        entries                 -- ordered dictionary of {key : entry} pairs,
+                                   from the least to the most recently used
+        isDirty                 -- True if entries were stored since the last save
+        get()                   -- returns the cached analysis state of a spreadsheet
+        put()                   -- stores the analysis state of a spreadsheet
+        save()                  -- saves the cache file, if entries were stored
+    """
+
+    # bump this version whenever the format of the cached analysis state changes
+    CACHE_FORMAT_VERSION = 6
+    MAX_ENTRIES = 256
+
+    def __init__(self, cacheFilePath=None, compatibilityTag=''):
+        self.cacheFilePath = cacheFilePath
+        self.compatibilityTag = compatibilityTag
+        self.entries = OrderedDict()
+        self.isDirty = False
+        self.load()
+
+    def getHeader(self):
+        """Returns the header identifying compatible cache files"""
+        return {'Version': self.CACHE_FORMAT_VERSION,
+                'Compatibility': self.compatibilityTag}
+
+    def load(self):
+        """Loads the cache file. A missing, corrupted or incompatible file is ignored."""
+        if self.cacheFilePath is None:
+            return
+
+        try:
+            with open(self.cacheFilePath, 'r') as cacheFile:
+                content = json.load(cacheFile)
+        except (IOError, ValueError):
+            return
+
+        if not isinstance(content, dict) or content.get('Header') != self.getHeader():
+            return
+
+        for key, entry in content.get('Entries', []):
+            self.entries[key] = entry
+
+    def save(self):
+        """
+        Saves the cache file, if entries were stored since the last save. The content is
+        written to a temporary file that then replaces the cache file. Failing to save
+        the cache is not an error.
+        """
+        if self.cacheFilePath is None or not self.isDirty:
+            return
+
+        content = {'Header': self.getHeader(), 'Entries': list(self.entries.items())}
+        tempFilePath = None
+        try:
+            cacheDir = os.path.dirname(self.cacheFilePath)
+            if cacheDir != '' and not os.path.isdir(cacheDir):
+                os.makedirs(cacheDir)
+            tempFileHandle, tempFilePath = tempfile.mkstemp(dir=cacheDir or None,
+                                                            suffix='.tmp')
+            with os.fdopen(tempFileHandle, 'w') as cacheFile:
+                json.dump(content, cacheFile)
+            os.replace(tempFilePath, self.cacheFilePath)
+            tempFilePath = None
+            self.isDirty = False
+        except (IOError, OSError) as e:
+            print('AnalysisCache: Failed to save \'{0}\' ({1})'.format(self.cacheFilePath, e))
+        finally:
+            if tempFilePath is not None and os.path.exists(tempFilePath):
+                os.remove(tempFilePath)
+
+    def get(self, key, fingerprint):
+        """
+        Returns the cached analysis state of a spreadsheet
+
+        Args:
+            :param key (str): Cache key of the spreadsheet (see SheetBackend.getCacheKey())
+            :param fingerprint (str): Fingerprint of the current content of the spreadsheet
+
+        Returns:
+            :return (dict): The cached analysis state, or None if not found or outdated
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry['Fingerprint'] != fingerprint:
+            return None
+
+        # mark the entry as the most recently used one
+        self.entries.move_to_end(key)
+
+        return entry['State']
+
+    def put(self, key, fingerprint, state):
+        """Stores the analysis state of a spreadsheet (saved by the next save())"""
+        self.entries[key] = {'Fingerprint': fingerprint, 'State': state}
+        self.entries.move_to_end(key)
+
+        # evict the least recently used entries
+        while len(self.entries) > self.MAX_ENTRIES:
+            self.entries.popitem(last=False)
+
+        self.isDirty = True
@@ -0,0 +1,48 @@
+# batchResults.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from .sheetPropertiesActions import SheetPropertiesActions
+
+class BatchResults:
+    """
+    Results of an action performed on many documents, shared by the sequential batch
+    mode (see BatchRunner) and the parallel one (see ParallelBatchDriver).
+
+    This class does not depend on FreeCAD.
+
+    Attributes:
+        STATUS_DONE             -- status of a document or a sheet processed successfully
+        STATUS_SKIPPED          -- status of a document or a sheet not meeting the
+                                   preconditions of the action
+        STATUS_ERROR            -- status of a document that could not be processed
+        composeResults()        -- composes the results of a batch from those of its documents
+    """
+
+    STATUS_DONE = 'done'
+    STATUS_SKIPPED = 'skipped'
+    STATUS_ERROR = 'error'
+
+    @staticmethod
+    def composeResults(action, documentsResults):
+        """
+        Composes the results of a batch from the results of its documents
+
+        Args:
+            :param action (str): The action performed (e.g., 'set', 'clear')
+            :param documentsResults (list): The results of each document
+                (see BatchRunner.processFile())
+
+        Returns:
+            :return (dict): {'Action', 'Documents', 'Errors', 'Totals'}, where 'Errors' is
+                            the number of documents that could not be processed, and
+                            'Totals' the totals of the summaries of all their sheets
+        """
+        summaries = [sheetResults['Summary']
+                     for documentResults in documentsResults
+                     for sheetResults in documentResults['Sheets']]
+
+        return {'Action': action,
+                'Documents': documentsResults,
+                'Errors': len([documentResults for documentResults in documentsResults
+                               if documentResults['Status'] == BatchResults.STATUS_ERROR]),
+                'Totals': SheetPropertiesActions.mergeSummaries(summaries)}
@@ -0,0 +1,166 @@
+# batchRunner.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import FreeCAD as App
+from .utils import Utils
+from .activeDocumentSheets import ActiveDocumentSheets
+from .sheetPropertiesActions import SheetPropertiesActions
+from .changePlan import ChangePlan
+from .batchResults import BatchResults
+from .preconditionError import PreconditionError
+
+class BatchRunner:
+    """
+    Performs an action (i.e., set or clear) on the properties of all the spreadsheets
+    of many documents, without a GUI (e.g., from FreeCADCmd).
+
+    Each document is opened, all its spreadsheets are analyzed and the action is
+    performed on the discovered data rows ranges of every usable spreadsheet.
+    Changed documents are saved and all the documents are closed.
+
+    In a dry run, the documents are not changed. The changes the action would make
+    are reported instead (see ChangePlan), in the 'Changes' of the results of each
+    document.
+
+    Attributes:
+        action                  -- the action to perform (ACTION_SET or ACTION_CLEAR)
+        save                    -- when True, changed documents are saved
+        dryRun                  -- when True, the changes are planned but not made
+        run()                   -- processes a list of document files and returns the results
+        processFile()           -- processes a single document file and returns its results
+        processDocument()       -- processes an already opened document
+    """
+
+    ACTION_SET = 'set'
+    ACTION_CLEAR = 'clear'
+    ACTIONS = [ACTION_SET, ACTION_CLEAR]
+
+    # status values reported in the results
+    STATUS_DONE = BatchResults.STATUS_DONE
+    STATUS_SKIPPED = BatchResults.STATUS_SKIPPED
+    STATUS_ERROR = BatchResults.STATUS_ERROR
+
+    def __init__(self, action, save=True, dryRun=False):
+        if action not in self.ACTIONS:
+            raise PreconditionError('Unknown action: ' + str(action))
+
+        self.action = action
+        self.save = save
+        self.dryRun = dryRun
+
+    def run(self, filePaths):
+        """
+        Processes the given document files one after the other
+
+        Returns:
+            :return (dict): The results of all the documents (see processFile()),
+                            and the totals of the summaries of all their sheets
+                            (see BatchResults.composeResults())
+        """
+        documentsResults = [self.processFile(filePath) for filePath in filePaths]
+
+        return BatchResults.composeResults(self.action, documentsResults)
+
+    def processFile(self, filePath):
+        """
+        Opens, processes, saves (if changed) and closes a document file
+
+        Returns:
+            :return (dict): {'File', 'Status', 'Reason', 'Saved', 'Sheets', 'Changes'}, where
+                            'Sheets' holds the results of each spreadsheet (see
+                            processDocument()), and 'Changes' the planned changes of a
+                            dry run (see ChangePlan)
+        """
+        result = {'File': filePath, 'Status': self.STATUS_DONE, 'Reason': '',
+                  'Saved': False, 'Sheets': [], 'Changes': []}
+
+        try:
+            document = App.openDocument(filePath)
+        except (IOError, OSError, RuntimeError, ValueError) as e:
+            result['Status'] = self.STATUS_ERROR
+            result['Reason'] = 'Failed to open the document ({0})'.format(e)
+            return result
+
+        try:
+            changePlan = ChangePlan(filePath) if self.dryRun else None
+            result['Sheets'] = self.processDocument(document, changePlan)
+            if changePlan is not None:
+                result['Changes'] = changePlan.changes
+            changed = not self.dryRun and \
+                any(sheetResults['Summary'][SheetPropertiesActions.SUMMARY_SET] or
+                    sheetResults['Summary'][SheetPropertiesActions.SUMMARY_CLEARED]
+                    for sheetResults in result['Sheets'])
+            if changed and self.save:
+                document.save()
+                result['Saved'] = True
+        except PreconditionError as e:
+            result['Status'] = self.STATUS_SKIPPED
+            result['Reason'] = e.reason
+        except Exception as e:  # pylint: disable=broad-except
+            # one broken document must not stop the whole batch
+            result['Status'] = self.STATUS_ERROR
+            result['Reason'] = '{0}: {1}'.format(type(e).__name__, e)
+        finally:
+            App.closeDocument(document.Name)
+
+        return result
+
+    def processDocument(self, document, changePlan=None):
+        """
+        Performs the action on all the usable spreadsheets of the given document
+
+        Args:
+            :param document (App.Document): The document
+            :param changePlan (ChangePlan): Receives the planned changes of a dry run
+                (None to perform the action)
+
+        Returns:
+            :return (list): For each spreadsheet {'Sheet', 'Status', 'Reason', 'Summary',
+                            'AliasConflicts'}, the latter holding the aliases of the
+                            spreadsheet claimed by several of its cells
+                            (see AliasIndex.getConflicts())
+        """
+        context = ActiveDocumentSheets(document)
+
+        sheetsResults = []
+        for sheet in context.getSheets():
+            requestParams = context.sheetToRequestParamsMap[sheet]
+            sheetResults = {'Sheet': sheet.Label, 'Status': self.STATUS_DONE, 'Reason': '',
+                            'Summary': SheetPropertiesActions.newSummary()}
+            sheetsResults.append(sheetResults)
+
+            # same preconditions as for the actions of the form (i.e., 'Auto' rows range)
+            if not requestParams.hasValidHeaders:
+                sheetResults['Status'] = self.STATUS_SKIPPED
+                sheetResults['Reason'] = requestParams.invalidHeadersReason
+                continue
+            tablesRanges = requestParams.getTablesRanges()
+            if Utils.isEmpty(tablesRanges):
+                sheetResults['Status'] = self.STATUS_SKIPPED
+                sheetResults['Reason'] = requestParams.invalidPropertiesDataReason.strip()
+                continue
+
+            sheetPropertyActions = SheetPropertiesActions(requestParams)
+            if changePlan is not None:
+                # the summary of a dry run counts the planned changes of the sheet
+                sheetPlan = ChangePlan(changePlan.fileName)
+                if self.action == self.ACTION_SET:
+                    sheetPropertyActions.planReadAndSetTables(tablesRanges, sheetPlan)
+                else:
+                    sheetPropertyActions.planClearTables(tablesRanges, sheetPlan)
+                planSummary = sheetPlan.getSummary()
+                sheetResults['Summary'] = {key: planSummary[key] for key in sheetResults['Summary']}
+                changePlan.changes.extend(sheetPlan.changes)
+            elif self.action == self.ACTION_SET:
+                sheetResults['Summary'] = sheetPropertyActions.readAndSetTables(tablesRanges)
+            else:
+                sheetResults['Summary'] = sheetPropertyActions.clearTables(tablesRanges)
+
+        # the alias index covers all the sheets once they were all analyzed
+        for sheetResults in sheetsResults:
+            sheetResults['AliasConflicts'] = context.aliasIndex.getConflicts(sheetResults['Sheet'])
+
+        # the analysis results of the document are saved once, after all its sheets
+        context.analysisCache.save()
+
+        return sheetsResults
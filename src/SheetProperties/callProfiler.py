@@ -0,0 +1,168 @@
+# callProfiler.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import time
+import heapq
+from contextlib import contextmanager
+
+class CallProfiler:
+    """
+    Opt-in recorder of the calls to the sheet backend and to the validation functions.
+
+    The calls are attributed to the current phase (e.g., header search, set), and for
+    each phase and call name the profiler records the number of calls, their cumulative
+    time and the slowest calls. Calls made outside of any phase are attributed to
+    PHASE_OTHER.
+
+    Attributes:
+        PHASE_SNAPSHOT              -- phase name of reading the cells of a sheet
+        PHASE_HEADER_SEARCH         -- phase name of searching the headers
+        PHASE_RANGE_DISCOVERY       -- phase name of searching the data rows ranges
+        PHASE_SET                   -- phase name of the 'Set' action
+        PHASE_CLEAR                 -- phase name of the 'Clear' action
+        PHASE_RECOMPUTE             -- phase name of recomputing the document after an action
+        PHASE_OTHER                 -- phase name of the calls made outside of any phase
+        PHASES                      -- all the phase names, in the order they are reported
+        currentPhase                -- name of the current phase
+        stats                       -- dictionary of {phase name : {call name : call stats}}
+                                       pairs. call stats is a dictionary having 'Count',
+                                       'Seconds' and 'Slowest' keys
+        phase()                     -- context manager attributing the calls to a phase
+        call()                      -- calls a function and records the call
+        wrap()                      -- returns a recording wrapper of a function
+        getSummary()                -- returns the recorded stats as a JSON compatible dictionary
+        formatSummary()             -- returns the recorded stats as lines of text
+        reset()                     -- drops the recorded stats
+    """
+
+    PHASE_SNAPSHOT = 'Snapshot'
+    PHASE_HEADER_SEARCH = 'Header search'
+    PHASE_RANGE_DISCOVERY = 'Range discovery'
+    PHASE_SET = 'Set'
+    PHASE_CLEAR = 'Clear'
+    PHASE_RECOMPUTE = 'Recompute'
+    PHASE_OTHER = 'Other'
+    PHASES = [PHASE_SNAPSHOT, PHASE_HEADER_SEARCH, PHASE_RANGE_DISCOVERY,
+              PHASE_SET, PHASE_CLEAR, PHASE_RECOMPUTE, PHASE_OTHER]
+
+    SLOWEST_CALLS = 3       # number of slowest calls kept per phase and call name
+
+    def __init__(self):
+        self.currentPhase = self.PHASE_OTHER
+        self.stats = {}
+
+    @contextmanager
+    def phase(self, phaseName):
+        """Attributes the calls made inside the 'with' block to the given phase"""
+        previousPhase = self.currentPhase
+        self.currentPhase = phaseName
+        try:
+            yield
+        finally:
+            self.currentPhase = previousPhase
+
+    def record(self, callName, seconds, argument):
+        """
+        Records a single call in the current phase
+
+        Args:
+            :param callName (str): The name of the called function
+            :param seconds (float): The duration of the call
+            :param argument (str): The first argument of the call (e.g., a cell location),
+                shown next to the slowest calls
+        """
+        phaseStats = self.stats.setdefault(self.currentPhase, {})
+        callStats = phaseStats.get(callName)
+        if callStats is None:
+            callStats = {'Count': 0, 'Seconds': 0.0, 'Slowest': []}
+            phaseStats[callName] = callStats
+
+        callStats['Count'] += 1
+        callStats['Seconds'] += seconds
+
+        # keep the slowest calls in a min-heap of bounded size
+        slowest = callStats['Slowest']
+        if len(slowest) < self.SLOWEST_CALLS:
+            heapq.heappush(slowest, (seconds, argument))
+        elif seconds > slowest[0][0]:
+            heapq.heapreplace(slowest, (seconds, argument))
+
+    def call(self, callName, func, *args):
+        """
+        Calls the given function and records the call under the given name
+
+        Args:
+            :param callName (str): The name under which the call is recorded
+            :param func (function): The called function
+            :param args: The arguments of the call
+
+        Returns:
+            :return: The result of the call
+        """
+        startTime = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.record(callName, time.perf_counter() - startTime,
+                        str(args[0]) if args else '')
+
+    def wrap(self, callName, func):
+        """
+        Returns a wrapper of the given function recording each call under the given name
+
+        Args:
+            :param callName (str): The name under which the calls are recorded
+            :param func (function): The wrapped function
+
+        Returns:
+            :return (function): The recording wrapper
+        """
+        def recordingFunc(*args):
+            return self.call(callName, func, *args)
+
+        return recordingFunc
+
+    def getSummary(self):
+        """
+        Returns the recorded stats as a JSON compatible dictionary
+
+        Returns:
+            :return (dict): Dictionary of {phase name : {call name : call stats}} pairs,
+                where the slowest calls are listed from the slowest one as
+                [seconds, argument] pairs
+        """
+        summary = {}
+        for phaseName, phaseStats in self.stats.items():
+            summary[phaseName] = {}
+            for callName, callStats in phaseStats.items():
+                summary[phaseName][callName] = {
+                    'Count': callStats['Count'],
+                    'Seconds': callStats['Seconds'],
+                    'Slowest': [list(call) for call in
+                                sorted(callStats['Slowest'], reverse=True)]}
+
+        return summary
+
+    def formatSummary(self):
+        """Returns the recorded stats as lines of text, one line per phase and call name"""
+        lines = []
+        for phaseName in self.PHASES:
+            phaseStats = self.stats.get(phaseName)
+            if phaseStats is None:
+                continue
+            lines.append(phaseName + ':')
+            # list the most time consuming calls first
+            for callName, callStats in sorted(phaseStats.items(),
+                                              key=lambda item: item[1]['Seconds'],
+                                              reverse=True):
+                slowest = ', '.join('{0} {1:.1f}ms'.format(argument, seconds * 1000)
+                                    for seconds, argument in
+                                    sorted(callStats['Slowest'], reverse=True))
+                lines.append('\t{0}: {1} calls, {2:.3f}s (slowest: {3})'.format(
+                    callName, callStats['Count'], callStats['Seconds'], slowest))
+
+        return lines
+
+    def reset(self):
+        """Drops the recorded stats"""
+        self.stats = {}
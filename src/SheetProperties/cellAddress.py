@@ -0,0 +1,140 @@
+# cellAddress.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import string
+from collections import namedtuple
+
+class CellAddress(namedtuple('CellAddress', ['row', 'col'])):
+    """
+    Compact address of a spreadsheet cell, as its 1-based row and column numbers.
+
+    The conversions from and to cell location strings (e.g., 'AB27') go through tables
+    of column names and row strings shared by all the addresses. The tables grow on
+    demand, so each column name and row string is composed only once per session,
+    and location strings are never formatted or parsed with regular expressions.
+
+    Attributes:
+        row                         -- 1-based row number
+        col                         -- 1-based column number
+        toLocation()                -- returns the cell location string of this address
+        fromLocation()              -- returns the address of a cell location string
+        composeColumnName()         -- composes the name of a column, without the tables
+        getColumnName()             -- returns the name of a column (e.g., 28 to 'AB')
+        getColumnNumber()           -- returns the number of a column (e.g., 'AB' to 28)
+        getRowString()              -- returns the string of a row number
+        getColumnLocations()        -- returns the cell locations of a column for given rows
+    """
+
+    __slots__ = ()
+
+    # tables indexed by column and row numbers (index 0 is unused). names and strings
+    # beyond the tables limits are composed on each call instead of being stored.
+    MAX_TABLE_COL = 18278   # 'ZZZ'
+    MAX_TABLE_ROW = 65536
+    columnNames = ['']
+    rowStrings = ['']
+    # dictionary of {column name : column number} pairs
+    columnNumbers = {}
+
+    def toLocation(self):
+        """Returns the cell location string of this address (e.g., 'AB27')"""
+        return self.getColumnName(self.col) + self.getRowString(self.row)
+
+    @classmethod
+    def fromLocation(cls, cellLoc):
+        """
+        Returns the address of a cell location string
+
+        Args:
+            :param cellLoc (str): A cell location (e.g., 'AB27')
+
+        Returns:
+            :return (CellAddress): The address of the cell (e.g., (27, 28))
+        """
+        colName = cellLoc.rstrip(string.digits)
+        rowString = cellLoc[len(colName):]
+        if colName == '' or rowString == '':
+            raise ValueError('Invalid cell location: \'{0}\''.format(cellLoc))
+
+        return cls(int(rowString), cls.getColumnNumber(colName))
+
+    @staticmethod
+    def composeColumnName(col):
+        """Composes the name of a column, without the tables (see getColumnName())"""
+        colName = ''
+        while col > 0:
+            col, m = divmod(col - 1, len(string.ascii_uppercase))
+            colName = string.ascii_uppercase[m] + colName
+
+        return colName
+
+    @classmethod
+    def getColumnName(cls, col):
+        """
+        Returns the Excel style name of a 1-based column number
+        (i.e., 1 to 'A', 26 to 'Z', 27 to 'AA', 702 to 'ZZ', 703 to 'AAA', and so on)
+        """
+        if col > cls.MAX_TABLE_COL:
+            return cls.composeColumnName(col)
+
+        columnNames = cls.columnNames
+        while len(columnNames) <= col:
+            colName = cls.composeColumnName(len(columnNames))
+            cls.columnNumbers[colName] = len(columnNames)
+            columnNames.append(colName)
+
+        return columnNames[col]
+
+    @classmethod
+    def getColumnNumber(cls, colName):
+        """
+        Returns the 1-based column number of an Excel style column name
+        (i.e., 'A' to 1, 'ZZ' to 702, 'AAA' to 703, and so on)
+        """
+        col = cls.columnNumbers.get(colName)
+        if col is None:
+            col = 0
+            for letter in colName:
+                if letter not in string.ascii_uppercase:
+                    raise ValueError('Invalid column name: \'{0}\''.format(colName))
+                col = col * 26 + (ord(letter) - ord('A') + 1)
+            # fill the tables up to this column, so the name is found next time
+            cls.getColumnName(col)
+
+        return col
+
+    @classmethod
+    def getRowString(cls, row):
+        """Returns the string of a row number (e.g., 27 to '27')"""
+        if row > cls.MAX_TABLE_ROW:
+            return str(row)
+
+        rowStrings = cls.rowStrings
+        if len(rowStrings) <= row:
+            rowStrings.extend(str(rowNumber) for rowNumber in range(len(rowStrings), row + 1))
+
+        return rowStrings[row]
+
+    @classmethod
+    def getColumnLocations(cls, col, rows):
+        """
+        Returns the cell locations of a column for the given rows
+
+        Args:
+            :param col (int): 1-based column number
+            :param rows (list): Row numbers in ascending order (e.g., a range)
+
+        Returns:
+            :return (list): The cell location of each given row in the column
+        """
+        if len(rows) == 0:
+            return []
+
+        colName = cls.getColumnName(col)
+        if rows[-1] > cls.MAX_TABLE_ROW:
+            return [colName + cls.getRowString(row) for row in rows]
+
+        cls.getRowString(rows[-1])
+        rowStrings = cls.rowStrings
+
+        return [colName + rowStrings[row] for row in rows]
@@ -0,0 +1,90 @@
+# changePlan.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import io
+import csv
+import json
+
+class ChangePlan:
+    """
+    The changes an action would make to the properties of the target cells, as computed
+    by a dry run of the action (see SheetPropertiesActions.planReadAndSetTables()).
+
+    Each change is a dictionary having the FIELDS keys, recording for a single property
+    of a target cell its current and planned values, and the reason of the change.
+
+    Attributes:
+        CHANGE_SET                  -- the property is set to a new value
+        CHANGE_CLEARED              -- the property is cleared
+        CHANGE_UNCHANGED            -- the property already has the planned value
+        CHANGE_IGNORED              -- the property data source cell is invalid and ignored
+        FIELDS                      -- keys of each change, in the order of the CSV columns
+        fileName                    -- name of the document file of the changes (may be empty)
+        changes                     -- list of the changes, in the order they were planned
+        addChange()                 -- appends a change to the plan
+        getSummary()                -- returns the number of changes of each kind
+        toJSON()                    -- returns the changes as a JSON string
+        toCSV()                     -- returns the changes as a CSV string
+        write()                     -- writes the changes to a JSON or CSV file
+    """
+
+    # the kinds of changes. the first three match the keys of the summaries of the actions
+    CHANGE_SET = 'Set'
+    CHANGE_CLEARED = 'Cleared'
+    CHANGE_UNCHANGED = 'Unchanged'
+    CHANGE_IGNORED = 'Ignored'
+    CHANGES = [CHANGE_SET, CHANGE_CLEARED, CHANGE_UNCHANGED, CHANGE_IGNORED]
+
+    FIELDS = ['File', 'Sheet', 'Cell', 'Property', 'OldValue', 'NewValue', 'Change', 'Reason']
+
+    def __init__(self, fileName='', changes=None):
+        self.fileName = fileName
+        self.changes = list(changes) if changes is not None else []
+
+    def addChange(self, sheetLabel, cellLocation, header, oldValue, newValue, change, reason):
+        """
+        Appends a change to the plan
+
+        Args:
+            :param sheetLabel (str): The label of the target spreadsheet
+            :param cellLocation (str): The location of the target cell (e.g., 'C7')
+            :param header (str): The header of the property (e.g., HEADER_ALIAS)
+            :param oldValue (str): The current value of the property ('' if none)
+            :param newValue (str): The planned value of the property ('' to clear it)
+            :param change (str): The kind of the change (e.g., CHANGE_SET)
+            :param reason (str): Why the property is changed (e.g., its data source cell)
+        """
+        self.changes.append({'File': self.fileName, 'Sheet': sheetLabel, 'Cell': cellLocation,
+                             'Property': header, 'OldValue': oldValue, 'NewValue': newValue,
+                             'Change': change, 'Reason': reason})
+
+    def getSummary(self):
+        """Returns a dictionary of {kind of change : number of changes} pairs"""
+        summary = {change: 0 for change in self.CHANGES}
+        for change in self.changes:
+            summary[change['Change']] += 1
+
+        return summary
+
+    def toJSON(self):
+        """Returns the changes as a JSON list of objects"""
+        return json.dumps(self.changes, indent=2, sort_keys=True)
+
+    def toCSV(self):
+        """Returns the changes as CSV, with a header line of the FIELDS"""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=self.FIELDS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(self.changes)
+
+        return output.getvalue()
+
+    def write(self, filePath):
+        """Writes the changes to the given file, as CSV if its extension is '.csv', or as JSON"""
+        if filePath.lower().endswith('.csv'):
+            content = self.toCSV()
+        else:
+            content = self.toJSON()
+
+        with open(filePath, 'w', newline='') as planFile:
+            planFile.write(content)
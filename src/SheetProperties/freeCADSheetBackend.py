@@ -0,0 +1,70 @@
+# freeCADSheetBackend.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import FreeCAD as App
+from .sheetBackend import SheetBackend
+
+class FreeCADSheetBackend(SheetBackend):
+    """
+    Adapter of a 'Spreadsheet::Sheet' object to the SheetBackend interface.
+
+    Attributes:
+        sheet                       -- the adapted 'Spreadsheet::Sheet' object
+    """
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.Label = sheet.Label
+
+    def getCacheKey(self):
+        # the name of the document is used when the document was never saved.
+        document = self.sheet.Document
+        documentId = document.FileName if document.FileName else document.Name
+
+        return documentId + '#' + self.sheet.Name
+
+    def getCellLocations(self):
+        # getNonEmptyCells() and getUsedCells() are not available in older versions of FreeCAD
+        if hasattr(self.sheet, 'getNonEmptyCells'):
+            return self.sheet.getNonEmptyCells()
+        if hasattr(self.sheet, 'getUsedCells'):
+            return self.sheet.getUsedCells()
+
+        return None
+
+    def getContents(self, cellLoc):
+        return self.sheet.getContents(cellLoc)
+
+    def getAlias(self, cellLoc):
+        return self.sheet.getAlias(cellLoc)
+
+    def setAlias(self, cellLoc, alias):
+        self.sheet.setAlias(cellLoc, alias)
+
+    def getCellFromAlias(self, alias):
+        return self.sheet.getCellFromAlias(alias)
+
+    def getDisplayUnit(self, cellLoc):
+        return self.sheet.getDisplayUnit(cellLoc)
+
+    def setDisplayUnit(self, cellLoc, units):
+        self.sheet.setDisplayUnit(cellLoc, units)
+
+    def validateUnits(self, units):
+        try:
+            App.Units.parseQuantity(units)
+            return True
+        except (IOError, ValueError):
+            return False
+
+    def openTransaction(self, transactionName):
+        self.sheet.Document.openTransaction(transactionName)
+
+    def commitTransaction(self):
+        self.sheet.Document.commitTransaction()
+
+    def abortTransaction(self):
+        self.sheet.Document.abortTransaction()
+
+    def recompute(self):
+        self.sheet.Document.recompute()
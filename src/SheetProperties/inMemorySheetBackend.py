@@ -0,0 +1,123 @@
+# inMemorySheetBackend.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from .sheetBackend import SheetBackend
+from .unitsClassifier import UnitsClassifier
+
+class InMemorySheetBackend(SheetBackend):
+    """
+    Dictionary based spreadsheet implementing the SheetBackend interface.
+
+    It does not require FreeCAD, so discovery and actions can be exercised and measured
+    in plain Python. Every call through the SheetBackend interface is counted.
+
+    Attributes:
+        cells                       -- dictionary of {cell location : content} pairs
+        aliases                     -- dictionary of {cell location : alias} pairs
+        displayUnits                -- dictionary of {cell location : display unit} pairs
+        callCounts                  -- dictionary of {method name : number of calls} pairs
+        committedTransactions       -- names of the committed transactions
+        recomputeCount              -- number of recomputes
+        reportsCellLocations        -- when False, getCellLocations() returns None, like
+                                       older versions of FreeCAD
+        setContents()               -- sets the content of a cell (test setup, not counted)
+    """
+
+    def __init__(self, label='Sheet', cells=None, documentName='InMemory'):
+        self.Label = label
+        self.cacheKey = documentName + '#' + label
+        self.cells = {}
+        self.aliases = {}
+        self.displayUnits = {}
+        self.callCounts = {}
+        self.committedTransactions = []
+        self.recomputeCount = 0
+        self.reportsCellLocations = True
+        self.openedTransaction = None     # (name, aliases copy, display units copy)
+
+        if cells is not None:
+            for cellLoc, content in cells.items():
+                self.setContents(cellLoc, content)
+
+    def countCall(self, methodName):
+        self.callCounts[methodName] = self.callCounts.get(methodName, 0) + 1
+
+    def setContents(self, cellLoc, content):
+        if content == '':
+            self.cells.pop(cellLoc, None)
+        else:
+            self.cells[cellLoc] = content
+
+    def getCacheKey(self):
+        return self.cacheKey
+
+    def getCellLocations(self):
+        self.countCall('getCellLocations')
+        if not self.reportsCellLocations:
+            return None
+
+        return list(self.cells)
+
+    def getContents(self, cellLoc):
+        self.countCall('getContents')
+        return self.cells.get(cellLoc, '')
+
+    def getAlias(self, cellLoc):
+        self.countCall('getAlias')
+        return self.aliases.get(cellLoc)
+
+    def setAlias(self, cellLoc, alias):
+        """Like the spreadsheets of FreeCAD, rejects an alias already set on another cell"""
+        self.countCall('setAlias')
+        if alias == '':
+            self.aliases.pop(cellLoc, None)
+            return
+
+        if self.aliases.get(cellLoc) != alias and alias in self.aliases.values():
+            raise ValueError('Alias already defined: \'{0}\''.format(alias))
+        self.aliases[cellLoc] = alias
+
+    def getCellFromAlias(self, alias):
+        self.countCall('getCellFromAlias')
+        for cellLoc, cellAlias in self.aliases.items():
+            if cellAlias == alias:
+                return cellLoc
+
+        return None
+
+    def getDisplayUnit(self, cellLoc):
+        self.countCall('getDisplayUnit')
+        return self.displayUnits.get(cellLoc)
+
+    def setDisplayUnit(self, cellLoc, units):
+        self.countCall('setDisplayUnit')
+        if units == '':
+            self.displayUnits.pop(cellLoc, None)
+        else:
+            self.displayUnits[cellLoc] = units
+
+    def validateUnits(self, units):
+        """
+        Accepts the units the UnitsClassifier grammar classifies as valid. The units it
+        cannot decide (e.g., unknown names, parentheses) are rejected.
+        """
+        self.countCall('validateUnits')
+        return UnitsClassifier.classify(units)[0] == UnitsClassifier.VALID
+
+    def openTransaction(self, transactionName):
+        self.countCall('openTransaction')
+        self.openedTransaction = (transactionName, dict(self.aliases), dict(self.displayUnits))
+
+    def commitTransaction(self):
+        self.countCall('commitTransaction')
+        self.committedTransactions.append(self.openedTransaction[0])
+        self.openedTransaction = None
+
+    def abortTransaction(self):
+        self.countCall('abortTransaction')
+        _, self.aliases, self.displayUnits = self.openedTransaction
+        self.openedTransaction = None
+
+    def recompute(self):
+        self.countCall('recompute')
+        self.recomputeCount += 1
@@ -0,0 +1,83 @@
+# lazyRequestParamsMap.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from .utils import Utils
+from .requestParameters import RequestParameters
+
+class LazyRequestParamsMap(dict):
+    """
+    Maps spreadsheet reference to request params reference, creating the
+    RequestParameters of a spreadsheet only the first time it is looked up.
+
+    Analyzing a spreadsheet (i.e., searching its headers and data rows ranges) is
+    the costly part of creating its RequestParameters. Deferring it to the first
+    lookup keeps the startup cost independent of the number of sheets in the document.
+
+    Attributes:
+        context                 -- context of this script
+        pendingSheets           -- list of known spreadsheets not analyzed yet
+        prefetchTask            -- chunked analysis of the spreadsheet being prefetched
+                                   (None if none)
+        iterAnalysis()          -- analyzes a spreadsheet one chunk of work at a time
+        prefetchNext()          -- advances the analysis of the pending spreadsheets by one chunk
+    """
+
+    def __init__(self, context, sheets):
+        super(LazyRequestParamsMap, self).__init__()
+        self.context = context
+        self.pendingSheets = list(sheets)
+        self.prefetchTask = None
+
+    def __missing__(self, sheet):
+        requestParams = RequestParameters(sheet, self.context)
+        self[sheet] = requestParams
+        if sheet in self.pendingSheets:
+            self.pendingSheets.remove(sheet)
+
+        return requestParams
+
+    def iterAnalysis(self, sheet):
+        """
+        Analyzes a spreadsheet one chunk of work at a time (see RequestParameters.iterInitData())
+
+        The RequestParameters of the spreadsheet is added to this map only once the
+        analysis is complete, so an abandoned analysis leaves no partial results.
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work), yielded
+                                 after each chunk of work. Returns the RequestParameters
+                                 of the spreadsheet.
+        """
+        requestParams = RequestParameters(sheet, self.context, deferInitData=True)
+        yield from requestParams.iterInitData()
+
+        # the spreadsheet may have been looked up (and analyzed) in the meantime
+        if sheet not in self:
+            self[sheet] = requestParams
+        if sheet in self.pendingSheets:
+            self.pendingSheets.remove(sheet)
+
+        return self[sheet]
+
+    def prefetchNext(self):
+        """
+        Advances the analysis of the pending spreadsheets by one chunk of work.
+
+        Meant to be called repeatedly while the application is idle, so the remaining
+        sheets are ready by the time they are selected.
+
+        Returns:
+            :return (bool): True if more spreadsheets are still pending, False otherwise.
+        """
+        if self.prefetchTask is None:
+            for sheet in self.pendingSheets:
+                if sheet not in self:
+                    self.prefetchTask = self.iterAnalysis(sheet)
+                    break
+            else:
+                del self.pendingSheets[:]
+
+        if self.prefetchTask is not None and next(self.prefetchTask, None) is None:
+            self.prefetchTask = None
+
+        return self.prefetchTask is not None or not Utils.isEmpty(self.pendingSheets)
@@ -111,8 +111,9 @@ class MainFormUI(QtGui.QMainWindow):
         Defines the actions selection group
 
         Attributes:
-            setPropertiesPushButton   -- QtGui.QPushButton to be connected
-            clearPropertiesPushButton -- QtGui.QPushButton to be connected
+            setPropertiesPushButton     -- QtGui.QPushButton to be connected
+            clearPropertiesPushButton   -- QtGui.QPushButton to be connected
+            previewPropertiesPushButton -- QtGui.QPushButton to be connected
         """
         actionsGroupBox = QtGui.QGroupBox('Actions:', self)
         actionsGroupBox.setGeometry(10, 210, 380, 50)   # xLoc,yLoc,width,height
@@ -124,9 +125,14 @@ class MainFormUI(QtGui.QMainWindow):
         self.clearPropertiesPushButton.setMinimumSize(81, 23)      # width,height
         self.clearPropertiesPushButton.setSizePolicy(QtGui.QSizePolicy.Fixed,
                                                      QtGui.QSizePolicy.Fixed)
+        self.previewPropertiesPushButton = QtGui.QPushButton('&Preview', self)
+        self.previewPropertiesPushButton.setMinimumSize(81, 23)    # width,height
+        self.previewPropertiesPushButton.setSizePolicy(QtGui.QSizePolicy.Fixed,
+                                                       QtGui.QSizePolicy.Fixed)
         actionsGroupBoxLayout = QtGui.QHBoxLayout()
         actionsGroupBoxLayout.addWidget(self.setPropertiesPushButton)
         actionsGroupBoxLayout.addWidget(self.clearPropertiesPushButton)
+        actionsGroupBoxLayout.addWidget(self.previewPropertiesPushButton)
         actionsGroupBox.setLayout(actionsGroupBoxLayout)
 
     def defineStatusBox(self):
@@ -135,6 +141,8 @@ class MainFormUI(QtGui.QMainWindow):
 
         Attributes:
             statusTextContent       -- QtGui.QTextEdit to be populated
+            taskProgressBar         -- QtGui.QProgressBar showing the progress of a running task
+            taskCancelPushButton    -- QtGui.QPushButton to be connected
             statusRefreshPushButton -- QtGui.QPushButton to be connected
         """
         statusGroupBox = QtGui.QGroupBox('Status:', self)
@@ -146,9 +154,20 @@ class MainFormUI(QtGui.QMainWindow):
         self.statusRefreshPushButton = QtGui.QPushButton('&Refresh', self)
         self.statusRefreshPushButton.setMinimumSize(81, 23)        # width,height
         self.statusRefreshPushButton.setSizePolicy(QtGui.QSizePolicy.Fixed, QtGui.QSizePolicy.Fixed)
+        # progress of a running task (e.g., analysis, set, clear) and its cancellation
+        self.taskProgressBar = QtGui.QProgressBar()
+        self.taskProgressBar.setTextVisible(True)
+        self.taskCancelPushButton = QtGui.QPushButton('C&ancel', self)
+        self.taskCancelPushButton.setMinimumSize(81, 23)           # width,height
+        self.taskCancelPushButton.setSizePolicy(QtGui.QSizePolicy.Fixed, QtGui.QSizePolicy.Fixed)
+        self.taskCancelPushButton.setEnabled(False)
+        statusButtonsLayout = QtGui.QHBoxLayout()
+        statusButtonsLayout.addWidget(self.taskProgressBar)
+        statusButtonsLayout.addWidget(self.taskCancelPushButton)
+        statusButtonsLayout.addWidget(self.statusRefreshPushButton)
         statusGroupBoxLayout = QtGui.QVBoxLayout()
         statusGroupBoxLayout.addWidget(self.statusTextContent)
-        statusGroupBoxLayout.addWidget(self.statusRefreshPushButton)
+        statusGroupBoxLayout.addLayout(statusButtonsLayout)
         statusGroupBox.setLayout(statusGroupBoxLayout)
 
     def defineDialogDismiss(self):
@@ -0,0 +1,105 @@
+# parallelBatchDriver.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import os
+import json
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from .batchResults import BatchResults
+
+class ParallelBatchDriver:
+    """
+    Performs an action (i.e., set or clear) on many documents in parallel, by fanning
+    the documents out to a pool of worker processes (e.g., FreeCADCmd), one document
+    per worker run.
+
+    Each worker runs the headless batch mode (see SheetPropertiesBatch.py and BatchRunner)
+    on a single document, so a crashing or hanging document affects only its own worker.
+    This class does not depend on FreeCAD, and may run in any Python interpreter.
+
+    Attributes:
+        action                  -- the action to perform ('set' or 'clear')
+        workerCommand           -- command line starting a worker, without the script
+                                   (e.g., ['FreeCADCmd'] or ['python3'])
+        batchScriptPath         -- path of the SheetPropertiesBatch.py script run by the workers
+        jobs                    -- max number of concurrent worker processes
+        timeout                 -- max number of seconds for processing one document
+                                   (None for no limit)
+        save                    -- when True, changed documents are saved
+        dryRun                  -- when True, the changes are planned but not made
+                                   (see BatchRunner)
+        run()                   -- processes a list of document files and returns the results
+    """
+
+    # environment variable holding the arguments of a worker (see SheetPropertiesBatch.py)
+    BATCH_ARGS_ENV_VAR = 'SHEET_PROPERTIES_BATCH_ARGS'
+
+    STATUS_ERROR = BatchResults.STATUS_ERROR
+
+    def __init__(self, action, workerCommand, batchScriptPath,
+                 jobs=None, timeout=None, save=True, dryRun=False):
+        self.action = action
+        self.workerCommand = list(workerCommand)
+        self.batchScriptPath = batchScriptPath
+        self.jobs = jobs if jobs else (os.cpu_count() or 1)
+        self.timeout = timeout
+        self.save = save
+        self.dryRun = dryRun
+
+    def run(self, filePaths):
+        """
+        Processes the given document files in parallel
+
+        Returns:
+            :return (dict): The results of all the documents in the order of the given files,
+                            in the same format as BatchRunner.run()
+        """
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            documentsResults = list(executor.map(self.runWorker, filePaths))
+
+        return BatchResults.composeResults(self.action, documentsResults)
+
+    def runWorker(self, filePath):
+        """
+        Processes a single document file in a worker process
+
+        Returns:
+            :return (dict): The results of the document (see BatchRunner.processFile())
+        """
+        outputFd, outputPath = tempfile.mkstemp(prefix='SheetProperties', suffix='.json')
+        os.close(outputFd)
+
+        workerArgs = [self.action, filePath, '--output', outputPath]
+        if not self.save:
+            workerArgs.append('--no-save')
+        if self.dryRun:
+            workerArgs.append('--dry-run')
+        env = dict(os.environ)
+        env[self.BATCH_ARGS_ENV_VAR] = json.dumps(workerArgs)
+
+        try:
+            completedProcess = subprocess.run(self.workerCommand + [self.batchScriptPath],
+                                              env=env, timeout=self.timeout,
+                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                with open(outputPath, 'r') as outputFile:
+                    return json.load(outputFile)['Documents'][0]
+            except (IOError, ValueError, KeyError, IndexError):
+                stderrTail = completedProcess.stderr.decode('utf-8', 'replace').strip()[-500:]
+                return self.newErrorResults(
+                    filePath, 'Worker exited with code {0} without results ({1})'.format(
+                        completedProcess.returncode, stderrTail))
+        except subprocess.TimeoutExpired:
+            # subprocess.run() kills the worker when the timeout expires
+            return self.newErrorResults(
+                filePath, 'Timed out after {0} seconds'.format(self.timeout))
+        except OSError as e:
+            return self.newErrorResults(filePath, 'Failed to start a worker ({0})'.format(e))
+        finally:
+            os.remove(outputPath)
+
+    def newErrorResults(self, filePath, reason):
+        """Returns the results of a document that could not be processed"""
+        return {'File': filePath, 'Status': self.STATUS_ERROR, 'Reason': reason,
+                'Saved': False, 'Sheets': [], 'Changes': []}
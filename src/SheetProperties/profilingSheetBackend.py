@@ -0,0 +1,65 @@
+# profilingSheetBackend.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from .sheetBackend import SheetBackend
+
+class ProfilingSheetBackend(SheetBackend):
+    """
+    Wrapper of a SheetBackend recording every call with a CallProfiler.
+
+    Used instead of the wrapped backend only when profiling is enabled, so the
+    backends themselves are not slowed down otherwise. The calls are recorded under
+    the names of the methods of the backend, prefixed by 'sheet.'.
+
+    Attributes:
+        sheetBackend                -- the wrapped SheetBackend
+        profiler                    -- the CallProfiler recording the calls
+    """
+
+    def __init__(self, sheetBackend, profiler):
+        self.sheetBackend = sheetBackend
+        self.profiler = profiler
+        self.Label = sheetBackend.Label
+
+    def getCacheKey(self):
+        return self.sheetBackend.getCacheKey()
+
+    def getCellLocations(self):
+        return self.profiler.call('sheet.getCellLocations', self.sheetBackend.getCellLocations)
+
+    def getContents(self, cellLoc):
+        return self.profiler.call('sheet.getContents', self.sheetBackend.getContents, cellLoc)
+
+    def getAlias(self, cellLoc):
+        return self.profiler.call('sheet.getAlias', self.sheetBackend.getAlias, cellLoc)
+
+    def setAlias(self, cellLoc, alias):
+        self.profiler.call('sheet.setAlias', self.sheetBackend.setAlias, cellLoc, alias)
+
+    def getCellFromAlias(self, alias):
+        return self.profiler.call('sheet.getCellFromAlias', self.sheetBackend.getCellFromAlias,
+                                  alias)
+
+    def getDisplayUnit(self, cellLoc):
+        return self.profiler.call('sheet.getDisplayUnit', self.sheetBackend.getDisplayUnit,
+                                  cellLoc)
+
+    def setDisplayUnit(self, cellLoc, units):
+        self.profiler.call('sheet.setDisplayUnit', self.sheetBackend.setDisplayUnit, cellLoc,
+                           units)
+
+    def validateUnits(self, units):
+        return self.profiler.call('sheet.validateUnits', self.sheetBackend.validateUnits, units)
+
+    def openTransaction(self, transactionName):
+        self.profiler.call('sheet.openTransaction', self.sheetBackend.openTransaction,
+                           transactionName)
+
+    def commitTransaction(self):
+        self.profiler.call('sheet.commitTransaction', self.sheetBackend.commitTransaction)
+
+    def abortTransaction(self):
+        self.profiler.call('sheet.abortTransaction', self.sheetBackend.abortTransaction)
+
+    def recompute(self):
+        self.profiler.call('sheet.recompute', self.sheetBackend.recompute)
@@ -0,0 +1,153 @@
+# propertyLayout.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import io
+import csv
+import json
+
+class PropertyLayout:
+    """
+    The properties of the target cells of a spreadsheet, as discovered from its data
+    source columns (see SheetPropertiesActions.exportLayout()).
+
+    A layout is meant to be stored in a sidecar file next to the document, so the
+    properties of a spreadsheet of known layout can be restored in a single batched
+    pass, without searching its headers and data rows again
+    (see SheetPropertiesActions.applyLayout()).
+
+    Each property entry is a dictionary of the target cell location ('Cell') and the
+    values of its properties, keyed by header (e.g., {'Cell': 'C2', 'Alias': 'length',
+    'Units': 'mm'}). A missing or empty property is left untouched when applied.
+
+    Attributes:
+        FORMAT_VERSION              -- version of the format of the layout files
+        sheetLabel                  -- label of the spreadsheet of the layout
+        propertyHeaders             -- headers of the properties of the layout
+                                       (e.g., HEADER_UNITS, HEADER_ALIAS)
+        tables                      -- list of {'headersToLocMap', 'dataRowsRanges'}
+                                       dictionaries, one per table of the spreadsheet
+        properties                  -- list of the property entries, in the order
+                                       they were added
+        addTable()                  -- appends the headers and ranges of a table
+        addProperties()             -- appends the properties of a target cell
+        toJSON()                    -- returns the layout as a JSON string
+        toCSV()                     -- returns the layout as a CSV string
+        fromJSON()                  -- returns the layout of a JSON string
+        fromCSV()                   -- returns the layout of a CSV string
+        write()                     -- writes the layout to a JSON or CSV file
+        read()                      -- reads the layout of a JSON or CSV file
+    """
+
+    FORMAT_VERSION = 1
+
+    # the first line of the CSV format holds the other fields of the layout as JSON
+    CSV_COMMENT_PREFIX = '# '
+
+    def __init__(self, sheetLabel, propertyHeaders, tables=None, properties=None):
+        self.sheetLabel = sheetLabel
+        self.propertyHeaders = list(propertyHeaders)
+        self.tables = list(tables) if tables is not None else []
+        self.properties = list(properties) if properties is not None else []
+
+    def addTable(self, headersToLocMap, dataRowsRanges):
+        """
+        Appends the headers and the data rows ranges of a table of the spreadsheet
+
+        Args:
+            :param headersToLocMap (dict): Dictionary of {header name : header location}
+                pairs ('' for a header that was not found)
+            :param dataRowsRanges (list): The data rows ranges of the table
+        """
+        self.tables.append({'headersToLocMap': dict(headersToLocMap),
+                            'dataRowsRanges': [dict(dataRowsRange)
+                                               for dataRowsRange in dataRowsRanges]})
+
+    def addProperties(self, cellLocation, headerToValueMap):
+        """
+        Appends the properties of a target cell
+
+        Args:
+            :param cellLocation (str): The location of the target cell (e.g., 'C7')
+            :param headerToValueMap (dict): Dictionary of {header : property value} pairs
+        """
+        entry = {'Cell': cellLocation}
+        entry.update(headerToValueMap)
+        self.properties.append(entry)
+
+    def getHeaderFields(self):
+        """Returns the fields of the layout, other than its property entries"""
+        return {'Version': self.FORMAT_VERSION, 'Sheet': self.sheetLabel,
+                'PropertyHeaders': self.propertyHeaders, 'Tables': self.tables}
+
+    def toJSON(self):
+        """Returns the layout as a JSON object"""
+        layout = self.getHeaderFields()
+        layout['Properties'] = self.properties
+
+        return json.dumps(layout, indent=2, sort_keys=True)
+
+    def toCSV(self):
+        """
+        Returns the layout as CSV: a comment line of the other fields as JSON, followed by
+        a header line of 'Cell' and the property headers, and one line per target cell
+        """
+        output = io.StringIO()
+        output.write(self.CSV_COMMENT_PREFIX +
+                     json.dumps(self.getHeaderFields(), sort_keys=True) + '\n')
+        writer = csv.DictWriter(output, fieldnames=['Cell'] + self.propertyHeaders,
+                                restval='', lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(self.properties)
+
+        return output.getvalue()
+
+    @classmethod
+    def fromFields(cls, fields, properties):
+        """Returns the layout of the given fields (see getHeaderFields()) and property entries"""
+        if fields.get('Version') != cls.FORMAT_VERSION:
+            raise ValueError('Unsupported layout format version: {0}'.
+                             format(fields.get('Version')))
+
+        return cls(fields['Sheet'], fields['PropertyHeaders'], fields['Tables'], properties)
+
+    @classmethod
+    def fromJSON(cls, content):
+        """Returns the layout of a JSON string as returned by toJSON()"""
+        layout = json.loads(content)
+
+        return cls.fromFields(layout, layout['Properties'])
+
+    @classmethod
+    def fromCSV(cls, content):
+        """Returns the layout of a CSV string as returned by toCSV()"""
+        commentLine, _, rows = content.partition('\n')
+        if not commentLine.startswith(cls.CSV_COMMENT_PREFIX):
+            raise ValueError('Missing the layout fields line of the CSV layout')
+        fields = json.loads(commentLine[len(cls.CSV_COMMENT_PREFIX):])
+
+        # the empty properties of the CSV format are missing properties
+        properties = [{field: value for field, value in entry.items() if value != ''}
+                      for entry in csv.DictReader(io.StringIO(rows))]
+
+        return cls.fromFields(fields, properties)
+
+    def write(self, filePath):
+        """Writes the layout to the given file, as CSV if its extension is '.csv', or as JSON"""
+        if filePath.lower().endswith('.csv'):
+            content = self.toCSV()
+        else:
+            content = self.toJSON()
+
+        with open(filePath, 'w', newline='') as layoutFile:
+            layoutFile.write(content)
+
+    @classmethod
+    def read(cls, filePath):
+        """Reads the layout of the given file, as CSV if its extension is '.csv', or as JSON"""
+        with open(filePath, newline='') as layoutFile:
+            content = layoutFile.read()
+
+        if filePath.lower().endswith('.csv'):
+            return cls.fromCSV(content)
+
+        return cls.fromJSON(content)
@@ -1,10 +1,12 @@
-# activeDocumentSheets.py
+# requestParameters.py
 # LGPL license; Copyright (C) 2018 Uri Benchetrit
 
-from itertools import product
-import re
-import FreeCAD
 from .utils import Utils
+from .cellAddress import CellAddress
+from .sheetSnapshot import SheetSnapshot
+from .callProfiler import CallProfiler
+from .aliasValidator import AliasValidator
+from .unitsClassifier import UnitsClassifier
 
 class RequestParameters:
     """
@@ -19,8 +21,18 @@ class RequestParameters:
     Attributes:
         targetSpreadsheet           -- target spreadsheet for actions on cells properties
                                        (e.g., set, clear)
+        sheetBackend                -- SheetBackend through which the target spreadsheet
+                                       is accessed
         context                     -- context of this script
-        initData()                  -- data initializing method for this instance
+        snapshot                    -- SheetSnapshot of the populated cells of the target
+                                       spreadsheet, read once by initData()
+        refresh()                   -- updates the analysis results after the target
+                                       spreadsheet has changed
+        initData()                  -- data initializing method for this instance (called by
+                                       the constructor unless deferInitData is True)
+        iterInitData()              -- same as initData(), one chunk of work at a time
+        getAnalysisState()          -- returns the analysis results as a serializable dictionary
+        setAnalysisState()          -- restores the analysis results from such a dictionary
         hasValidHeaders             -- True if the headers of the target spreadsheet
                                        are valid, False otherwise
         invalidHeadersReason        -- reason for invalid headers
@@ -30,23 +42,88 @@ class RequestParameters:
         headersRowNumber            -- row number of the headers
         mandatoryHeaders            -- list of mandatory headers
         headersToLocMap             -- dictionary of {header name : header location} pairs
+        headersToCellMap            -- dictionary of {header name : CellAddress} pairs
+                                       containing only headers that were found
         headersToColumnMap          -- dictionary of {header name : header column} pairs
                                        containing only headers that were found
+        headersToColumnNumberMap    -- dictionary of {header name : header column number} pairs
+                                       containing only headers that were found
         dataRowsRanges              -- list of continuous continuous ranges
                                        of rows having source data
+        propertyHeaders             -- list of the property data source headers that were found
+                                       (i.e., all the found headers except the value header)
+        dataRowsPlans               -- dictionary of {row number : row plan} pairs caching
+                                       the rows inspected so far (see getDataRowsPlans())
+        dataRowsSearchTo            -- row number bounding the search for data rows, as the
+                                       headers of a following table (None if unbounded)
+        tables                      -- list of the tables of the target spreadsheet, each
+                                       one a RequestParameters having its own headers and
+                                       data rows ranges. the first table is this instance
+        getTablesRanges()           -- returns the data rows ranges of every table
+        getAliasClaims()            -- returns the aliases claimed by the target cells
+                                       (see AliasIndex)
+
+    Notes:
+        - a spreadsheet may hold several tables, stacked vertically or side by side, each
+          having its own row of headers (see findSheetHeaders()). the attributes of this
+          instance describe the first table, except hasValidHeaders and
+          hasValidPropertiesData that describe all the tables of the spreadsheet.
     """
 
-    MAX_SEARCH_COL = 100    # Max value = 27*26=702='ZZ'
-    MAX_SEARCH_ROW = 100    # Max value = 128^2=16,384
+    MAX_SEARCH_COL = 100    # search window used only when the sheet cannot report
+    MAX_SEARCH_ROW = 100    # its used cells (see SheetSnapshot). otherwise, the search
+                            # is bounded by the used cells of the sheet.
+    MAX_SHEET_ROW = 16384   # Max row number supported by FreeCAD spreadsheets
     END_DATA_HINT = 5       # Min number of consecutive empty lines
                             # indicating end row of properties source data
 
-    def __init__(self, sheet, context):
+    CHUNK_ROWS = 256        # number of rows inspected between two progress reports
+
+    def __init__(self, sheet, context, deferInitData=False):
         self.targetSpreadsheet = sheet
         self.context = context
-        self.initData()
+        self.sheetBackend = context.getSheetBackend(sheet)
+        if not deferInitData:
+            self.initData()
 
     def initData(self):
+        """Reads and analyzes the associated sheet (see iterInitData())"""
+        Utils.runSteps(self.iterInitData())
+
+    def iterInitData(self):
+        """
+        Reads and analyzes the associated sheet, one chunk of work at a time
+
+        Meant to be driven by a scheduler (e.g., a timer of the UI), so the analysis of a
+        large sheet can be interleaved with other work and abandoned at any step.
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work),
+                                 yielded after each chunk of work
+        """
+        # read the populated cells of the associated sheet once. all the following
+        # scans (and the actions) read from this snapshot instead of the sheet itself
+        snapshot = SheetSnapshot(self.sheetBackend, self.MAX_SEARCH_ROW, self.MAX_SEARCH_COL,
+                                 deferRead=True)
+        yield from self.context.iterInPhase(CallProfiler.PHASE_SNAPSHOT,
+                                            snapshot.iterReadCells())
+        self.snapshot = snapshot
+        self.resetAnalysisState()
+
+        # reuse the results of a previous analysis of the same sheet content, if any
+        cachedState = self.context.analysisCache.get(self.getCacheKey(),
+                                                     self.snapshot.fingerprint())
+        if cachedState is not None:
+            self.setAnalysisState(cachedState)
+        else:
+            yield from self.iterAnalyze()
+            self.updateAnalysisCache()
+
+        self.updateAliasIndex()
+
+    def resetAnalysisState(self):
+        """Resets the results of the analysis of the associated sheet"""
+
         self.hasValidHeaders = False
         self.invalidHeadersReason = ''
         self.hasValidPropertiesData = False
@@ -57,53 +134,294 @@ class RequestParameters:
         self.headersToLocMap = {self.context.HEADER_UNITS:'',
                                 self.context.HEADER_ALIAS:'',
                                 self.context.HEADER_VALUE:''}
+        self.headersToCellMap = {}
         self.headersToColumnMap = {}
+        self.headersToColumnNumberMap = {}
         self.dataRowsRanges = []    # list of continuous ranges of rows having source data
+        self.propertyHeaders = []
+        self.dataRowsPlans = {}     # dictionary of {row number : row plan} pairs
+                                    # of the rows inspected so far
+        self.dataRowsSearchTo = None
+        self.tables = [self]
+
+    def createTable(self):
+        """Returns a new RequestParameters for another table of the associated sheet"""
+        table = RequestParameters(self.targetSpreadsheet, self.context, deferInitData=True)
+        table.sheetBackend = self.sheetBackend
+        table.snapshot = self.snapshot
+        table.resetAnalysisState()
+
+        return table
+
+    def getTablesRanges(self):
+        """
+        Returns the data rows ranges of every table of the associated sheet
+
+        Returns:
+            :return (list): Tuples of (table, data rows ranges) of the tables having
+                            data rows, in the order of the tables
+        """
+        return [(table, table.dataRowsRanges) for table in self.tables
+                if not Utils.isEmpty(table.dataRowsRanges)]
+
+    def getAliasClaims(self):
+        """
+        Returns the aliases claimed by the target cells of the data rows of all the tables
+
+        Notes:
+            - the aliases are read from the snapshot rather than from the rows plans, so
+              restoring a cached analysis does not validate the other property data.
+
+        Returns:
+            :return (dict): Dictionary of {value cell location : alias} pairs
+                            of the valid aliases
+        """
+        claims = {}
+        if not self.hasValidHeaders:
+            return claims
+
+        aliasHeader = self.context.HEADER_ALIAS
+        for table, dataRowsRanges in self.getTablesRanges():
+            aliasColumnNumber = table.headersToColumnNumberMap[aliasHeader]
+            valueColumnNumber = table.headersToColumnNumberMap[self.context.HEADER_VALUE]
+            for dataRowsRange in dataRowsRanges:
+                rows = range(dataRowsRange['From'], dataRowsRange['To'] + 1)
+                contents = self.snapshot.getColumnContents(aliasColumnNumber,
+                                                           rows[0], rows[-1] + 1)
+                contentToValue = table.validatePropertyDataColumn(aliasHeader, contents)
+                for valueCellLocation, alias in zip(
+                        CellAddress.getColumnLocations(valueColumnNumber, rows), contents):
+                    if alias != '' and contentToValue[alias] is not None:
+                        claims[valueCellLocation] = alias
+
+        return claims
+
+    def updateAliasIndex(self):
+        """Replaces the claims of the associated sheet in the alias index of the context"""
+        self.context.aliasIndex.setSheetClaims(self.targetSpreadsheet.Label,
+                                               self.getAliasClaims())
+
+    def takeSnapshot(self):
+        """Returns a new SheetSnapshot of the associated sheet"""
+        with self.context.profilePhase(CallProfiler.PHASE_SNAPSHOT):
+            return SheetSnapshot(self.sheetBackend, self.MAX_SEARCH_ROW, self.MAX_SEARCH_COL)
+
+    def getCacheKey(self):
+        """Returns the key of the associated sheet in the analysis cache"""
+        return self.sheetBackend.getCacheKey()
+
+    def updateAnalysisCache(self):
+        """Stores the current analysis results in the analysis cache"""
+        self.context.analysisCache.put(self.getCacheKey(), self.snapshot.fingerprint(),
+                                       self.getAnalysisState())
+
+    def refresh(self):
+        """
+        Updates the analysis results to reflect the current content of the associated sheet
+
+        Notes:
+            - the document observer does not tell which cells changed, so the sheet is
+              read again in a single bulk snapshot, and compared to the previous one.
+              only the changed cells are then re-inspected. the headers are searched
+              again only if a changed cell had, or now has, the name of one of the headers.
+            - the data rows ranges are regrouped from the cached rows plans, so
+              only the rows having changed cells are validated again.
+
+        Returns:
+            :return (bool): True if the content of the sheet has changed, False otherwise.
+        """
+        newSnapshot = self.takeSnapshot()
+        changedCells = self.snapshot.getChangedCells(newSnapshot)
+        oldSnapshot = self.snapshot
+        self.snapshot = newSnapshot
+
+        if Utils.isEmpty(changedCells):
+            return False
+
+        if self.isHeadersChange(changedCells, oldSnapshot):
+            self.resetAnalysisState()
+            self.analyze()
+        else:
+            for table in self.tables:
+                table.snapshot = newSnapshot
+                propertyColumns = set(table.headersToColumnNumberMap.values())
+                for row, col in changedCells:
+                    if col in propertyColumns:
+                        table.dataRowsPlans.pop(row, None)
+            with self.context.profilePhase(CallProfiler.PHASE_RANGE_DISCOVERY):
+                self.updateDataRowsRanges()
+
+        self.updateAnalysisCache()
+        self.updateAliasIndex()
+        return True
+
+    def isHeadersChange(self, changedCells, oldSnapshot):
+        """
+        Checks if the given changed cells may affect the headers search results
+
+        Args:
+            :param changedCells (set): (row number, column number) of the changed cells
+            :param oldSnapshot (SheetSnapshot): Snapshot taken before the change
+
+        Returns:
+            :return (bool): True if the headers have to be searched again, False otherwise.
+        """
+        if not self.hasValidHeaders:
+            return True
+
+        headerNames = [header.lower() for header in self.headersToLocMap]
+        for row, col in changedCells:
+            if oldSnapshot.getContents(row, col).lower() in headerNames or \
+               self.snapshot.getContents(row, col).lower() in headerNames:
+                return True
+
+        return False
+
+    def analyze(self):
+        """Searches the headers and the data rows ranges of the associated sheet"""
+        Utils.runSteps(self.iterAnalyze())
+
+    def iterAnalyze(self):
+        """
+        Searches the headers and the data rows ranges of the associated sheet,
+        one chunk of rows at a time
 
-        # search for the headers in the associated sheet
-        self.findSheetHeaders()
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work),
+                                 yielded after each chunk of work
+        """
+        # search for the headers in the associated sheet (a single lookup in the snapshot)
+        with self.context.profilePhase(CallProfiler.PHASE_HEADER_SEARCH):
+            self.findSheetHeaders()
+        yield CallProfiler.PHASE_HEADER_SEARCH, 1, 1
 
         if self.hasValidHeaders:
-            self.initHeadersToColumnMap()
-            self.dataRowsRanges = self.findDataRowsRanges()
+            with self.context.profilePhase(CallProfiler.PHASE_RANGE_DISCOVERY):
+                for table in self.tables:
+                    table.initHeadersToColumnMap()
+
+            # scan the rows of every table in chunks, grouping the ranges as the rows
+            # are scanned, up to the end of the properties source data
+            for table in self.tables:
+                yield from self.context.iterInPhase(CallProfiler.PHASE_RANGE_DISCOVERY,
+                                                    table.iterDiscoverDataRowsRanges())
+            self.updatePropertiesDataValidity()
+
+    def updateDataRowsRanges(self):
+        """
+        Searches the data rows ranges of every table and updates the validity
+        of the properties data
+        """
+        for table in self.tables:
+            table.dataRowsRanges = table.findDataRowsRanges()
+        self.updatePropertiesDataValidity()
+
+    def updatePropertiesDataValidity(self):
+        """Updates the validity of the properties data from the data rows ranges of every table"""
+        for table in self.tables:
+            table.hasValidPropertiesData = not Utils.isEmpty(table.dataRowsRanges)
+
+        if Utils.isEmpty(self.getTablesRanges()):
+            self.hasValidPropertiesData = False
+            self.invalidPropertiesDataReason = \
+                'No usable data rows for property setting were provided in \'{0}\' sheet\n'.  \
+                format(self.targetSpreadsheet.Label)
+        else:
+            self.hasValidPropertiesData = True
+            self.invalidPropertiesDataReason = ''
+
+    def getAnalysisState(self):
+        """Returns the analysis results of the associated sheet as a JSON compatible dictionary"""
+
+        return {'hasValidHeaders': self.hasValidHeaders,
+                'invalidHeadersReason': self.invalidHeadersReason,
+                'hasValidPropertiesData': self.hasValidPropertiesData,
+                'invalidPropertiesDataReason': self.invalidPropertiesDataReason,
+                'headersRowNumber': self.headersRowNumber,
+                'headersToLocMap': dict(self.headersToLocMap),
+                'dataRowsRanges': [dict(dataRowsRange) for dataRowsRange in self.dataRowsRanges],
+                'dataRowsSearchTo': self.dataRowsSearchTo,
+                'tables': [table.getAnalysisState() for table in self.tables[1:]]}
+
+    def setAnalysisState(self, state):
+        """Restores the results of a previous analysis as returned by getAnalysisState()"""
+
+        self.hasValidHeaders = state['hasValidHeaders']
+        self.invalidHeadersReason = state['invalidHeadersReason']
+        self.hasValidPropertiesData = state['hasValidPropertiesData']
+        self.invalidPropertiesDataReason = state['invalidPropertiesDataReason']
+        self.headersRowNumber = state['headersRowNumber']
+        self.headersToLocMap.update(state['headersToLocMap'])
+        for header, headerLoc in self.headersToLocMap.items():
+            if headerLoc != '':
+                self.headersToCellMap[header] = CellAddress.fromLocation(headerLoc)
+        self.dataRowsRanges = [dict(dataRowsRange) for dataRowsRange in state['dataRowsRanges']]
+        self.dataRowsSearchTo = state['dataRowsSearchTo']
 
-            if Utils.isEmpty(self.dataRowsRanges):
-                self.hasValidPropertiesData = False
-                self.invalidPropertiesDataReason = \
-                    'No usable data rows for property setting were provided in \'{0}\' sheet\n'.  \
-                    format(self.targetSpreadsheet.Label)
-            else:
-                self.hasValidPropertiesData = True
+        self.tables = [self]
+        for tableState in state['tables']:
+            table = self.createTable()
+            table.setAnalysisState(tableState)
+            self.tables.append(table)
+
+        if self.hasValidHeaders:
+            self.initHeadersToColumnMap()
 
     def findSheetHeaders(self):
-        """Searches the headers, if found it records their row number"""
-        result = False
-
-        searchedHeadersCount = len(self.headersToLocMap)
-        uniqueHeadersFound = 0
-
-        for row, col in product(range(1, self.MAX_SEARCH_ROW), range(1, self.MAX_SEARCH_COL)):
-            cellLoc = Utils.colNumberToColName(col) + str(row)
-            cellContent = self.targetSpreadsheet.getContents(cellLoc)
-            # check if the current cell content matches any of the possible headers
-            for header in self.headersToLocMap.keys():
-                if cellContent.lower() == header.lower():
-                    # make sure the header that was found is not a duplicate
-                    if self.headersToLocMap[header] == '':
-                        self.headersToLocMap[header] = cellLoc
-                        # set headers row number only when the first header is found
-                        if uniqueHeadersFound == 0:
-                            self.headersRowNumber = row
-                        uniqueHeadersFound += 1
-                        result = True
-                    else:
-                        self.hasValidHeaders = False
-                        self.invalidHeadersReason = 'Found a duplicated header: ' + header
-                        return False
-
-            # stop searching if all the possible headers were found
-            if uniqueHeadersFound == searchedHeadersCount:
-                break
+        """
+        Searches the headers, if found it records their row number
+
+        Notes:
+            - the headers are located by looking up their names in the text index
+              of the snapshot, rather than by comparing every cell to every header.
+            - the results are those of a row-major scan of the sheet that stops once
+              all the headers were found. hence, a second occurrence of a header is
+              a duplicate only if it precedes the last header to be found.
+            - if at least two blocks of headers have all the mandatory headers (see
+              findHeadersBlocks()), each of these blocks is the row of headers of a table
+              of the sheet instead (see findTablesHeaders()). the other header names
+              (e.g., an alias named 'Value' in the data rows of a table) are ignored.
+        """
+        # the (row, col) locations of each header name, in row-major order
+        headerCells = {}
+        for header in self.headersToLocMap:
+            headerCells[header] = self.snapshot.locate(header)
+
+        headersBlocks = self.findHeadersBlocks(headerCells)
+        completeBlocks = [headersBlock for headersBlock in headersBlocks
+                          if self.hasMandatoryHeaders(headersBlock)]
+        if len(completeBlocks) > 1:
+            return self.findTablesHeaders(completeBlocks)
+
+        # the cell at which a row-major scan would stop (None if not all headers exist)
+        stopCell = None
+        if all(headerCells.values()):
+            stopCell = max(cells[0] for cells in headerCells.values())
+
+        # look for the first duplicated header the scan would have encountered
+        duplicateCell = None
+        duplicateHeader = None
+        for header, cells in headerCells.items():
+            if len(cells) > 1 and (stopCell is None or cells[1] < stopCell):
+                if duplicateCell is None or cells[1] < duplicateCell:
+                    duplicateCell = cells[1]
+                    duplicateHeader = header
+
+        # record the headers found (before the first duplicate, if any)
+        for header, cells in headerCells.items():
+            if cells and (duplicateCell is None or cells[0] < duplicateCell):
+                self.headersToCellMap[header] = CellAddress(*cells[0])
+                self.headersToLocMap[header] = self.headersToCellMap[header].toLocation()
+
+        result = not Utils.isEmpty(self.headersToCellMap)
+        if result:
+            # the headers row number is the row of the first header found
+            self.headersRowNumber = min(self.headersToCellMap.values())[0]
+
+        if duplicateCell is not None:
+            self.hasValidHeaders = False
+            self.invalidHeadersReason = 'Found a duplicated header: ' + duplicateHeader
+            return False
 
         # validate search results with rules additional to those applied during
         # the search for the headers in the spreadsheet
@@ -112,100 +430,263 @@ class RequestParameters:
 
         return result
 
+    def findHeadersBlocks(self, headerCells):
+        """
+        Splits the header cells into blocks of headers, each block being a candidate
+        row of headers of a table
+
+        Notes:
+            - the header cells of a block are on the same row. a block ends before the
+              first header repeating one of its headers. once it has all the mandatory
+              headers, it also ends at a column gap followed by all the mandatory headers
+              (i.e., tables side by side, see getLeadingHeaders()). otherwise, the
+              headers after a column gap belong to the block (e.g., a Units column
+              apart from the Alias and Value columns of the same table).
+
+        Args:
+            :param headerCells (dict): Dictionary of {header name : (row, col) locations}
+                pairs, as found in the snapshot
+
+        Returns:
+            :return (list): Dictionaries of {header name : CellAddress} pairs,
+                            one per block in row-major order
+        """
+        cells = sorted((cell, header) for header, headerLocations in headerCells.items()
+                       for cell in headerLocations)
+
+        headersBlocks = []
+        headersBlock = None
+        blockRow = blockCol = None
+        for index, ((row, col), header) in enumerate(cells):
+            if headersBlock is None or row != blockRow or header in headersBlock or \
+               (col != blockCol + 1 and self.hasMandatoryHeaders(headersBlock) and
+                self.hasMandatoryHeaders(self.getLeadingHeaders(cells[index:]))):
+                headersBlock = {}
+                headersBlocks.append(headersBlock)
+                blockRow = row
+            headersBlock[header] = CellAddress(row, col)
+            blockCol = col
+
+        return headersBlocks
+
+    @staticmethod
+    def getLeadingHeaders(cells):
+        """
+        Returns the headers of the first cells of the given header cells that are on the
+        same row, up to the first header repeating one of them
+
+        Args:
+            :param cells (list): Tuples of ((row, col), header name) in row-major order
+
+        Returns:
+            :return (set): The header names
+        """
+        leadingHeaders = set()
+        firstRow = cells[0][0][0]
+        for cell, header in cells:
+            if cell[0] != firstRow or header in leadingHeaders:
+                break
+            leadingHeaders.add(header)
+
+        return leadingHeaders
+
+    def hasMandatoryHeaders(self, headersBlock):
+        """Checks if a block of headers has all the mandatory headers"""
+        return all(header in headersBlock for header in self.mandatoryHeaders)
+
+    def findTablesHeaders(self, headersBlocks):
+        """
+        Records each block of headers as the headers of a table of the sheet
+
+        Notes:
+            - the data rows of a table are searched up to the row of the first block
+              below it sharing any of its columns.
+            - only the blocks having all the mandatory headers are given, so a header
+              name astray in the data rows of a table does not start a table.
+
+        Args:
+            :param headersBlocks (list): The blocks of headers having all the mandatory
+                headers (see findHeadersBlocks())
+
+        Returns:
+            :return (bool): True if the headers of all the tables are valid, False otherwise.
+        """
+        self.tables = [self] + [self.createTable() for headersBlock in headersBlocks[1:]]
+
+        result = True
+        invalidHeadersReason = ''
+        for table, headersBlock in zip(self.tables, headersBlocks):
+            for header, headerCell in headersBlock.items():
+                table.headersToCellMap[header] = headerCell
+                table.headersToLocMap[header] = headerCell.toLocation()
+            table.headersRowNumber = min(headersBlock.values())[0]
+            table.dataRowsSearchTo = self.getNextHeadersRow(headersBlock, headersBlocks)
+
+            # report the first invalid table
+            if not table.validateHeaders() and result:
+                invalidHeadersReason = 'Headers of the table at row {0}: {1}'.format(
+                    table.headersRowNumber, table.invalidHeadersReason)
+                result = False
+
+        self.hasValidHeaders = result
+        self.invalidHeadersReason = invalidHeadersReason
+
+        return result
+
+    @staticmethod
+    def getNextHeadersRow(headersBlock, headersBlocks):
+        """
+        Returns the row of the first block of headers below the given one, sharing
+        any of its columns (None if there is none)
+        """
+        blockRow = min(headersBlock.values())[0]
+        blockCols = [col for row, col in headersBlock.values()]
+        for otherBlock in headersBlocks:
+            otherRow = min(otherBlock.values())[0]
+            otherCols = [col for row, col in otherBlock.values()]
+            if otherRow > blockRow and \
+               min(otherCols) <= max(blockCols) and max(otherCols) >= min(blockCols):
+                # the blocks are in row-major order, the first one found is the nearest
+                return otherRow
+
+        return None
+
     def initHeadersToColumnMap(self):
         """
         Composes a dictionary of {header name : header column} pairs
         containing only headers that were found
         """
         for header in self.headersToLocMap:
-            headerLoc = self.headersToLocMap[header]
-            if headerLoc != '':
-                # extract the header column name from the header location string
-                # (e.g., 'AB' from 'AB27')
-                col = re.findall('^[A-Z]+', headerLoc)[0]
-                self.headersToColumnMap.update({header: col})
+            if header in self.headersToCellMap:
+                col = self.headersToCellMap[header].col
+                self.headersToColumnMap.update({header: CellAddress.getColumnName(col)})
+                self.headersToColumnNumberMap.update({header: col})
+                if header != self.context.HEADER_VALUE:
+                    self.propertyHeaders.append(header)
 
     def findDataRowsRanges(self):
         """
         Returns a list of continuous usable data rows ranges
 
+        Notes:
+            - the rows are scanned and classified one chunk at a time
+              (see iterScanDataRows()), and grouped into ranges
+              (see iterGroupDataRowsRanges()). the scan stops at the end of the
+              properties source data.
+
         Returns:
             :return (list): List of dictionaries {'From': None, 'To': None}
                             for each continuous data rows range,
                             or empty list [] if none has been found
         """
+        rangeFrom, rangeTo = self.getDataRowsSearchRange()
+        return [dataRowsRange
+                for dataRowsRanges, _ in self.iterGroupDataRowsRanges(
+                    self.iterScanDataRows(rangeFrom, rangeTo))
+                for dataRowsRange in dataRowsRanges]
 
-        dataRowsRanges = []                     # list of continuous ranges of
-                                                # rows having source data
-        rangeFrom = self.headersRowNumber + 1   # initial guess.
-                                                # empty rows after headers row are possible
-        rangeTo = self.MAX_SEARCH_ROW
-
-        done = False
-        while not done:
-            nextDataRowsRange = {'From': None, 'To': None}
+    def iterDiscoverDataRowsRanges(self):
+        """
+        Searches the data rows ranges (see findDataRowsRanges()), one chunk of rows at a time
 
-            # find the start of the next range of data rows
-            leadingNoneDataRowsCount = self.countLeadingNoneDataRows(rangeFrom, rangeTo)
-            if leadingNoneDataRowsCount is None:
-                # EOF reached and all rows between rangeFrom and rangeTo are none data rows
-                nextDataRowsRange = None
-                break
-            else:
-                # zero or more leading none data rows were found
-                rangeFrom += leadingNoneDataRowsCount
-                nextDataRowsRange['From'] = rangeFrom
-
-            # find the end of the next range of data rows
-            firstNoneDataRow = self.findFirstNoneDataRow(rangeFrom, rangeTo)
-            if firstNoneDataRow is None:
-                # EOF reached and all rows between nextRangeFrom and rangeTo are data rows
-                # (i.e., no none data rows were found in the given range)
-                nextDataRowsRange['To'] = rangeTo
-                done = True     # don't break before finalizing this iteration
-            else:
-                nextDataRowsRange['To'] = firstNoneDataRow - 1
+        Returns:
+            :return (generator): Tuples of (number of rows scanned, total number of rows),
+                                 yielded after each chunk of rows
+        """
+        self.dataRowsRanges = []
+        rangeFrom, rangeTo = self.getDataRowsSearchRange()
+        for dataRowsRanges, scannedTo in self.iterGroupDataRowsRanges(
+                self.iterScanDataRows(rangeFrom, rangeTo)):
+            self.dataRowsRanges.extend(dataRowsRanges)
+            yield scannedTo - rangeFrom, rangeTo - rangeFrom
 
-            # finalize the current iteration
-            dataRowsRanges.append(nextDataRowsRange)
-            rangeFrom = firstNoneDataRow
+        # the scan may stop before the end of the search range
+        yield rangeTo - rangeFrom, rangeTo - rangeFrom
 
-        return dataRowsRanges
+    def iterScanDataRows(self, fromRow, toRow):
+        """
+        Scans and classifies the rows in the given range, one chunk of rows at a time
 
-    def countLeadingNoneDataRows(self, fromRow, toRow):
-        """counts the leading continuous empty rows in the given range"""
+        The plans of the rows are composed only when the chunk is scanned, so the rows
+        beyond the end of the properties source data are never inspected.
 
-        noneDataRowCount = 0
+        Args:
+            :param fromRow (int): First row number of the range
+            :param toRow (int): Row number following the last row of the range
 
-        for row in range(fromRow, toRow):
-            if self.isValidDataRow(row):
-                # end of none data rows block found
-                break
+        Returns:
+            :return (generator): Tuples of (range of the rows of the chunk, validity of
+                                 each row of the chunk (see getValidDataRowsMask()))
+        """
+        for chunkFrom in range(fromRow, toRow, self.CHUNK_ROWS):
+            chunkTo = min(chunkFrom + self.CHUNK_ROWS, toRow)
+            yield range(chunkFrom, chunkTo), self.getValidDataRowsMask(chunkFrom, chunkTo)
 
-            # a none data row found
-            noneDataRowCount += 1
+    def iterGroupDataRowsRanges(self, scannedChunks):
+        """
+        Groups the consecutive valid rows of the scanned chunks into data rows ranges
 
-            if noneDataRowCount == self.END_DATA_HINT:
-                # min consecutive empty rows reached
-                # (i.e., a hint for end of properties source data)
-                return None
+        A group of at least END_DATA_HINT none data rows is a hint for end of properties
+        source data: the grouping stops there, and so does the scan of the rows.
 
-        return noneDataRowCount
+        Args:
+            :param scannedChunks (iterable): Tuples of (range of rows, validity of each row)
+                (see iterScanDataRows())
 
-    def findFirstNoneDataRow(self, fromRow, toRow):
+        Returns:
+            :return (generator): Tuples of (list of the data rows ranges ending in the chunk,
+                                 row number following the last row grouped), yielded
+                                 after each chunk
         """
-        Returns the row number of the first row in the given range
-        that has no data for property setting
+        # the open range (rangeFrom is None when no range is open)
+        rangeFrom = rangeTo = None
+        emptyRowsCount = 0
+        for chunkRows, chunkMask in scannedChunks:
+            dataRowsRanges = []
+            for row, isValid in zip(chunkRows, chunkMask):
+                if isValid:
+                    if rangeFrom is None:
+                        rangeFrom = row
+                    rangeTo = row
+                    emptyRowsCount = 0
+                    continue
+
+                if rangeFrom is not None:
+                    dataRowsRanges.append({'From': rangeFrom, 'To': rangeTo})
+                    rangeFrom = None
+                emptyRowsCount += 1
+                if emptyRowsCount >= self.END_DATA_HINT:
+                    yield dataRowsRanges, row + 1
+                    return
+
+            yield dataRowsRanges, chunkRows.stop
+
+        # the last range ends with the search range
+        if rangeFrom is not None:
+            yield [{'From': rangeFrom, 'To': rangeTo}], rangeTo + 1
+
+    def getDataRowsSearchRange(self):
         """
-        for row in range(fromRow, toRow):
-            if not self.isValidDataRow(row):
-                return row
+        Returns the range of rows searched for data rows
 
-        return None     # end of range reached with no empty data rows
+        Returns:
+            :return (tuple): First row number of the range, and the row number
+                             following the last row of the range
+        """
+        rangeFrom = self.headersRowNumber + 1   # initial guess.
+                                                # empty rows after headers row are possible
+        # the rows beyond the last used row are empty. searching END_DATA_HINT rows
+        # beyond it guarantees the end of the properties source data is reached.
+        rangeTo = self.snapshot.maxRow + self.END_DATA_HINT + 1
+        # the data rows of a table end before the headers of the table below it
+        if self.dataRowsSearchTo is not None:
+            rangeTo = min(rangeTo, self.dataRowsSearchTo)
+
+        return rangeFrom, rangeTo
 
-    def isValidDataRow(self, row):
+    def getValidDataRowsMask(self, fromRow, toRow):
         """
-        Validates a property data source row
+        Returns the validity of each row in the given range
 
         Notes:
             - a row having at least one valid content as data source
@@ -214,40 +695,89 @@ class RequestParameters:
               in the following process (i.e., it may or may not have values).
 
         Args:
-            :param row (int): Number of the row to be validated in the target spreadsheet
+            :param fromRow (int): First row number of the range
+            :param toRow (int): Row number following the last row of the range
 
         Returns:
-            :return (bool): True if valid, False otherwise.
+            :return (list): True for each valid data row, False for each none data row
         """
+        return [any(slot is not None and slot[1] is not None for slot in plan)
+                for plan in self.getDataRowsPlans(range(fromRow, toRow))]
 
-        result = False
+    def getDataRowsPlans(self, rows):
+        """
+        Returns the plans for setting the properties of the given rows
 
-        for header in self.headersToColumnMap:
-            # iterate only over the property data sources columns headers
-            # (i.e., skip the value header)
-            if header == self.context.HEADER_VALUE:
-                continue
+        The plan of each row is composed once and cached until the row changes.
+        It serves both the data rows ranges search and the 'Set' action, so each
+        property data source cell is read and validated only once.
 
-            dataCellLocation = self.headersToColumnMap[header] + str(row)
-            cellContent = self.targetSpreadsheet.getContents(dataCellLocation)
-            if cellContent == '':
-                continue
+        Args:
+            :param rows (list): Row numbers in ascending order (e.g., a range)
 
-            # prepare the validation function associated with the given header
-            validationFunc, settingFunc = self.getPropertiesValidationAndSettingFunctions(header)
+        Returns:
+            :return (list): The plan of each given row. A plan has one slot per header in
+                            propertyHeaders. A slot is None if the respective property data
+                            cell is empty, or a tuple of (cell content, property value)
+                            otherwise, the property value being None if the content is
+                            invalid (see validatePropertyDataColumn()).
+        """
+        missingRows = [row for row in rows if row not in self.dataRowsPlans]
+        if not Utils.isEmpty(missingRows):
+            self.composeDataRowsPlans(missingRows[0], missingRows[-1] + 1)
 
-            # the property data cell has a value, if the value is valid
-            # consider the entire row as valid
-            if validationFunc(cellContent):
-                result = True
-                break   # the row has relevant data. no need to iterate any
-                        # further inside the inspected row.
-            else:
-                # invalid value for a property data cell. keep trying other
-                # data columns of the inspected row
-                pass
+        return [self.dataRowsPlans[row] for row in rows]
 
-        return result
+    def composeDataRowsPlans(self, fromRow, toRow):
+        """
+        Composes the plans of the rows in the given range not inspected yet, column by column
+
+        Each property data source column is read for all the rows in one pass, and only
+        the distinct contents of the column are validated, in a single call.
+
+        Args:
+            :param fromRow (int): First row number of the range
+            :param toRow (int): Row number following the last row of the range
+        """
+        rows = [row for row in range(fromRow, toRow) if row not in self.dataRowsPlans]
+        if Utils.isEmpty(rows):
+            return
+
+        # the rows to compose are usually consecutive, read the columns over their span
+        spanFrom = rows[0]
+        columnsSlots = []
+        for header in self.propertyHeaders:
+            contents = self.snapshot.getColumnContents(self.headersToColumnNumberMap[header],
+                                                       spanFrom, rows[-1] + 1)
+            contentToValue = self.validatePropertyDataColumn(header, contents)
+            columnContents = [contents[row - spanFrom] for row in rows]
+            columnsSlots.append([None if cellContent == '' else
+                                 (cellContent, contentToValue[cellContent])
+                                 for cellContent in columnContents])
+
+        for row, plan in zip(rows, zip(*columnsSlots)):
+            self.dataRowsPlans[row] = plan
+
+    def validatePropertyDataColumn(self, header, contents):
+        """
+        Validates the distinct non-empty contents of a property data source column
+
+        Args:
+            :param header (header_type_constant): The header of the column
+            :param contents (list): The contents of the cells of the column
+
+        Returns:
+            :return (dict): Dictionary of {cell content : property value} pairs, the property
+                            value being the value to set from a valid content (e.g., the
+                            normalized units), or None for an invalid content
+        """
+        columnValidationFunc = self.getPropertyColumnValidationFunction(header)
+
+        distinctContents = set(contents)
+        distinctContents.discard('')
+
+        return self.context.validationCache.validateColumn(header, distinctContents,
+                                                           columnValidationFunc)
 
     def getPropertiesValidationAndSettingFunctions(self, header):
         """
@@ -263,11 +793,57 @@ class RequestParameters:
         Returns:
             :return (tuple): References to Validation and Setting functions.
         """
-        settingFuncName, validationFuncName = self.context.headerToFunctionsMap[header]
-        settingFunc = getattr(self.targetSpreadsheet, settingFuncName)
+        validationFuncName = self.context.headerToFunctionsMap[header].validationFuncName
         validationFunc = getattr(self, validationFuncName)
+        if self.context.profiler is not None:
+            validationFunc = self.context.profiler.wrap(validationFuncName, validationFunc)
+
+        return validationFunc, self.getPropertySettingFunction(header)
+
+    def getPropertySettingFunction(self, header):
+        """
+        Returns the header dependent function setting the property of a cell
+
+        Args:
+            :param header (header_type_constant): The property data source column header
+                (e.g., HEADER_UNITS, HEADER_ALIAS)
+        Returns:
+            :return (function): Reference to the Setting function of the sheet backend.
+        """
+        return getattr(self.sheetBackend, self.context.headerToFunctionsMap[header].settingFuncName)
 
-        return validationFunc, settingFunc
+    def getPropertyGettingFunction(self, header):
+        """
+        Returns the header dependent function reading the current property of a cell
+
+        Args:
+            :param header (header_type_constant): The property data source column header
+                (e.g., HEADER_UNITS, HEADER_ALIAS)
+        Returns:
+            :return (function): Reference to the Getting function of the sheet backend.
+        """
+        return getattr(self.sheetBackend, self.context.headerToFunctionsMap[header].gettingFuncName)
+
+    def getPropertyColumnValidationFunction(self, header):
+        """
+        Returns the header dependent function validating many property data contents at once
+
+        Args:
+            :param header (header_type_constant): The property data source column header
+                (e.g., HEADER_UNITS, HEADER_ALIAS)
+        Returns:
+            :return (function): Reference to the Column Validation function, taking a list
+                                of contents and returning the property value of each one
+                                (None if invalid, see validatePropertyDataColumn()).
+        """
+        columnValidationFuncName = \
+            self.context.headerToFunctionsMap[header].columnValidationFuncName
+        columnValidationFunc = getattr(self, columnValidationFuncName)
+        if self.context.profiler is not None:
+            columnValidationFunc = self.context.profiler.wrap(columnValidationFuncName,
+                                                              columnValidationFunc)
+
+        return columnValidationFunc
 
     def validateHeaders(self):
         """validates the headers as stored in the provided request parameters"""
@@ -300,11 +876,7 @@ class RequestParameters:
             result = False
 
         # Rule #3: all headers must be on the same row
-        for headerLoc in self.headersToLocMap.values():
-            if headerLoc == '':
-                continue
-            # extract the header row number from the header location string (e.g., 27 from 'AB27')
-            row = int(re.findall('[\d]+', headerLoc)[0])
+        for row, _ in self.headersToCellMap.values():
             if row != self.headersRowNumber:
                 allFailedRulesReasons.append('Not all the headers are on the same row')
                 result = False
@@ -317,15 +889,30 @@ class RequestParameters:
         return result
 
     def validateUnits(self, units):
-        try:
-            FreeCAD.Units.parseQuantity(units)
-            return True
-        except IOError:
-            return False
+        verdict = UnitsClassifier.classify(units)[0]
+        if verdict == UnitsClassifier.AMBIGUOUS:
+            return self.sheetBackend.validateUnits(units)
+
+        return verdict == UnitsClassifier.VALID
+
+    def validateUnitsColumn(self, unitsList):
+        # only the units the classifier cannot decide are parsed by the sheet backend.
+        # the valid units are set in their normalized form
+        validateUnits = self.sheetBackend.validateUnits
+        propertyValues = []
+        for units, (verdict, normalizedUnits) in zip(unitsList,
+                                                     UnitsClassifier.classifyColumn(unitsList)):
+            if verdict == UnitsClassifier.AMBIGUOUS:
+                isValid = validateUnits(units)
+            else:
+                isValid = verdict == UnitsClassifier.VALID
+            propertyValues.append(normalizedUnits if isValid else None)
+
+        return propertyValues
 
     def validateAlias(self, alias):
-        # REVISIT: implement a true validation.
-        # temporarily we just count the number of words and
-        # accept only a single word as a valid alias.
-        tokens = alias.split()
-        return len(tokens) == 1
+        return AliasValidator.isValid(alias)
+
+    def validateAliasColumn(self, aliases):
+        return [alias if isValid else None
+                for alias, isValid in zip(aliases, AliasValidator.validateColumn(aliases))]
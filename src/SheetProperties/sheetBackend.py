@@ -0,0 +1,80 @@
+# sheetBackend.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+class SheetBackend:
+    """
+    The narrow interface through which RequestParameters and SheetPropertiesActions
+    access a spreadsheet.
+
+    The cells are addressed by their location string (e.g., 'AB27'). The methods for
+    reading and writing the cells properties are named after their counterparts of a
+    'Spreadsheet::Sheet' object, so they can be referred to by ActiveDocumentSheets.
+    headerToFunctionsMap for any backend.
+
+    Concrete backends:
+        FreeCADSheetBackend         -- adapter of a 'Spreadsheet::Sheet' object
+        InMemorySheetBackend        -- dictionary based spreadsheet, not requiring FreeCAD
+                                       (e.g., for testing and benchmarking)
+
+    Attributes:
+        Label                       -- the label of the spreadsheet
+        getCacheKey()               -- returns a key identifying the spreadsheet across sessions
+        getCellLocations()          -- returns the locations of the non-empty cells
+        getContents()               -- returns the content of a cell
+        getAlias()                  -- returns the alias of a cell (None if not set)
+        setAlias()                  -- sets the alias of a cell ('' clears it)
+        getCellFromAlias()          -- returns the location of the cell having an alias
+                                       (None if no cell has it)
+        getDisplayUnit()            -- returns the display unit of a cell (None if not set)
+        setDisplayUnit()            -- sets the display unit of a cell ('' clears it)
+        validateUnits()             -- returns True if the given text is a valid quantity
+        openTransaction()           -- starts an undoable transaction
+        commitTransaction()         -- commits the current transaction
+        abortTransaction()          -- rolls back the current transaction
+        recompute()                 -- recomputes the document of the spreadsheet
+    """
+
+    Label = ''
+
+    def getCacheKey(self):
+        raise NotImplementedError
+
+    def getCellLocations(self):
+        """
+        Returns the locations of the non-empty cells, or None if the spreadsheet
+        cannot report them (the cells are then read one by one inside a search window)
+        """
+        raise NotImplementedError
+
+    def getContents(self, cellLoc):
+        raise NotImplementedError
+
+    def getAlias(self, cellLoc):
+        raise NotImplementedError
+
+    def setAlias(self, cellLoc, alias):
+        raise NotImplementedError
+
+    def getCellFromAlias(self, alias):
+        raise NotImplementedError
+
+    def getDisplayUnit(self, cellLoc):
+        raise NotImplementedError
+
+    def setDisplayUnit(self, cellLoc, units):
+        raise NotImplementedError
+
+    def validateUnits(self, units):
+        raise NotImplementedError
+
+    def openTransaction(self, transactionName):
+        raise NotImplementedError
+
+    def commitTransaction(self):
+        raise NotImplementedError
+
+    def abortTransaction(self):
+        raise NotImplementedError
+
+    def recompute(self):
+        raise NotImplementedError
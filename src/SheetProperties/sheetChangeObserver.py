@@ -0,0 +1,19 @@
+# sheetChangeObserver.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+class SheetChangeObserver:
+    """Installable Observer for changes of spreadsheets in the documents"""
+
+    def __init__(self, subscriber):
+        self.subscriber = subscriber
+
+    def slotChangedObject(self, obj, prop):
+        """
+        Called by the installed document observer when a property of
+        a document object has changed
+        """
+
+        # changes of the cells content are reported on the 'cells' property.
+        # other spreadsheet properties (e.g., Label, Placement) do not affect the analysis.
+        if prop == 'cells' and obj.isDerivedFrom('Spreadsheet::Sheet'):
+            self.subscriber.onSheetChanged(obj)
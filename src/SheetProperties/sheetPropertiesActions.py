@@ -1,8 +1,13 @@
 # sheetPropertiesActions.py
 # LGPL license; Copyright (C) 2018 Uri Benchetrit
 
-import FreeCAD as App
 from .utils import Utils
+from .cellAddress import CellAddress
+from .callProfiler import CallProfiler
+from .changePlan import ChangePlan
+from .aliasIndex import AliasIndex
+from .propertyLayout import PropertyLayout
+from .preconditionError import PreconditionError
 
 class SheetPropertiesActions:
     """
@@ -16,76 +21,750 @@ class SheetPropertiesActions:
                                    data source headers (e.g., HEADER_UNITS, HEADER_ALIAS)
         clearProperties()       -- set the properties of the cells in the column
                                    having HEADER_VALUE header
+        iterReadAndSetProperties()
+                                -- same as readAndSetProperties(), one chunk at a time
+        iterClearProperties()   -- same as clearProperties(), one chunk at a time
+        readAndSetTables()      -- same as readAndSetProperties(), for several tables
+                                   of the spreadsheet in a single pass
+        clearTables()           -- same as clearProperties(), for several tables
+                                   of the spreadsheet in a single pass
+        planReadAndSetTables()  -- returns the changes readAndSetTables() would make,
+                                   without changing the spreadsheet (i.e., dry run)
+        planClearTables()       -- returns the changes clearTables() would make,
+                                   without changing the spreadsheet (i.e., dry run)
+        exportLayout()          -- returns the properties readAndSetTables() would set, as a
+                                   PropertyLayout to be stored in a sidecar file
+        applyLayout()           -- sets the properties of a PropertyLayout without searching
+                                   the headers and the data rows of the spreadsheet
+        iterApplyLayout()       -- same as applyLayout(), one chunk at a time
+        iterApplyWrites()       -- applies pending property writes as a single undoable
+                                   transaction followed by a single recompute
+        diffMode                -- when True (default), the current properties of the target
+                                   cells are read first, and only the changing ones are written
+        aliasWriteCells         -- the cells whose alias write was collected by the running
+                                   action (see collectStaleAliasClear())
     """
 
-    def __init__(self, requestParams):
+    # keys of the summary returned by the actions
+    SUMMARY_UNCHANGED = 'Unchanged'
+    SUMMARY_SET = 'Set'
+    SUMMARY_CLEARED = 'Cleared'
+
+    CHUNK_CELLS = 256       # number of cells handled between two progress reports
+
+    def __init__(self, requestParams, diffMode=True):
         self.requestParams = requestParams
-        self.sheet = self.requestParams.targetSpreadsheet
+        self.sheetBackend = self.requestParams.sheetBackend
+        self.diffMode = diffMode
+        self.aliasWriteCells = set()
 
-    def readAndSetProperties(self, dataRowsRanges):
-        """Sets the properties of the value column based on the data source cells"""
+    @staticmethod
+    def newSummary():
+        """Returns an empty summary of an action"""
+        return {SheetPropertiesActions.SUMMARY_UNCHANGED: 0,
+                SheetPropertiesActions.SUMMARY_SET: 0,
+                SheetPropertiesActions.SUMMARY_CLEARED: 0}
 
-        # expecting a valid dataRowsRanges
-        if Utils.isEmpty(dataRowsRanges):
-            print('readAndSetProperties(): Internal Error: a valid dataRowsRanges is expected')
-            return
+    @staticmethod
+    def mergeSummaries(summaries):
+        """Returns the totals of the given summaries of actions"""
+        totals = SheetPropertiesActions.newSummary()
+        for summary in summaries:
+            for key in totals:
+                totals[key] += summary[key]
+
+        return totals
+
+    def iterDataRowsBlocks(self, dataRowsRanges):
+        """
+        Splits the given data rows ranges into blocks of at most CHUNK_CELLS rows
 
+        The blocks cover only the rows of the ranges (i.e., not the rows between them).
+        They are produced one at a time, so the rows of all the ranges are never listed
+        at once.
+
+        Args:
+            :param dataRowsRanges (iterable): The data rows ranges
+
+        Returns:
+            :return (generator): A range of row numbers for each block
+        """
         for dataRowsRange in dataRowsRanges:
-            for row in range(dataRowsRange['From'], dataRowsRange['To'] + 1):
-                # the cell location of the target cell for property setting
-                # needs to be updated only once per row
-                valueCellLocation = \
-                    self.requestParams.headersToColumnMap[self.requestParams.context.HEADER_VALUE] \
-                    + str(row)
-                for header in self.requestParams.headersToColumnMap:
-                    # iterate only over the property data headers (i.e., skip the value header)
-                    if header == self.requestParams.context.HEADER_VALUE:
+            for blockFrom in range(dataRowsRange['From'], dataRowsRange['To'] + 1,
+                                   self.CHUNK_CELLS):
+                yield range(blockFrom, min(blockFrom + self.CHUNK_CELLS, dataRowsRange['To'] + 1))
+
+    @staticmethod
+    def countDataRows(dataRowsRanges):
+        """Returns the number of rows of the given data rows ranges"""
+        return sum(dataRowsRange['To'] - dataRowsRange['From'] + 1
+                   for dataRowsRange in dataRowsRanges)
+
+    def isUnchangedProperty(self, gettingFunc, valueCellLocation, propertyValue):
+        """
+        Checks if the property of a target cell already has the given value
+
+        Notes:
+            - always False if not in diff mode (i.e., the property is written anyway).
+            - a missing property (e.g., getAlias() returning None) equals an empty value.
+        """
+        if not self.diffMode:
+            return False
+
+        return self.getCurrentProperty(gettingFunc, valueCellLocation) == propertyValue
+
+    @staticmethod
+    def getCurrentProperty(gettingFunc, valueCellLocation):
+        """Returns the current property of a target cell ('' if it has none)"""
+        currentValue = gettingFunc(valueCellLocation)
+        if currentValue is None:
+            currentValue = ''
+
+        return currentValue
+
+    def collectWrite(self, header, settingFunc, gettingFunc, valueCellLocation, propertyValue,
+                     reason, pendingWrites, summary, changePlan):
+        """
+        Collects the write of a property of a target cell, unless the property is unchanged
+        (see isUnchangedProperty())
+
+        Args:
+            :param header (str): The header of the property (e.g., HEADER_ALIAS)
+            :param settingFunc (function): The setting function of the property
+            :param gettingFunc (function): The getting function of the property
+            :param valueCellLocation (str): The location of the target cell
+            :param propertyValue (str): The new value of the property ('' to clear it)
+            :param reason (str): Why the property is written, as reported by the plan
+            :param pendingWrites (list): Receives the write (see iterApplyWrites())
+            :param summary (dict): Updated with the kind of the write (see newSummary())
+            :param changePlan (ChangePlan): Receives the change, unless None
+
+        Returns:
+            :return (str): The kind of the write (i.e., a key of the summary)
+        """
+        if changePlan is None:
+            isUnchanged = self.isUnchangedProperty(gettingFunc, valueCellLocation, propertyValue)
+        else:
+            # the plan reports the current value of the property, even if not in diff mode
+            oldValue = self.getCurrentProperty(gettingFunc, valueCellLocation)
+            isUnchanged = self.diffMode and oldValue == propertyValue
+
+        # the keys of the summary are also the kinds of changes of the plan
+        if isUnchanged:
+            change = self.SUMMARY_UNCHANGED
+        else:
+            pendingWrites.append((settingFunc, valueCellLocation, propertyValue))
+            change = self.SUMMARY_CLEARED if propertyValue == '' else self.SUMMARY_SET
+        summary[change] += 1
+
+        if changePlan is not None:
+            changePlan.addChange(self.sheetBackend.Label, valueCellLocation, header, oldValue,
+                                 propertyValue, change, reason)
+
+        return change
+
+    def collectStaleAliasClear(self, alias, valueCellLocation, pendingWrites, summary,
+                               changePlan):
+        """
+        Collects the clear of the alias of another cell of the spreadsheet still holding the
+        alias just collected for a target cell (e.g., after rows were moved), so setting the
+        alias is not rejected by the spreadsheet
+
+        Notes:
+            - the clear is placed before the write of the alias (i.e., the last pending write).
+            - a cell whose alias write was already collected by the running action no longer
+              holds its current alias once the writes are applied, so it is not cleared.
+
+        Args:
+            :param alias (str): The alias just collected for the target cell
+            :param valueCellLocation (str): The location of the target cell
+            :param pendingWrites (list): Holds the write of the alias as the last write
+            :param summary (dict): Updated with the clear (see newSummary())
+            :param changePlan (ChangePlan): Receives the change, unless None
+        """
+        self.aliasWriteCells.add(valueCellLocation)
+        ownerCellLocation = self.sheetBackend.getCellFromAlias(alias)
+        if ownerCellLocation is None or ownerCellLocation in self.aliasWriteCells:
+            return
+
+        self.aliasWriteCells.add(ownerCellLocation)
+        reason = 'Alias \'{0}\' moved to: {1}'.format(alias, valueCellLocation)
+        self.collectWrite(self.requestParams.context.HEADER_ALIAS, self.sheetBackend.setAlias,
+                          self.sheetBackend.getAlias, ownerCellLocation, '', reason,
+                          pendingWrites, summary, changePlan)
+        if changePlan is None:
+            print('Clearing stale alias \'{0}\' of cell: {1}'.format(alias, ownerCellLocation))
+        pendingWrites.insert(len(pendingWrites) - 2, pendingWrites.pop())
+
+    def iterCollectTablesWrites(self, iterCollectWrites, phaseName, tablesRanges,
+                                pendingWrites, summary, changePlan=None):
+        """
+        Collects the property writes of an action on several tables, one chunk of cells
+        at a time
+
+        Args:
+            :param iterCollectWrites (function): Collects the writes of a single table
+                (e.g., iterCollectSetWrites())
+            :param phaseName (str): The profiled phase of the action (see CallProfiler)
+            :param tablesRanges (list): Tuples of (table, data rows ranges)
+            :param pendingWrites (list): Receives the collected writes (see iterApplyWrites())
+            :param summary (dict): Updated with the number of unchanged, set and cleared
+                properties
+            :param changePlan (ChangePlan): Receives the planned changes, unless None
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work)
+        """
+        self.aliasWriteCells = set()
+        for table, dataRowsRanges in tablesRanges:
+            if Utils.isEmpty(dataRowsRanges):
+                continue
+            yield from self.requestParams.context.iterInPhase(
+                phaseName,
+                iterCollectWrites(table, dataRowsRanges, pendingWrites, summary, changePlan))
+
+    def planReadAndSetTables(self, tablesRanges, changePlan=None):
+        """
+        Returns the changes of the properties readAndSetTables() would make, without
+        changing the spreadsheet
+
+        Notes:
+            - the target cells are inspected in a single read-only pass, the same one
+              the action makes before applying its writes.
+
+        Args:
+            :param tablesRanges (list): Tuples of (table, data rows ranges)
+            :param changePlan (ChangePlan): Receives the planned changes (a new plan if None)
+
+        Returns:
+            :return (ChangePlan): The plan of the changes
+        """
+        return Utils.runSteps(self.iterPlanReadAndSetTables(tablesRanges, changePlan))
+
+    def iterPlanReadAndSetTables(self, tablesRanges, changePlan=None):
+        """
+        Returns the changes of the properties readAndSetTables() would make, one chunk of
+        cells at a time (see planReadAndSetTables())
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work), and
+                                 returns the plan of the changes
+        """
+        if changePlan is None:
+            changePlan = ChangePlan()
+
+        yield from self.iterCollectTablesWrites(
+            self.iterCollectSetWrites, CallProfiler.PHASE_SET, tablesRanges,
+            [], self.newSummary(), changePlan)
+
+        return changePlan
+
+    def planClearTables(self, tablesRanges, changePlan=None):
+        """
+        Returns the changes of the properties clearTables() would make, without
+        changing the spreadsheet (see planReadAndSetTables())
+        """
+        if changePlan is None:
+            changePlan = ChangePlan()
+
+        Utils.runSteps(self.iterCollectTablesWrites(
+            self.iterCollectClearWrites, CallProfiler.PHASE_CLEAR, tablesRanges,
+            [], self.newSummary(), changePlan))
+
+        return changePlan
+
+    def exportLayout(self, tablesRanges):
+        """
+        Returns the properties readAndSetTables() would set, as a PropertyLayout
+
+        Notes:
+            - the layout holds the valid properties of the data rows, as composed while
+              searching the data rows ranges, and the headers and ranges of every table.
+            - an alias claimed by another target cell of the spreadsheet is left out
+              (see iterReadAndSetTables()).
+
+        Args:
+            :param tablesRanges (list): Tuples of (table, data rows ranges)
+                (see RequestParameters.getTablesRanges())
+
+        Returns:
+            :return (PropertyLayout): The layout of the properties of the spreadsheet
+        """
+        context = self.requestParams.context
+        layout = PropertyLayout(self.sheetBackend.Label, list(context.headerToFunctionsMap))
+        aliasIndex = context.aliasIndex
+        sheetLabel = self.sheetBackend.Label
+        for table, dataRowsRanges in tablesRanges:
+            layout.addTable(table.headersToLocMap, dataRowsRanges)
+
+            valueColumnNumber = table.headersToColumnNumberMap[context.HEADER_VALUE]
+            for rows in self.iterDataRowsBlocks(dataRowsRanges):
+                for valueCellLocation, plan in zip(
+                        CellAddress.getColumnLocations(valueColumnNumber, rows),
+                        table.getDataRowsPlans(rows)):
+                    headerToValueMap = {}
+                    for header, slot in zip(table.propertyHeaders, plan):
+                        if slot is None or slot[1] is None:
+                            continue
+                        if header == context.HEADER_ALIAS and \
+                           aliasIndex.isClaimedByOther(slot[0], sheetLabel, valueCellLocation):
+                            continue
+                        headerToValueMap[header] = slot[1]
+                    if headerToValueMap:
+                        layout.addProperties(valueCellLocation, headerToValueMap)
+
+        return layout
+
+    def checkLayout(self, layout):
+        """
+        Checks that the given layout belongs to the target spreadsheet, and that its headers
+        are at their recorded locations (a single read per header)
+
+        Raises:
+            PreconditionError: if the layout is of another spreadsheet, has an unknown
+                property header, or a header is missing from its recorded location
+        """
+        sheetLabel = self.sheetBackend.Label
+        if layout.sheetLabel != sheetLabel:
+            raise PreconditionError(
+                'The layout of \'{0}\' sheet does not match \'{1}\' sheet'.
+                format(layout.sheetLabel, sheetLabel))
+
+        for header in layout.propertyHeaders:
+            if header not in self.requestParams.context.headerToFunctionsMap:
+                raise PreconditionError(
+                    'The layout of \'{0}\' sheet has an unknown property header: {1}'.
+                    format(sheetLabel, header))
+
+        for table in layout.tables:
+            for header, headerLoc in table['headersToLocMap'].items():
+                if headerLoc == '':
+                    continue
+                if self.sheetBackend.getContents(headerLoc).strip().lower() != header.lower():
+                    raise PreconditionError(
+                        'The layout does not match \'{0}\' sheet: header {1} is not at {2}'.
+                        format(sheetLabel, header, headerLoc))
+
+    def applyLayout(self, layout):
+        """
+        Sets the properties of the given layout (see iterApplyLayout())
+
+        Returns:
+            :return (dict): Number of target cells properties that were
+                            unchanged, set and cleared (see newSummary())
+        """
+        return Utils.runSteps(self.iterApplyLayout(layout))
+
+    def iterApplyLayout(self, layout):
+        """
+        Sets the properties of the given layout, one chunk of cells at a time
+
+        Notes:
+            - the headers and the data rows of the spreadsheet are not searched, hence the
+              request parameters do not have to be analyzed (e.g., created with
+              deferInitData). only the locations of the headers are checked
+              (see checkLayout()).
+            - the writes are collected and applied as a single transaction, like those of
+              the 'Set' action (see iterReadAndSetTables()).
+
+        Args:
+            :param layout (PropertyLayout): The layout (e.g., as read from a sidecar file)
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work), yielded
+                                 after each chunk of cells. Returns the number of target
+                                 cells properties that were unchanged, set and cleared
+                                 (see newSummary())
+        """
+        self.checkLayout(layout)
+
+        summary = self.newSummary()
+        pendingWrites = []
+        yield from self.requestParams.context.iterInPhase(
+            CallProfiler.PHASE_SET, self.iterCollectLayoutWrites(layout, pendingWrites, summary))
+        yield from self.iterApplyWrites(pendingWrites, 'Apply sheet properties layout',
+                                        CallProfiler.PHASE_SET)
+
+        return summary
+
+    def iterCollectLayoutWrites(self, layout, pendingWrites, summary):
+        """
+        Collects the property writes of a layout, one chunk of cells at a time
+
+        Notes:
+            - the values of the layout are validated like the property data of the
+              spreadsheet (see RequestParameters.validatePropertyDataColumn()), and the
+              invalid ones are ignored.
+            - an alias claimed by another target cell, either in the layout or in the
+              analyzed spreadsheet, is ignored (see AliasIndex).
+
+        Returns:
+            :return (generator): Tuples of (number of cells inspected, total number of cells)
+        """
+        context = self.requestParams.context
+        sheetLabel = self.sheetBackend.Label
+        totalCells = len(layout.properties) * len(layout.propertyHeaders)
+        inspectedCells = 0
+        self.aliasWriteCells = set()
+
+        # the valid values of each property column, validated once per distinct value
+        headerToValuesMap = {}
+        for header in layout.propertyHeaders:
+            values = [entry.get(header, '') for entry in layout.properties]
+            valueToPropertyMap = self.requestParams.validatePropertyDataColumn(header, values)
+            valueToPropertyMap[''] = None
+            headerToValuesMap[header] = [valueToPropertyMap[value] for value in values]
+
+        # the aliases claimed by the target cells of the layout
+        layoutAliasIndex = AliasIndex()
+        if context.HEADER_ALIAS in headerToValuesMap:
+            layoutAliasIndex.setSheetClaims(
+                sheetLabel, {entry['Cell']: alias for entry, alias in
+                             zip(layout.properties, headerToValuesMap[context.HEADER_ALIAS])
+                             if alias is not None})
+
+        for header in layout.propertyHeaders:
+            settingFunc = self.requestParams.getPropertySettingFunction(header)
+            gettingFunc = self.requestParams.getPropertyGettingFunction(header)
+            isAliasColumn = header == context.HEADER_ALIAS
+            propertyValues = headerToValuesMap[header]
+            for chunkFrom in range(0, len(layout.properties), self.CHUNK_CELLS):
+                chunk = layout.properties[chunkFrom:chunkFrom + self.CHUNK_CELLS]
+                for entry, propertyValue in zip(chunk, propertyValues[chunkFrom:]):
+                    layoutValue = entry.get(header, '')
+                    if layoutValue == '':
                         continue
 
-                    dataCellLocation = self.requestParams.headersToColumnMap[header] + str(row)
-                    cellContent = self.sheet.getContents(dataCellLocation)
-                    if cellContent == '':
+                    valueCellLocation = entry['Cell']
+                    ignoreReason = None
+                    if propertyValue is None:
+                        ignoreReason = 'invalid'
+                    elif isAliasColumn and \
+                        (layoutAliasIndex.isClaimedByOther(propertyValue, sheetLabel,
+                                                           valueCellLocation) or
+                         context.aliasIndex.isClaimedByOther(propertyValue, sheetLabel,
+                                                             valueCellLocation)):
+                        ignoreReason = 'conflicting'
+
+                    if ignoreReason is not None:
+                        print('Ignoring {0} {1} \'{2}\' of layout cell: {3}'.format(
+                            ignoreReason, header, layoutValue, valueCellLocation))
                         continue
 
-                    # prepare the validation function associated with the given header
-                    validationFunc, settingFunc = \
-                        self.requestParams.getPropertiesValidationAndSettingFunctions(header)
+                    change = self.collectWrite(header, settingFunc, gettingFunc,
+                                               valueCellLocation, propertyValue, 'Layout',
+                                               pendingWrites, summary, None)
+                    if isAliasColumn and change == self.SUMMARY_SET:
+                        self.collectStaleAliasClear(propertyValue, valueCellLocation,
+                                                    pendingWrites, summary, None)
+
+                inspectedCells += len(chunk)
+                yield inspectedCells, totalCells
+
+    def readAndSetProperties(self, dataRowsRanges):
+        """
+        Sets the properties of the value column based on the data source cells
+        (see iterReadAndSetProperties())
+
+        Returns:
+            :return (dict): Number of target cells properties that were
+                            unchanged, set and cleared (see newSummary())
+        """
+        return Utils.runSteps(self.iterReadAndSetProperties(dataRowsRanges))
+
+    def iterReadAndSetProperties(self, dataRowsRanges):
+        """
+        Sets the properties of the value column based on the data source cells,
+        one chunk of cells at a time (see iterReadAndSetTables())
+        """
+        return self.iterReadAndSetTables([(self.requestParams, dataRowsRanges)])
+
+    def readAndSetTables(self, tablesRanges):
+        """
+        Sets the properties of the value columns of several tables based on their data
+        source cells (see iterReadAndSetTables())
+
+        Returns:
+            :return (dict): Number of target cells properties that were
+                            unchanged, set and cleared (see newSummary())
+        """
+        return Utils.runSteps(self.iterReadAndSetTables(tablesRanges))
+
+    def iterReadAndSetTables(self, tablesRanges):
+        """
+        Sets the properties of the value columns of several tables based on their data
+        source cells, one chunk of cells at a time
+
+        Notes:
+            - the writes are applied only after all the target cells were inspected.
+              abandoning the generator before that leaves the spreadsheet unchanged,
+              and abandoning it while writing rolls back the writes applied so far.
+            - the writes of all the tables are applied as a single transaction.
+            - an alias claimed by another target cell of the spreadsheet is ignored
+              (see AliasIndex). an alias held by another cell is cleared from it first
+              (see collectStaleAliasClear()).
+
+        Args:
+            :param tablesRanges (list): Tuples of (table, data rows ranges), the table
+                being the RequestParameters of a table of the target spreadsheet
+                (see RequestParameters.getTablesRanges())
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work), yielded
+                                 after each chunk of cells. Returns the number of target
+                                 cells properties that were unchanged, set and cleared
+                                 (see newSummary())
+        """
+        summary = self.newSummary()
+
+        # expecting a valid dataRowsRanges
+        if all(Utils.isEmpty(dataRowsRanges) for table, dataRowsRanges in tablesRanges):
+            print('readAndSetProperties(): Internal Error: a valid dataRowsRanges is expected')
+            return summary
+
+        # the writes of all the tables are collected first and then applied together
+        pendingWrites = []
+        yield from self.iterCollectTablesWrites(self.iterCollectSetWrites, CallProfiler.PHASE_SET,
+                                                tablesRanges, pendingWrites, summary)
+        yield from self.iterApplyWrites(pendingWrites, 'Set sheet properties',
+                                        CallProfiler.PHASE_SET)
+
+        return summary
+
+    def iterCollectSetWrites(self, table, dataRowsRanges, pendingWrites, summary,
+                             changePlan=None):
+        """
+        Collects the property writes of the 'Set' action, one chunk of cells at a time
+
+        Args:
+            :param table (RequestParameters): The table of the target spreadsheet to set
+            :param dataRowsRanges (list): The data rows ranges to set
+            :param pendingWrites (list): Receives the collected writes (see iterApplyWrites())
+            :param summary (dict): Updated with the number of unchanged and set properties
+            :param changePlan (ChangePlan): Receives the planned changes, unless None
 
-                    # the property data cell has a value, validate and if valid
+        Returns:
+            :return (generator): Tuples of (number of cells inspected, total number of cells)
+        """
+        # prepare the setting and getting functions associated with each property data header
+        settingFuncs = []
+        gettingFuncs = []
+        for header in table.propertyHeaders:
+            settingFuncs.append(table.getPropertySettingFunction(header))
+            gettingFuncs.append(table.getPropertyGettingFunction(header))
+
+        valueColumnNumber = table.headersToColumnNumberMap[table.context.HEADER_VALUE]
+        aliasIndex = table.context.aliasIndex
+        sheetLabel = self.sheetBackend.Label
+
+        totalCells = self.countDataRows(dataRowsRanges) * len(table.propertyHeaders)
+        inspectedCells = 0
+
+        # execute the plans one block of rows at a time, and within a block one property
+        # data column at a time
+        for rows in self.iterDataRowsBlocks(dataRowsRanges):
+            # the plans were composed while searching the data rows ranges (composed now,
+            # column by column, if the rows were not inspected yet, e.g., custom range)
+            plans = table.getDataRowsPlans(rows)
+
+            # the cell locations of the target cells for property setting
+            # are shared by all the property data columns
+            valueCellLocations = CellAddress.getColumnLocations(valueColumnNumber, rows)
+
+            for index, header in enumerate(table.propertyHeaders):
+                settingFunc = settingFuncs[index]
+                gettingFunc = gettingFuncs[index]
+                isAliasColumn = header == table.context.HEADER_ALIAS
+                for row, valueCellLocation, plan in zip(rows, valueCellLocations, plans):
+                    slot = plan[index]
+                    if slot is None:
+                        continue
+
+                    # the property data cell has a value, if valid
                     # use it to set the respective property
-                    if validationFunc(cellContent):
-                        settingFunc(valueCellLocation, cellContent)
+                    cellContent, propertyValue = slot
+                    ignoreReason = None
+                    if propertyValue is None:
+                        ignoreReason = 'invalid'
+                    elif isAliasColumn and \
+                         aliasIndex.isClaimedByOther(cellContent, sheetLabel, valueCellLocation):
+                        ignoreReason = 'conflicting'
+
+                    reason = ''
+                    if changePlan is not None or ignoreReason is not None:
+                        dataCellLocation = CellAddress(
+                            row, table.headersToColumnNumberMap[header]).toLocation()
+                        reason = '{0} \'{1}\' found at: {2}'.format(header, cellContent,
+                                                                   dataCellLocation)
+                        if ignoreReason == 'conflicting':
+                            reason += ', claimed by: ' + \
+                                      ', '.join(aliasIndex.getOwners(cellContent, sheetLabel))
+
+                    if ignoreReason is None:
+                        change = self.collectWrite(header, settingFunc, gettingFunc,
+                                                   valueCellLocation, propertyValue, reason,
+                                                   pendingWrites, summary, changePlan)
+                        if isAliasColumn and change == self.SUMMARY_SET:
+                            self.collectStaleAliasClear(propertyValue, valueCellLocation,
+                                                        pendingWrites, summary, changePlan)
+                    elif changePlan is None:
+                        print('Ignoring {0} {1}'.format(ignoreReason, reason))
                     else:
-                        print('Ignoring invalid {0} \'{1}\' found at: {2}' \
-                              .format(header, cellContent, dataCellLocation))
+                        oldValue = self.getCurrentProperty(gettingFunc, valueCellLocation)
+                        changePlan.addChange(sheetLabel, valueCellLocation, header,
+                                             oldValue, oldValue, ChangePlan.CHANGE_IGNORED,
+                                             ignoreReason.capitalize() + ' ' + reason)
 
-        App.ActiveDocument.recompute()
+                inspectedCells += len(rows)
+                yield inspectedCells, totalCells
 
     def clearProperties(self, dataRowsRanges):
-        """Clears the properties of the value column for the give range"""
+        """
+        Clears the properties of the value column for the give range
+        (see iterClearProperties())
+
+        Returns:
+            :return (dict): Number of target cells properties that were
+                            unchanged, set and cleared (see newSummary())
+        """
+        return Utils.runSteps(self.iterClearProperties(dataRowsRanges))
+
+    def iterClearProperties(self, dataRowsRanges):
+        """
+        Clears the properties of the value column for the give range,
+        one chunk of cells at a time (see iterClearTables())
+        """
+        return self.iterClearTables([(self.requestParams, dataRowsRanges)])
+
+    def clearTables(self, tablesRanges):
+        """
+        Clears the properties of the value columns of several tables for the given ranges
+        (see iterClearTables())
+
+        Returns:
+            :return (dict): Number of target cells properties that were
+                            unchanged, set and cleared (see newSummary())
+        """
+        return Utils.runSteps(self.iterClearTables(tablesRanges))
+
+    def iterClearTables(self, tablesRanges):
+        """
+        Clears the properties of the value columns of several tables for the given ranges,
+        one chunk of cells at a time (see iterReadAndSetTables())
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work), yielded
+                                 after each chunk of cells. Returns the number of target
+                                 cells properties that were unchanged, set and cleared
+                                 (see newSummary())
+        """
+        summary = self.newSummary()
 
         # expecting a valid dataRowsRanges
-        if Utils.isEmpty(dataRowsRanges):
+        if all(Utils.isEmpty(dataRowsRanges) for table, dataRowsRanges in tablesRanges):
             print('readAndSetProperties(): Internal Error: a valid dataRowsRanges is expected')
+            return summary
+
+        # the writes of all the tables are collected first and then applied together
+        pendingWrites = []
+        yield from self.iterCollectTablesWrites(self.iterCollectClearWrites,
+                                                CallProfiler.PHASE_CLEAR,
+                                                tablesRanges, pendingWrites, summary)
+        yield from self.iterApplyWrites(pendingWrites, 'Clear sheet properties',
+                                        CallProfiler.PHASE_CLEAR)
+
+        return summary
+
+    def iterCollectClearWrites(self, table, dataRowsRanges, pendingWrites, summary,
+                               changePlan=None):
+        """
+        Collects the property writes of the 'Clear' action, one chunk of cells at a time
+        (see iterCollectSetWrites())
+        """
+        # the whole span of the ranges is cleared, including the rows between them
+        clearedRanges = [{'From': dataRowsRanges[0]['From'], 'To': dataRowsRanges[-1]['To']}]
+
+        valueColumnNumber = table.headersToColumnNumberMap[table.context.HEADER_VALUE]
+        totalCells = self.countDataRows(clearedRanges) * len(table.propertyHeaders)
+        inspectedCells = 0
+
+        # prepare the setting and getting functions associated with each property data header
+        settingFuncs = []
+        gettingFuncs = []
+        for header in table.propertyHeaders:
+            settingFuncs.append(table.getPropertySettingFunction(header))
+            gettingFuncs.append(table.getPropertyGettingFunction(header))
+
+        # clear the properties one block of rows at a time, and within a block one
+        # property data column at a time
+        for rows in self.iterDataRowsBlocks(clearedRanges):
+            # the cell locations of the target cells for property setting
+            # are shared by all the property data columns
+            valueCellLocations = CellAddress.getColumnLocations(valueColumnNumber, rows)
+            for index, header in enumerate(table.propertyHeaders):
+                for valueCellLocation in valueCellLocations:
+                    self.collectWrite(header, settingFuncs[index], gettingFuncs[index],
+                                      valueCellLocation, '', 'Clear action', pendingWrites,
+                                      summary, changePlan)
+
+                inspectedCells += len(rows)
+                yield inspectedCells, totalCells
+
+    def iterApplyWrites(self, pendingWrites, transactionName, phaseName):
+        """
+        Applies the given property writes to the target spreadsheet, one chunk at a time
+
+        Notes:
+            - all the writes are grouped in a single document transaction, so they
+              are undone (and redone) in a single step.
+            - the document is recomputed once, after all the writes were applied.
+              without writes (e.g., all the properties are unchanged), neither a
+              transaction is opened nor the document is recomputed.
+            - if a write fails, or the generator is abandoned before all the writes
+              were applied, the writes applied so far are rolled back.
+            - the writes, the rollback and the recompute are marked as made by this script
+              (see SheetsContext.applyingWrites()), but not the work of the caller
+              between the chunks.
+
+        Args:
+            :param pendingWrites (list): Tuples of (setting function, target cell location,
+                property value)
+            :param transactionName (str): Name of the transaction as shown by the undo command
+            :param phaseName (str): The profiled phase of the writes (see CallProfiler)
+
+        Returns:
+            :return (generator): Tuples of (phase name, number of writes applied,
+                                 total number of writes), yielded after each chunk of writes
+        """
+        if Utils.isEmpty(pendingWrites):
             return
 
-        rangeFrom = dataRowsRanges[0]['From']    # get 'From' value from the first tuple in the list
-        rangeTo = dataRowsRanges[-1]['To']       # get 'To' value from the last tuple in the list
-
-        for row in range(rangeFrom, rangeTo + 1):
-            # the cell location of the target cell for property setting
-            # needs to be updated only once per row
-            valueCellLocation = \
-                self.requestParams.headersToColumnMap[self.requestParams.context.HEADER_VALUE] \
-                + str(row)
-            for header in self.requestParams.headersToColumnMap:
-                # iterate only over the property data headers (i.e., skip the value header)
-                if header == self.requestParams.context.HEADER_VALUE:
-                    continue
+        context = self.requestParams.context
+        self.sheetBackend.openTransaction(transactionName)
+        committed = False
+        try:
+            yield from context.iterInPhase(phaseName, self.iterWrites(pendingWrites))
+            self.sheetBackend.commitTransaction()
+            committed = True
+        finally:
+            if not committed:
+                with context.applyingWrites():
+                    self.sheetBackend.abortTransaction()
+
+        with context.profilePhase(CallProfiler.PHASE_RECOMPUTE), context.applyingWrites():
+            self.sheetBackend.recompute()
 
-                # prepare and execute the setting function associated with the given header
-                validationFunc, settingFunc = \
-                    self.requestParams.getPropertiesValidationAndSettingFunctions(header)
-                settingFunc(valueCellLocation, '')
+    def iterWrites(self, pendingWrites):
+        """
+        Applies the given property writes, one chunk at a time
 
-        App.ActiveDocument.recompute()
+        Returns:
+            :return (generator): Tuples of (number of writes applied, total number of writes)
+        """
+        context = self.requestParams.context
+        for chunkFrom in range(0, len(pendingWrites), self.CHUNK_CELLS):
+            chunk = pendingWrites[chunkFrom:chunkFrom + self.CHUNK_CELLS]
+            with context.applyingWrites():
+                for settingFunc, valueCellLocation, propertyValue in chunk:
+                    settingFunc(valueCellLocation, propertyValue)
+            yield chunkFrom + len(chunk), len(pendingWrites)
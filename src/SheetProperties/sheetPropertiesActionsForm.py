@@ -3,9 +3,14 @@
 
 import re
 import json
+import time
+from .utils import Utils
 from .mainFormUI import MainFormUI
 from .sheetPropertiesActions import SheetPropertiesActions
+from .changePlan import ChangePlan
 from .treeViewSelectionObserver import TreeViewSelectionObserver
+from .sheetChangeObserver import SheetChangeObserver
+import FreeCAD as App
 import FreeCADGui
 from PySide import QtCore
 
@@ -19,17 +24,29 @@ class SheetPropertiesActionsForm(MainFormUI):
 
     When confirmed, the properties are set according to the current request
     parameters.
+
+    The analysis of a sheet and the actions run as chunked tasks driven by a timer
+    (see startTask()), so the application stays responsive, shows their progress,
+    and lets the user cancel them.
     """
 
     # status message types
     STATUS_INFO = 0
     STATUS_ERROR = 1
 
+    # max duration of the chunks of a task run on a single timer timeout
+    TASK_SLICE_SECONDS = 0.05
+
     def __init__(self, context):
         self.context = context
         self.targetSpreadsheet = None   # selected target spreadsheet
         self.requestParams = None       # request params associated with
                                         # the selected target spreadsheet
+        self.changedSheets = []         # analyzed sheets changed since the last refresh
+        self.task = None                # running chunked task (None if none)
+        self.onTaskDone = None          # called with the result of the running task
+        self.onTaskCancelled = None     # called if the running task is cancelled
+        self.taskDisabledWidgets = []   # widgets disabled while the running task runs
 
         super(SheetPropertiesActionsForm, self).__init__()
         self.initForm()
@@ -42,10 +59,22 @@ class SheetPropertiesActionsForm(MainFormUI):
 
         self.connectSignalHandlingMethods()
 
+        # the chunks of the running task are run while the application is idle
+        self.taskTimer = QtCore.QTimer()
+        self.taskTimer.timeout.connect(self.onTaskTimeout)
+
         # Install a selection observer
         self.treeViewSelectionObserver = TreeViewSelectionObserver(self)
         FreeCADGui.Selection.addObserver(self.treeViewSelectionObserver)
 
+        # Install a document observer. changes of the analyzed sheets are collected
+        # and handled together once the application is idle.
+        self.sheetChangeObserver = SheetChangeObserver(self)
+        App.addDocumentObserver(self.sheetChangeObserver)
+        self.refreshTimer = QtCore.QTimer()
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.timeout.connect(self.onRefreshTimeout)
+
         # sync selections in the right direction with a particular order (tree view gets priority)
         if self.context.getSelectedSheet() is not None:
             self.syncComboBoxFromTreeViewSelection()
@@ -65,6 +94,11 @@ class SheetPropertiesActionsForm(MainFormUI):
         # make the window visible
         self.show()
 
+        # analyze the remaining sheets while the application is idle, one sheet at a time
+        self.prefetchTimer = QtCore.QTimer()
+        self.prefetchTimer.timeout.connect(self.onPrefetchTimeout)
+        self.prefetchTimer.start(0)
+
     def initTargetSheetSelector(self):
         """
         Populates the pop-up menu for selecting the target spreadsheet from
@@ -88,7 +122,9 @@ class SheetPropertiesActionsForm(MainFormUI):
         self.rangeToRowSpinBox.valueChanged[str].connect(self.onRangeToRowSpinBoxValueChanged)
         self.setPropertiesPushButton.clicked.connect(self.onSetProperties)
         self.clearPropertiesPushButton.clicked.connect(self.onClearProperties)
+        self.previewPropertiesPushButton.clicked.connect(self.onPreviewProperties)
         self.statusRefreshPushButton.clicked.connect(self.onRefreshStatus)
+        self.taskCancelPushButton.clicked.connect(self.onCancelTask)
         self.dismissPushButton.clicked.connect(self.onDismiss)
 
 
@@ -157,8 +193,11 @@ class SheetPropertiesActionsForm(MainFormUI):
         if self.requestParams.hasValidHeaders:
             statusMessage = 'Valid headers found for sheet \'{0}\' at:'.format(self.targetSpreadsheet.Label)
             self.appendStatus(statusMessage)
-            statusMessage = '\t' + str(self.requestParams.headersToLocMap) + '\n'
-            self.appendStatus(statusMessage)
+            # one line per table of the sheet
+            for table in self.requestParams.tables:
+                statusMessage = '\t' + str(table.headersToLocMap)
+                self.appendStatus(statusMessage)
+            self.appendStatus('')
         else:
             statusMessage = 'Invalid headers for sheet \'{0}\':'.format(self.targetSpreadsheet.Label)
             self.appendStatus(statusMessage, self.STATUS_ERROR)
@@ -182,9 +221,16 @@ class SheetPropertiesActionsForm(MainFormUI):
             # the values in an arbitrary order.
             # sort the ranges that were found and replace the double-quotes with single-quotes
             # to make it easier to the eyes.
-            sortedRanges = json.dumps(self.requestParams.dataRowsRanges, sort_keys=True)
-            sortedRanges = re.sub('"', '\'', sortedRanges)
-            self.AutoTargetRowsRangeTextContent.setPlainText(sortedRanges)
+            # the ranges of a sheet having several tables are listed one table per line
+            tablesRanges = []
+            for table, dataRowsRanges in self.requestParams.getTablesRanges():
+                sortedRanges = json.dumps(dataRowsRanges, sort_keys=True)
+                sortedRanges = re.sub('"', '\'', sortedRanges)
+                if len(self.requestParams.tables) > 1:
+                    sortedRanges = 'Table at row {0}: {1}'.format(table.headersRowNumber,
+                                                                 sortedRanges)
+                tablesRanges.append(sortedRanges)
+            self.AutoTargetRowsRangeTextContent.setPlainText('\n'.join(tablesRanges))
         else:
             self.AutoTargetRowsRangeTextContent.clear()
 
@@ -194,15 +240,16 @@ class SheetPropertiesActionsForm(MainFormUI):
         # for the custom range spin boxes to be 1
         rangeFromRowSpinBoxMinimum = 1
         rangeToRowSpinBoxMinimum = 1
-        rangeFromRowSpinBoxMaximum = self.requestParams.MAX_SEARCH_ROW
-        rangeToRowSpinBoxMaximum = self.requestParams.MAX_SEARCH_ROW
+        rangeFromRowSpinBoxMaximum = self.requestParams.MAX_SHEET_ROW
+        rangeToRowSpinBoxMaximum = self.requestParams.MAX_SHEET_ROW
         rangeFromRowSpinBoxValue = 1
         rangeToRowSpinBoxValue = 1
         if self.requestParams.hasValidHeaders:
             # both rangeFromRowSpinBox and rangeToRowSpinBox must have values higher than the headers row number
             rangeFromRowSpinBoxMinimum = self.requestParams.headersRowNumber + 1
             rangeToRowSpinBoxMinimum = self.requestParams.headersRowNumber + 1
-            if self.requestParams.hasValidPropertiesData:
+            # the custom range applies to the first table of the sheet
+            if not Utils.isEmpty(self.requestParams.dataRowsRanges):
                 # bound the data rows ranges that were found (by taking th extreme values)
                 rangeFromRowSpinBoxValue = self.requestParams.dataRowsRanges[0]['From']
                 rangeToRowSpinBoxValue = self.requestParams.dataRowsRanges[-1]['To']
@@ -236,11 +283,14 @@ class SheetPropertiesActionsForm(MainFormUI):
 
     def setActionsAvailability(self):
 
-        # enable the 'set' properties action based on the validity of the target sheet
+        # enable the 'set' properties action and its preview based on the validity of the
+        # target sheet
         if self.requestParams.hasValidHeaders and self.requestParams.hasValidPropertiesData:
             self.setPropertiesPushButton.setEnabled(True)
+            self.previewPropertiesPushButton.setEnabled(True)
         else:
             self.setPropertiesPushButton.setEnabled(False)
+            self.previewPropertiesPushButton.setEnabled(False)
 
         # enable the 'clear' properties action based on the validity of the target sheet
         if self.requestParams.hasValidHeaders:
@@ -263,15 +313,29 @@ class SheetPropertiesActionsForm(MainFormUI):
             print('handleTargetSpreadsheetChanged(): Internal Error: a valid target spreadsheet is expected')
             return
 
+        # a sheet that was not analyzed yet is analyzed first, without blocking the
+        # application. it is handled again once its analysis is complete.
+        if self.targetSpreadsheet not in self.context.sheetToRequestParamsMap:
+            self.requestParams = None
+            self.clearStatus()
+            self.appendStatus('Analyzing sheet \'{0}\'...'.format(self.targetSpreadsheet.Label))
+            self.startTask(
+                self.context.sheetToRequestParamsMap.iterAnalysis(self.targetSpreadsheet),
+                lambda requestParams: self.handleTargetSpreadsheetChanged(),
+                self.onAnalysisCancelled)
+            return
+
         # for convenience, keep a local copy of the reference to the current requestParams in SheetPropertiesActionsForm
         self.requestParams = self.context.sheetToRequestParamsMap[self.targetSpreadsheet]
 
         # perform operations based on the validity of the headers and data rows of the selected target sheet
         self.displayStatusMessage()
+        self.displayAliasConflicts()
         self.displayDataRowsRanges()
         self.setValueAndMinimumForCustomRowsRange()
         self.setDefaultRowsRangeSettingMode()
         self.setActionsAvailability()
+        self.displayProfilingSummary()
 
     def onSelectSheetComboBoxCurrentIndexChanged(self, selectedIndex):
         # sync and handle selected target sheet
@@ -317,11 +381,14 @@ class SheetPropertiesActionsForm(MainFormUI):
             return
 
         # perform the actual cells properties setting based on the relevant request parameters
+        # in 'Auto' mode all the tables of the sheet are set together, otherwise the
+        # custom range of the first table
         sheetPropertyActions = SheetPropertiesActions(self.requestParams)
         if self.targetRowsRangeRadioButtonsGroup.checkedButton().text() == 'Auto':
-            sheetPropertyActions.readAndSetProperties(self.requestParams.dataRowsRanges)
+            task = sheetPropertyActions.iterReadAndSetTables(self.requestParams.getTablesRanges())
         else:
-            sheetPropertyActions.readAndSetProperties(self.getCustomDataRowsRange())
+            task = sheetPropertyActions.iterReadAndSetProperties(self.getCustomDataRowsRange())
+        self.startTask(task, lambda summary: self.displayActionSummary('Set', summary))
 
     def onClearProperties(self):
 
@@ -333,18 +400,256 @@ class SheetPropertiesActionsForm(MainFormUI):
         # clear the properties of the target cells based on the relevant request parameters
         sheetPropertyActions = SheetPropertiesActions(self.requestParams)
         if self.targetRowsRangeRadioButtonsGroup.checkedButton().text() == 'Auto':
-            sheetPropertyActions.clearProperties(self.requestParams.dataRowsRanges)
+            task = sheetPropertyActions.iterClearTables(self.requestParams.getTablesRanges())
         else:
-            sheetPropertyActions.clearProperties(self.getCustomDataRowsRange())
+            task = sheetPropertyActions.iterClearProperties(self.getCustomDataRowsRange())
+        self.startTask(task, lambda summary: self.displayActionSummary('Clear', summary))
+
+    def onPreviewProperties(self):
+
+        # expecting valid headers for the selected target sheet
+        if not self.requestParams.hasValidPropertiesData:
+            print('onPreviewProperties(): Internal Error. The \'Preview\' action button was '
+                  'supposed to be disabled')
+            return
+
+        # plan the changes the 'Set' action would make with the same request parameters,
+        # without changing the sheet
+        sheetPropertyActions = SheetPropertiesActions(self.requestParams)
+        if self.targetRowsRangeRadioButtonsGroup.checkedButton().text() == 'Auto':
+            tablesRanges = self.requestParams.getTablesRanges()
+        else:
+            tablesRanges = [(self.requestParams, self.getCustomDataRowsRange())]
+        task = sheetPropertyActions.iterPlanReadAndSetTables(tablesRanges)
+        self.startTask(task, self.displayChangePlan)
+
+    def displayChangePlan(self, changePlan):
+        """Lists the changes of the 'Set' action planned by a preview, except the unchanged ones"""
 
-    def onRefreshStatus(self):
-        # REVISIT: Improve implementation to show the updated status of the selected sheet
-        print('onRefreshStatus() entered')
         self.clearStatus()
+        statusMessage = '\'Set\' would change on sheet \'{0}\':'.format(
+            self.targetSpreadsheet.Label)
+        self.appendStatus(statusMessage)
+        for change in changePlan.changes:
+            if change['Change'] == ChangePlan.CHANGE_UNCHANGED:
+                continue
+            statusMessage = '\t{0} {1}: \'{2}\' -> \'{3}\' ({4}: {5})'.format(
+                change['Cell'], change['Property'], change['OldValue'], change['NewValue'],
+                change['Change'], change['Reason'])
+            if change['Change'] == ChangePlan.CHANGE_IGNORED:
+                self.appendStatus(statusMessage, self.STATUS_ERROR)
+            else:
+                self.appendStatus(statusMessage)
+
+        summary = changePlan.getSummary()
+        statusMessage = '{0} set, {1} cleared, {2} unchanged, {3} ignored'.format(
+            summary[ChangePlan.CHANGE_SET], summary[ChangePlan.CHANGE_CLEARED],
+            summary[ChangePlan.CHANGE_UNCHANGED], summary[ChangePlan.CHANGE_IGNORED])
+        self.appendStatus(statusMessage)
+        self.displayProfilingSummary()
+
+    def displayActionSummary(self, actionName, summary):
+        statusMessage = '\'{0}\' done on sheet \'{1}\': {2} set, {3} cleared, {4} unchanged'.format(
+            actionName, self.targetSpreadsheet.Label,
+            summary[SheetPropertiesActions.SUMMARY_SET],
+            summary[SheetPropertiesActions.SUMMARY_CLEARED],
+            summary[SheetPropertiesActions.SUMMARY_UNCHANGED])
+        self.appendStatus(statusMessage)
+        self.displayAliasConflicts()
+        self.displayProfilingSummary()
+
+    def displayAliasConflicts(self):
+        """
+        Displays the aliases of the target sheet claimed by more than one of its cells
+        (such aliases are not set)
+        """
+        conflicts = self.context.aliasIndex.getConflicts(self.targetSpreadsheet.Label)
+        for alias, owners in sorted(conflicts.items()):
+            statusMessage = 'Alias \'{0}\' is claimed by several cells: {1}'.format(
+                alias, ', '.join(owners))
+            self.appendStatus(statusMessage, self.STATUS_ERROR)
+
+    def displayProfilingSummary(self):
+        """
+        Displays the calls recorded by the profiler since the previous summary, if profiling
+        is enabled. The same stats are also printed as JSON on the 'Report View' panel.
+        """
+        profiler = self.context.profiler
+        if profiler is None or Utils.isEmpty(profiler.stats):
+            return
+
+        self.appendStatus('\nProfiling summary:')
+        for line in profiler.formatSummary():
+            self.appendStatus(line)
+        print('SheetProperties profile: ' + json.dumps(profiler.getSummary(), sort_keys=True))
+
+        profiler.reset()
+
+    def onRefreshStatus(self):
+        # a sheet whose analysis was cancelled is analyzed again
+        if self.requestParams is None:
+            self.handleTargetSpreadsheetChanged()
+            return
+
+        # re-inspect only the cells of the target sheet that changed since the last analysis
+        self.requestParams.refresh()
+        self.handleTargetSpreadsheetChanged()
+
+    def startTask(self, task, onTaskDone, onTaskCancelled=None):
+        """
+        Runs a chunked task while the application is idle
+
+        The chunks of the task are run by the task timer, i.e., on the GUI thread like all
+        the other calls to the FreeCAD API. The widgets starting other work are disabled
+        while the task runs, and the task can be cancelled with the Cancel button.
+
+        Args:
+            :param task (generator): Yields a progress tuple of (phase name, work done,
+                total work) after each chunk of work, and returns the result of the task
+            :param onTaskDone (function): Called with the result of the task when complete
+            :param onTaskCancelled (function): Optional. Called if the task is cancelled
+        """
+        self.task = task
+        self.onTaskDone = onTaskDone
+        self.onTaskCancelled = onTaskCancelled
+
+        self.taskDisabledWidgets = [widget for widget in self.getTaskConflictingWidgets()
+                                    if widget.isEnabled()]
+        for widget in self.taskDisabledWidgets:
+            widget.setEnabled(False)
+        self.taskCancelPushButton.setEnabled(True)
+        # show a busy indicator until the first progress report
+        self.taskProgressBar.setRange(0, 0)
+
+        self.taskTimer.start(0)
+
+    def getTaskConflictingWidgets(self):
+        """Returns the widgets starting work that cannot run along with a running task"""
+        return [self.selectSheetComboBox,
+                self.AutoTargetRowsRangeRadioButton, self.CustomTargetRowsRangeRadioButton,
+                self.rangeFromRowSpinBox, self.rangeToRowSpinBox,
+                self.setPropertiesPushButton, self.clearPropertiesPushButton,
+                self.previewPropertiesPushButton, self.statusRefreshPushButton]
+
+    def onTaskTimeout(self):
+        """Called by the task timer. Runs the chunks of the running task for a short while."""
+
+        deadline = time.perf_counter() + self.TASK_SLICE_SECONDS
+        try:
+            while True:
+                phaseName, workDone, totalWork = next(self.task)
+                if time.perf_counter() >= deadline:
+                    break
+        except StopIteration as e:
+            onTaskDone = self.onTaskDone
+            self.finishTask()
+            onTaskDone(e.value)
+            return
+        except Exception as e:
+            self.finishTask()
+            self.appendStatus('The task failed: {0}'.format(e), self.STATUS_ERROR)
+            return
+
+        self.taskProgressBar.setRange(0, totalWork)
+        self.taskProgressBar.setValue(workDone)
+        self.taskProgressBar.setFormat(phaseName + ': %p%')
+
+    def onCancelTask(self):
+        """Cancels the running task. The writes of a cancelled action are rolled back."""
+
+        if self.task is None:
+            return
+
+        task = self.task
+        onTaskCancelled = self.onTaskCancelled
+        self.finishTask()
+        task.close()
+        self.appendStatus('Cancelled', self.STATUS_ERROR)
+        if onTaskCancelled is not None:
+            onTaskCancelled()
+
+    def finishTask(self):
+        """Stops running the current task, and restores the widgets disabled by startTask()"""
+
+        self.taskTimer.stop()
+        self.task = None
+        self.onTaskDone = None
+        self.onTaskCancelled = None
+
+        for widget in self.taskDisabledWidgets:
+            widget.setEnabled(True)
+        self.taskDisabledWidgets = []
+        self.taskCancelPushButton.setEnabled(False)
+        self.taskProgressBar.setRange(0, 1)
+        self.taskProgressBar.reset()
+
+        # handle the sheets changes collected while the task was running
+        if not Utils.isEmpty(self.changedSheets):
+            self.refreshTimer.start(0)
+
+    def onAnalysisCancelled(self):
+        """Called when the analysis of the target sheet was cancelled"""
+
+        statusMessage = 'Sheet \'{0}\' was not analyzed. Press Refresh to analyze it'.format(
+            self.targetSpreadsheet.Label)
+        self.appendStatus(statusMessage, self.STATUS_ERROR)
+
+        # nothing is allowed until the sheet is analyzed
+        self.AutoTargetRowsRangeTextContent.clear()
+        self.enableCustomDataRowsRangeSetting(False)
+        self.AutoTargetRowsRangeRadioButton.setEnabled(False)
+        self.CustomTargetRowsRangeRadioButton.setEnabled(False)
+        self.setPropertiesPushButton.setEnabled(False)
+        self.clearPropertiesPushButton.setEnabled(False)
+        self.previewPropertiesPushButton.setEnabled(False)
+
+    def onSheetChanged(self, sheet):
+        """Called by the document observer when the cells of a sheet have changed"""
+
+        # the aliases and display units set by this script do not change the content
+        if self.context.isApplyingWrites():
+            return
+
+        # sheets that were not analyzed yet will be analyzed with their current content
+        if sheet not in self.context.sheetToRequestParamsMap:
+            return
+
+        if sheet not in self.changedSheets:
+            self.changedSheets.append(sheet)
+        self.refreshTimer.start(0)
+
+    def onRefreshTimeout(self):
+        """Called by the refresh timer once the application is idle after sheets changes"""
+
+        # the changes are handled once the running task is done (see finishTask())
+        if self.task is not None:
+            return
+
+        changedSheets = self.changedSheets
+        self.changedSheets = []
+        for sheet in changedSheets:
+            requestParams = self.context.sheetToRequestParamsMap[sheet]
+            if requestParams.refresh() and sheet == self.targetSpreadsheet:
+                self.handleTargetSpreadsheetChanged()
+
+    def onPrefetchTimeout(self):
+        """Called by the prefetch timer while the application is idle"""
+
+        # let the running task use the idle time
+        if self.task is not None:
+            return
+
+        if not self.context.sheetToRequestParamsMap.prefetchNext():
+            # all the known sheets were analyzed
+            self.prefetchTimer.stop()
 
     def onSetSelection(self, doc):
         """Called by the selection observer when a new selection is done in the tree view"""
 
+        # the target sheet cannot change while a task is running on it
+        if self.task is not None:
+            return
+
         if doc == self.context.activeDocument.Name:
             # Sync the selection in the tree view with the pop-up menu
             self.syncComboBoxFromTreeViewSelection()
@@ -369,7 +674,23 @@ class SheetPropertiesActionsForm(MainFormUI):
         # Cleanup
         # -----------------------------------------------------------------------
 
+        # Cancel the running task, if any (the writes of an action are rolled back)
+        if self.task is not None:
+            task = self.task
+            self.finishTask()
+            task.close()
+
         # Uninstall the selection observer
         FreeCADGui.Selection.removeObserver(self.treeViewSelectionObserver)
 
+        # Uninstall the document observer
+        App.removeDocumentObserver(self.sheetChangeObserver)
+        self.refreshTimer.stop()
+
+        # Stop analyzing the remaining sheets
+        self.prefetchTimer.stop()
+
+        # Save the analysis results of this session
+        self.context.analysisCache.save()
+
         return self
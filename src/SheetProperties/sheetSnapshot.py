@@ -0,0 +1,187 @@
+# sheetSnapshot.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import hashlib
+from .cellAddress import CellAddress
+
+class SheetSnapshot:
+    """
+    Holds a read-only copy of the populated cells of a spreadsheet.
+
+    The cells are read from the spreadsheet once, when the snapshot is taken, so
+    scanning the headers and the data rows of the spreadsheet does not need to call
+    into the document for every inspected cell.
+
+    Attributes:
+        sheetBackend            -- SheetBackend of the spreadsheet this snapshot was taken from
+        maxSearchRow            -- number of rows of the search window
+        maxSearchCol            -- number of columns of the search window (the window is read
+                                   only if the spreadsheet cannot report its non-empty cells)
+        iterReadCells()         -- reads the cells one chunk at a time (when deferRead is True,
+                                   the cells are read only by consuming this generator)
+        rows                    -- dictionary of {row number : {column number : cell content}}
+                                   pairs containing only the non-empty cells
+        maxRow                  -- highest row number having a non-empty cell (0 if none)
+        maxCol                  -- highest column number having a non-empty cell (0 if none)
+        getContents()           -- returns the content of a cell given its row and column numbers
+        textIndex               -- dictionary of {normalized cell content : cells locations}
+                                   pairs, built on the first call to locate()
+        getColumnContents()     -- returns the contents of a column for a range of rows
+        iterCells()             -- iterates over the non-empty cells in row-major order
+        locate()                -- returns the locations of the cells having a given text
+        fingerprint()           -- returns a digest of the content of the non-empty cells
+        getChangedCells()       -- returns the cells that differ from another snapshot
+    """
+
+    CHUNK_CELLS = 1024      # number of cells read between two progress reports
+
+    def __init__(self, sheetBackend, maxSearchRow, maxSearchCol, deferRead=False):
+        self.sheetBackend = sheetBackend
+        self.rows = {}
+        self.maxRow = 0
+        self.maxCol = 0
+        self.textIndex = None
+        self.maxSearchRow = maxSearchRow
+        self.maxSearchCol = maxSearchCol
+        if not deferRead:
+            self.readCells()
+
+    def readCells(self):
+        """Reads all the non-empty cells of the spreadsheet (see iterReadCells())"""
+        for _ in self.iterReadCells():
+            pass
+
+    def iterReadCells(self):
+        """
+        Reads all the non-empty cells of the spreadsheet, one chunk of cells at a time
+
+        Notes:
+            - some spreadsheets cannot report their non-empty cells (e.g., in older
+              versions of FreeCAD). in this case every cell inside the search window
+              is read once.
+
+        Returns:
+            :return (generator): Tuples of (number of cells read, total number of cells),
+                                 yielded after each chunk of cells
+        """
+        cellLocations = self.sheetBackend.getCellLocations()
+
+        if cellLocations is not None:
+            cellLocations = list(cellLocations)
+            for index, cellLoc in enumerate(cellLocations, 1):
+                row, col = CellAddress.fromLocation(cellLoc)
+                self.addCell(row, col, self.sheetBackend.getContents(cellLoc))
+                if index % self.CHUNK_CELLS == 0:
+                    yield index, len(cellLocations)
+        else:
+            rows = range(1, self.maxSearchRow + 1)
+            for col in range(1, self.maxSearchCol + 1):
+                for row, cellLoc in zip(rows, CellAddress.getColumnLocations(col, rows)):
+                    self.addCell(row, col, self.sheetBackend.getContents(cellLoc))
+                yield col * self.maxSearchRow, self.maxSearchCol * self.maxSearchRow
+
+    def addCell(self, row, col, cellContent):
+        """Records the content of a single cell, ignoring empty cells"""
+        if cellContent == '':
+            return
+
+        self.rows.setdefault(row, {})[col] = cellContent
+        self.maxRow = max(self.maxRow, row)
+        self.maxCol = max(self.maxCol, col)
+
+    def getContents(self, row, col):
+        """Returns the content of the given cell, or '' if the cell is empty"""
+        rowCells = self.rows.get(row)
+        if rowCells is None:
+            return ''
+
+        return rowCells.get(col, '')
+
+    def getColumnContents(self, col, fromRow, toRow):
+        """
+        Returns the contents of a column for a range of rows, in a single pass
+
+        Args:
+            :param col (int): Number of the column
+            :param fromRow (int): First row number of the range
+            :param toRow (int): Row number following the last row of the range
+
+        Returns:
+            :return (list): Content of each cell of the range ('' for empty cells)
+        """
+        emptyRow = {}
+        rows = self.rows
+        return [rows.get(row, emptyRow).get(col, '') for row in range(fromRow, toRow)]
+
+    def iterCells(self, maxRow=None, maxCol=None):
+        """
+        Iterates over the non-empty cells in row-major order
+
+        Args:
+            :param maxRow (int): Optional. Cells on rows above this row number are skipped
+            :param maxCol (int): Optional. Cells on columns above this column number are skipped
+
+        Returns:
+            :return (generator): Tuples of (row number, column number, cell content)
+        """
+        for row in sorted(self.rows):
+            if maxRow is not None and row > maxRow:
+                break
+            rowCells = self.rows[row]
+            for col in sorted(rowCells):
+                if maxCol is not None and col > maxCol:
+                    break
+                yield row, col, rowCells[col]
+
+    def fingerprint(self):
+        """
+        Returns a digest of the content of the non-empty cells.
+
+        Two snapshots having the same fingerprint have the same non-empty cells
+        with the same content.
+        """
+        digest = hashlib.sha1()
+        for row, col, cellContent in self.iterCells():
+            digest.update('{0},{1}:{2}\n'.format(row, col, cellContent).encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def getChangedCells(self, other):
+        """
+        Returns the cells whose content differs between this snapshot and another one
+
+        Args:
+            :param other (SheetSnapshot): A snapshot of the same spreadsheet
+
+        Returns:
+            :return (set): Tuples of (row number, column number) of the changed cells
+        """
+        changedCells = set()
+        for row in set(self.rows) | set(other.rows):
+            rowCells = self.rows.get(row, {})
+            otherRowCells = other.rows.get(row, {})
+            if rowCells == otherRowCells:
+                continue
+            for col in set(rowCells) | set(otherRowCells):
+                if rowCells.get(col, '') != otherRowCells.get(col, ''):
+                    changedCells.add((row, col))
+
+        return changedCells
+
+    def locate(self, text):
+        """
+        Returns the locations of the cells whose content matches the given text
+
+        Notes:
+            - the match is case insensitive.
+            - the text index is built once, on the first call.
+
+        Returns:
+            :return (list): Tuples of (row number, column number) in row-major order
+        """
+        if self.textIndex is None:
+            self.textIndex = {}
+            for row, col, cellContent in self.iterCells():
+                self.textIndex.setdefault(cellContent.lower(), []).append((row, col))
+
+        return self.textIndex.get(text.lower(), [])
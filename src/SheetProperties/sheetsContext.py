@@ -0,0 +1,164 @@
+# sheetsContext.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from collections import namedtuple
+from contextlib import contextmanager
+from .lazyRequestParamsMap import LazyRequestParamsMap
+from .analysisCache import AnalysisCache
+from .validationCache import ValidationCache
+from .aliasIndex import AliasIndex
+from .profilingSheetBackend import ProfilingSheetBackend
+
+# names of the methods associated with a cell property data header
+PropertyFunctions = namedtuple('PropertyFunctions', ['settingFuncName', 'validationFuncName',
+                                                     'gettingFuncName',
+                                                     'columnValidationFuncName'])
+
+class SheetsContext:
+    """
+    Context of this script. Common to all sheets.
+
+    This base context does not depend on FreeCAD. Its sheets are expected to be
+    SheetBackend objects (e.g., InMemorySheetBackend). ActiveDocumentSheets extends it
+    for the spreadsheets of a FreeCAD document.
+
+    Attributes:
+        HEADER_UNITS                -- constant string defining the expected string for this header
+        HEADER_ALIAS                -- constant string defining the expected string for this header
+        HEADER_VALUE                -- constant string defining the expected string for this header
+        sheetToRequestParamsMap     -- maps spreadsheet reference to request params reference.
+                                       request params are created on first lookup
+        sheetLabelToSheetMap        -- maps spreadsheet label to spreadsheet reference
+        headerToFunctionsMap        -- maps headers to respective setting, validation,
+                                       getting and column validation functions
+        analysisCache               -- cache of the analysis results of the sheets
+        validationCache             -- cache of the validation results of property data cells,
+                                       shared by all the sheets (exposes hits and misses counters)
+        profiler                    -- CallProfiler recording the sheets calls and the
+                                       validations (None when profiling is disabled)
+        aliasIndex                  -- AliasIndex of the aliases claimed in the sheets
+                                       analyzed so far
+        writingDepth                -- number of nested applyingWrites() blocks running
+        getSheets()                 -- returns all the spreadsheets of this context
+        createSheetBackend()        -- returns a new SheetBackend of a spreadsheet
+        getSheetBackend()           -- returns the SheetBackend through which a spreadsheet
+                                       is accessed (wrapped by a ProfilingSheetBackend
+                                       when profiling is enabled)
+        profilePhase()              -- context manager attributing the profiled calls to a phase
+        iterInPhase()               -- runs the steps of a chunked task in a profiled phase
+        applyingWrites()            -- context manager marking the writes of this script
+        isApplyingWrites()          -- checks if this script is writing to the sheets
+    """
+
+    # Constants
+    HEADER_UNITS = 'Units'
+    HEADER_ALIAS = 'Alias'
+    HEADER_VALUE = 'Value'
+
+    # Useful maps
+    # for each cell property data header associate a PropertyFunctions tuple in the format of:
+    #   Header name: (setting method name, validation method name, getting method name,
+    #                 column validation method name)
+    # it is assumed that the setting and getting methods belong to a 'SheetBackend'
+    # object, and the validation methods belong to a 'RequestParameters' object.
+    headerToFunctionsMap = {HEADER_UNITS: PropertyFunctions('setDisplayUnit', 'validateUnits',
+                                                            'getDisplayUnit',
+                                                            'validateUnitsColumn'),
+                            HEADER_ALIAS: PropertyFunctions('setAlias', 'validateAlias',
+                                                            'getAlias',
+                                                            'validateAliasColumn')}
+
+    def __init__(self, sheets, analysisCache=None, profiler=None):
+        self.sheets = list(sheets)
+        self.profiler = profiler
+
+        # by default, the analysis results are cached for this context only
+        self.analysisCache = analysisCache if analysisCache is not None else AnalysisCache()
+
+        # Each distinct property data is validated once per session
+        self.validationCache = ValidationCache()
+
+        # the claims of each sheet are added as the sheet is analyzed
+        self.aliasIndex = AliasIndex()
+
+        # the changes made by the writes of this script are not changes of the content
+        self.writingDepth = 0
+
+        # Initialize useful maps
+        # An instance of RequestParameters is associated to each known sheet only
+        # when the sheet is first looked up. This way, the request parameters are
+        # cached for each sheet, but only the sheets actually used are analyzed.
+        self.sheetToRequestParamsMap = LazyRequestParamsMap(self, self.sheets)
+        self.sheetLabelToSheetMap = {}
+        for sheet in self.sheets:
+            self.sheetLabelToSheetMap.update({sheet.Label: sheet})
+
+    def getSheets(self):
+        """Returns all the spreadsheets of this context"""
+
+        return self.sheets
+
+    def createSheetBackend(self, sheet):
+        """Returns a new SheetBackend of the given spreadsheet"""
+
+        return sheet
+
+    def getSheetBackend(self, sheet):
+        """Returns the SheetBackend through which the given spreadsheet is accessed"""
+
+        sheetBackend = self.createSheetBackend(sheet)
+        if self.profiler is not None:
+            sheetBackend = ProfilingSheetBackend(sheetBackend, self.profiler)
+
+        return sheetBackend
+
+    @contextmanager
+    def profilePhase(self, phaseName):
+        """Attributes the profiled calls made inside the 'with' block to the given phase"""
+
+        if self.profiler is None:
+            yield
+            return
+
+        with self.profiler.phase(phaseName):
+            yield
+
+    def iterInPhase(self, phaseName, steps):
+        """
+        Runs the steps of a generator in a profiled phase, one step at a time
+
+        The phase is entered only while a step runs, so the calls made by other work
+        interleaved between the steps are not attributed to this phase.
+
+        Args:
+            :param phaseName (str): The name of the phase (see CallProfiler)
+            :param steps (generator): Yields a progress tuple of (work done, total work)
+                after each step
+
+        Returns:
+            :return (generator): Tuples of (phase name, work done, total work)
+        """
+        while True:
+            with self.profilePhase(phaseName):
+                progress = next(steps, None)
+            if progress is None:
+                return
+            yield (phaseName,) + tuple(progress)
+
+    @contextmanager
+    def applyingWrites(self):
+        """
+        Marks the sheets changes made inside the 'with' block as made by this script
+        (e.g., setting aliases and display units, recomputing), so the observers of the
+        sheets changes can ignore them (see isApplyingWrites())
+        """
+        self.writingDepth += 1
+        try:
+            yield
+        finally:
+            self.writingDepth -= 1
+
+    def isApplyingWrites(self):
+        """Checks if the sheets are being changed by the writes of this script"""
+
+        return self.writingDepth > 0
@@ -0,0 +1,42 @@
+# unitSymbols.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+class UnitSymbols:
+    """
+    The unit symbols and the constants known by the expressions of FreeCAD.
+
+    These names are reserved: a cell alias cannot be one of them, as the expressions
+    would read it as a quantity (e.g., 'mm', 'h', 'pi').
+
+    Attributes:
+        SYMBOLS                     -- frozenset of the unit symbols
+        CONSTANTS                   -- frozenset of the named constants
+        RESERVED_NAMES              -- frozenset of all the above
+    """
+
+    SYMBOLS = frozenset([
+        # length, area and volume
+        'nm', 'um', 'µm', 'mm', 'cm', 'dm', 'm', 'km',
+        'in', 'ft', 'thou', 'mil', 'yd', 'mi', 'sqft', 'cft', 'l', 'ml',
+        # mass
+        'ug', 'µg', 'mg', 'g', 'kg', 't', 'oz', 'lb', 'st', 'cwt',
+        # time, frequency and speed
+        's', 'ms', 'min', 'h', 'Hz', 'kHz', 'MHz', 'GHz', 'mph',
+        # angle
+        'deg', 'rad', 'gon', 'M', 'AS',
+        # electric current, temperature, amount of substance and luminous intensity
+        'A', 'mA', 'kA', 'MA', 'K', 'mK', 'uK', 'µK', 'mol', 'mmol', 'cd',
+        # force and pressure
+        'N', 'mN', 'kN', 'MN', 'lbf', 'ozf',
+        'Pa', 'kPa', 'MPa', 'GPa', 'Torr', 'mTorr', 'uTorr', 'µTorr', 'psi', 'ksi',
+        # energy and power
+        'J', 'mJ', 'kJ', 'Ws', 'kWh', 'eV', 'keV', 'MeV', 'cal', 'kcal',
+        'W', 'mW', 'kW', 'VA',
+        # electromagnetism
+        'V', 'mV', 'kV', 'Ohm', 'kOhm', 'MOhm', 'C', 'S', 'mS', 'uS', 'µS',
+        'F', 'mF', 'uF', 'µF', 'nF', 'pF', 'H', 'mH', 'uH', 'µH', 'nH',
+        'T', 'Wb'])
+
+    CONSTANTS = frozenset(['pi', 'e'])
+
+    RESERVED_NAMES = SYMBOLS | CONSTANTS
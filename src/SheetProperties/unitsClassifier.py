@@ -0,0 +1,111 @@
+# unitsClassifier.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import re
+from .unitSymbols import UnitSymbols
+
+class UnitsClassifier:
+    """
+    Classifies units strings with a simple grammar of quantities, without calling FreeCAD.
+
+    The grammar is a number, a unit expression, or a number followed by a unit
+    expression (e.g., '10', 'mm', '10 mm', 'kg/m^3', '9.81 m/s^2'). A unit expression
+    is made of factors separated by '*' or '/', each factor being a name optionally
+    raised to an integer power.
+
+    A string is:
+        - VALID if it follows the grammar and all its names are unit symbols
+          (see UnitSymbols).
+        - INVALID if it has characters no quantity may have (e.g., '10 mm!', 'm;s'), or
+          if it follows the grammar but one of its names is a constant (e.g., 'pi', 'e'),
+          which FreeCAD would read as a number rather than a unit.
+        - AMBIGUOUS otherwise (e.g., unknown names, parentheses, functions, compound
+          quantities like '1 m 20 cm'), and has to be parsed by FreeCAD
+          (see SheetBackend.validateUnits()).
+
+    Attributes:
+        VALID                       -- verdict of a valid units string
+        INVALID                     -- verdict of an invalid units string
+        AMBIGUOUS                   -- verdict of a units string the grammar cannot decide
+        classify()                  -- returns the verdict and the normalized units
+        normalize()                 -- returns the normalized units of a units string
+        classifyColumn()            -- returns the verdict and the normalized units of each
+                                       units string of a column
+    """
+
+    VALID = 'valid'
+    INVALID = 'invalid'
+    AMBIGUOUS = 'ambiguous'
+
+    KNOWN_NAMES = UnitSymbols.SYMBOLS
+    CONSTANT_NAMES = UnitSymbols.CONSTANTS
+
+    QUANTITY_PATTERN = re.compile(
+        r'\s*(?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)?\s*(?P<unit>.*?)\s*\Z')
+    UNIT_EXPRESSION_PATTERN = re.compile(
+        r'[A-Za-zµ]+(?:\^-?\d+)?(?:\s*[*/]\s*[A-Za-zµ]+(?:\^-?\d+)?)*\Z')
+    FACTOR_SEPARATOR_PATTERN = re.compile(r'\s*([*/])\s*')
+    NAME_PATTERN = re.compile(r'[A-Za-zµ]+')
+    # the characters no quantity may have (punctuation not used by the FreeCAD
+    # quantity parser, and control characters)
+    INVALID_CHARACTER_PATTERN = re.compile(r'[!?#$%&@;:=<>|~`{}\[\]\\\x00-\x08\x0a-\x1f\x7f]')
+
+    @classmethod
+    def classify(cls, units):
+        """
+        Returns the verdict of a units string and its normalized units
+
+        Args:
+            :param units (str): The candidate units string
+
+        Returns:
+            :return (tuple): The verdict (VALID, INVALID or AMBIGUOUS), and the normalized
+                             units: the number and the factors of the unit expression
+                             without the surrounding whitespace (e.g., 'kg / m^3' is
+                             normalized to 'kg/m^3').
+        """
+        normalizedUnits = units.strip()
+        if cls.INVALID_CHARACTER_PATTERN.search(units):
+            return cls.INVALID, normalizedUnits
+
+        match = cls.QUANTITY_PATTERN.match(units)
+        number, unitExpression = match.group('number'), match.group('unit')
+        if unitExpression == '':
+            if number is None:
+                return cls.AMBIGUOUS, normalizedUnits
+            return cls.VALID, number
+
+        if not cls.UNIT_EXPRESSION_PATTERN.match(unitExpression):
+            return cls.AMBIGUOUS, normalizedUnits
+
+        unitExpression = cls.FACTOR_SEPARATOR_PATTERN.sub(r'\1', unitExpression)
+        normalizedUnits = unitExpression if number is None else number + ' ' + unitExpression
+        # the names missing from the known names may still be known by FreeCAD
+        verdict = cls.VALID
+        for name in cls.NAME_PATTERN.findall(unitExpression):
+            if name in cls.CONSTANT_NAMES:
+                return cls.INVALID, normalizedUnits
+            if name not in cls.KNOWN_NAMES:
+                verdict = cls.AMBIGUOUS
+
+        return verdict, normalizedUnits
+
+    @classmethod
+    def normalize(cls, units):
+        """Returns the normalized units of a units string (see classify())"""
+        return cls.classify(units)[1]
+
+    @classmethod
+    def classifyColumn(cls, unitsList):
+        """
+        Returns the verdict and the normalized units of each units string of a column
+
+        Args:
+            :param unitsList (list): The candidate units strings
+
+        Returns:
+            :return (list): The (verdict, normalized units) tuple of each units string
+                            (see classify())
+        """
+        classify = cls.classify
+        return [classify(units) for units in unitsList]
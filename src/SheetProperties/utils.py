@@ -1,7 +1,7 @@
 # utils.py
 # LGPL license; Copyright (C) 2018 Uri Benchetrit
 
-import string
+from .cellAddress import CellAddress
 
 class Utils:
     """Utilities"""
@@ -11,18 +11,24 @@ class Utils:
         """Checks if a built-in structure is empty"""
         return False if anyStruct else True
 
+    @staticmethod
+    def runSteps(steps):
+        """
+        Runs all the steps of a generator (e.g., a chunked task) at once
+
+        Returns:
+            :return: The value returned by the generator
+        """
+        while True:
+            try:
+                next(steps)
+            except StopIteration as e:
+                return e.value
+
     @staticmethod
     def colNumberToColName(colNumber):
         """
         Converts a 1-based column number to Excel style column name
-        (i.e., 1 to 'A' up to 702 to 'ZZ')
+        (i.e., 1 to 'A', 26 to 'Z', 27 to 'AA', 702 to 'ZZ', 703 to 'AAA', and so on)
         """
-        alphabetList = string.ascii_uppercase
-        alphabetListLen = len(alphabetList)
-        d, m = divmod(colNumber-1, alphabetListLen)
-        if colNumber > alphabetListLen:
-            result = alphabetList[d-1] + alphabetList[m]
-        else:
-            result = alphabetList[colNumber-1]
-
-        return result
+        return CellAddress.getColumnName(colNumber)
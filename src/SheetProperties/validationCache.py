@@ -0,0 +1,75 @@
+# validationCache.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from collections import OrderedDict
+
+class ValidationCache:
+    """
+    Bounded cache of the validation results of property data cells.
+
+    Validating a property data cell depends only on its header and its content
+    (e.g., parsing a units string), so the results are shared by all the sheets of
+    the session. The result of a valid cell is the property value to set from its
+    content (e.g., the normalized units), and None for an invalid cell. The least
+    recently used results are evicted when the cache is full.
+
+    Attributes:
+        maxEntries              -- max number of cached validation results
+        results                 -- ordered dictionary of {(header, content) : property value}
+                                   pairs, from the least to the most recently used
+        hits                    -- number of validations answered from the cache
+        misses                  -- number of validations actually performed
+        validateColumn()        -- returns the cached or computed validation results of
+                                   many contents of a column at once
+        clear()                 -- drops all the cached results and resets the counters
+    """
+
+    DEFAULT_MAX_ENTRIES = 4096
+
+    def __init__(self, maxEntries=DEFAULT_MAX_ENTRIES):
+        self.maxEntries = maxEntries
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def validateColumn(self, header, contents, columnValidationFunc):
+        """
+        Returns the validation results of many property data cells of the same column
+
+        Args:
+            :param header (header_type_constant): The header of the column of the cells
+            :param contents (iterable): The distinct contents of the cells
+            :param columnValidationFunc (function): Validates a list of contents at once,
+                returning the property value of each one (None if invalid). Called once,
+                with the contents whose results are not cached.
+
+        Returns:
+            :return (dict): Dictionary of {cell content : property value} pairs
+        """
+        results = {}
+        missingContents = []
+        for cellContent in contents:
+            key = (header, cellContent)
+            if key not in self.results:
+                missingContents.append(cellContent)
+            else:
+                self.hits += 1
+                self.results.move_to_end(key)
+                results[cellContent] = self.results[key]
+
+        if missingContents:
+            self.misses += len(missingContents)
+            for cellContent, result in zip(missingContents,
+                                           columnValidationFunc(missingContents)):
+                results[cellContent] = result
+                self.results[(header, cellContent)] = result
+            while len(self.results) > self.maxEntries:
+                self.results.popitem(last=False)
+
+        return results
+
+    def clear(self):
+        """Drops all the cached results and resets the counters"""
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,113 @@
+# SheetPropertiesBatch.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+"""
+Spreadsheet Cells Properties Actions - headless batch mode
+
+Performs the 'Set' or 'Clear' action on all the spreadsheets of the given
+FreeCAD documents, saves the changed documents and prints a JSON summary.
+
+Usage (FreeCAD modules importable by Python):
+    python SheetPropertiesBatch.py set [--no-save] [--output results.json] a.FCStd b.FCStd
+
+Usage (dry run, writing the planned changes of every cell as CSV or JSON):
+    python SheetPropertiesBatch.py set --plan changes.csv a.FCStd b.FCStd
+
+Usage (FreeCADCmd, which does not forward command line arguments to scripts):
+    SHEET_PROPERTIES_BATCH_ARGS='["set", "a.FCStd", "b.FCStd"]' FreeCADCmd SheetPropertiesBatch.py
+
+Usage (many documents in parallel, one worker process per document):
+    python SheetPropertiesBatch.py set --jobs 8 --timeout 300 --worker-command FreeCADCmd *.FCStd
+"""
+
+__title__ = "SheetPropertiesBatch"
+__author__ = "Uri Benchetrit, <uribench@gmail.com>"
+__version__ = "1.0.7"
+__date__ = "2020-12-19"
+
+import os
+import sys
+import json
+import shlex
+import argparse
+
+# environment variable holding the command line arguments as a JSON list
+BATCH_ARGS_ENV_VAR = 'SHEET_PROPERTIES_BATCH_ARGS'
+
+def parseArgs():
+    """Parses the arguments from BATCH_ARGS_ENV_VAR if set, or from the command line"""
+
+    parser = argparse.ArgumentParser(prog='SheetPropertiesBatch',
+                                     description='Set or clear the properties of the cells '
+                                                 'of all the spreadsheets of FreeCAD documents')
+    parser.add_argument('action', choices=['set', 'clear'],
+                        help='the action to perform on every spreadsheet')
+    parser.add_argument('files', nargs='+', metavar='FILE',
+                        help='FreeCAD document (.FCStd) to process')
+    parser.add_argument('--no-save', dest='save', action='store_false',
+                        help='do not save the changed documents')
+    parser.add_argument('--output', metavar='PATH',
+                        help='also write the JSON summary to this file')
+    parser.add_argument('--dry-run', dest='dryRun', action='store_true',
+                        help='do not change the documents, report the planned changes instead')
+    parser.add_argument('--plan', metavar='PATH',
+                        help='dry run, writing the planned changes to this file '
+                             '(CSV if its extension is .csv, JSON otherwise)')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='process the documents in N parallel worker processes '
+                             '(0 for the number of CPUs)')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='max time for processing one document in parallel mode')
+    parser.add_argument('--worker-command', default=sys.executable, metavar='CMD',
+                        help='command starting a worker in parallel mode '
+                             '(e.g., FreeCADCmd). default: this Python interpreter')
+
+    if os.environ.get(BATCH_ARGS_ENV_VAR):
+        return parser.parse_args(json.loads(os.environ[BATCH_ARGS_ENV_VAR]))
+
+    return parser.parse_args()
+
+def main():
+    """Entry point"""
+
+    args = parseArgs()
+    dryRun = args.dryRun or args.plan is not None
+
+    # make the SheetProperties package importable when running from another folder
+    if '__file__' in globals():
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    if args.jobs is not None:
+        # the driver itself does not need FreeCAD. the workers run this script again,
+        # each one on a single document and without the --jobs argument.
+        from SheetProperties.parallelBatchDriver import ParallelBatchDriver
+        driver = ParallelBatchDriver(args.action, shlex.split(args.worker_command),
+                                     os.path.abspath(__file__),
+                                     args.jobs, args.timeout, args.save, dryRun)
+        results = driver.run(args.files)
+    else:
+        from SheetProperties.batchRunner import BatchRunner
+        results = BatchRunner(args.action, args.save, dryRun).run(args.files)
+
+    if args.plan:
+        from SheetProperties.changePlan import ChangePlan
+        changePlan = ChangePlan(changes=[change for documentResults in results['Documents']
+                                         for change in documentResults['Changes']])
+        changePlan.write(args.plan)
+
+    if args.output:
+        with open(args.output, 'w') as outputFile:
+            json.dump(results, outputFile, indent=2, sort_keys=True)
+
+    # the summary is printed as a single line, after any other output
+    print(json.dumps(results, sort_keys=True))
+
+    return 1 if results['Errors'] else 0
+
+# -----------------------------------------------------------------------
+# Entry point
+# -----------------------------------------------------------------------
+
+# execute main() only if this code is run as a script and not if imported as a module.
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# conftest.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import os
+import sys
+
+# the package is not installed. it is imported from the sources, without FreeCAD
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
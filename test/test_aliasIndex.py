@@ -0,0 +1,36 @@
+# test_aliasIndex.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.aliasIndex import AliasIndex
+
+
+def test_sameAliasInDifferentSheetsIsNotAConflict():
+    aliasIndex = AliasIndex()
+    aliasIndex.setSheetClaims('Sheet1', {'C2': 'length'})
+    aliasIndex.setSheetClaims('Sheet2', {'C2': 'length'})
+
+    assert not aliasIndex.isClaimedByOther('length', 'Sheet1', 'C2')
+    assert aliasIndex.getConflicts('Sheet1') == {}
+    assert aliasIndex.getConflicts('Sheet2') == {}
+
+
+def test_sameAliasInTheSameSheetIsAConflict():
+    aliasIndex = AliasIndex()
+    aliasIndex.setSheetClaims('Sheet1', {'C2': 'length', 'C3': 'length', 'C4': 'width'})
+
+    assert aliasIndex.isClaimedByOther('length', 'Sheet1', 'C2')
+    assert not aliasIndex.isClaimedByOther('width', 'Sheet1', 'C4')
+    assert aliasIndex.isClaimedByOther('width', 'Sheet1', 'C5')
+    assert aliasIndex.getConflicts('Sheet1') == {'length': ['Sheet1.C2', 'Sheet1.C3']}
+
+
+def test_replacedClaimsResolveConflicts():
+    aliasIndex = AliasIndex()
+    aliasIndex.setSheetClaims('Sheet1', {'C2': 'length', 'C3': 'length'})
+
+    aliasIndex.setSheetClaims('Sheet1', {'C2': 'length', 'C3': 'width'})
+    assert aliasIndex.getConflicts('Sheet1') == {}
+
+    aliasIndex.release('Sheet1', 'C2')
+    assert aliasIndex.getOwners('length', 'Sheet1') == []
+    assert aliasIndex.getOwners('width', 'Sheet1') == ['Sheet1.C3']
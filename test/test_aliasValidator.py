@@ -0,0 +1,29 @@
+# test_aliasValidator.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import pytest
+
+from SheetProperties.aliasValidator import AliasValidator
+
+
+@pytest.mark.parametrize('alias', ['length', 'Length_2', 'x', 'ABC123456', 'total_mm'])
+def test_validAliases(alias):
+    assert AliasValidator.isValid(alias)
+
+
+@pytest.mark.parametrize('alias, reason', [('2x', 'not an identifier'),
+                                           ('my length', 'not an identifier'),
+                                           ('_x', 'not an identifier'),
+                                           ('A1', 'a cell address'),
+                                           ('AB12', 'a cell address'),
+                                           ('AB123456', 'a cell address'),
+                                           ('mm', 'a reserved name'),
+                                           ('pi', 'a reserved name')])
+def test_invalidAliases(alias, reason):
+    assert AliasValidator.getInvalidReason(alias) == reason
+
+
+def test_validateAliasColumn():
+    aliases = ['length', 'A1', 'mm', 'width', '']
+    assert AliasValidator.validateColumn(aliases) == \
+        [AliasValidator.isValid(alias) for alias in aliases]
@@ -0,0 +1,69 @@
+# test_analysisCache.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import os
+
+from SheetProperties.analysisCache import AnalysisCache
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+from SheetProperties.sheetsContext import SheetsContext
+from SheetProperties.sheetPropertiesActions import SheetPropertiesActions
+
+CELLS = {'A1': 'Alias', 'B1': 'Units', 'C1': 'Value',
+         'A2': 'length', 'B2': 'bogus', 'A3': 'width', 'B3': 'mm',
+         'A6': 'Alias', 'B6': 'Value', 'A7': 'height'}
+
+
+def analyze(cacheFilePath, cells):
+    """Returns the sheet and its request parameters, analyzed with a cache file"""
+    sheet = InMemorySheetBackend('Sheet', cells)
+    context = SheetsContext([sheet], AnalysisCache(cacheFilePath, 'tag'))
+    return sheet, context.sheetToRequestParamsMap[sheet]
+
+
+def test_savedOnceAndReloaded(tmpdir):
+    cacheFilePath = str(tmpdir.join('SheetProperties', 'analysisCache.json'))
+    analysisCache = AnalysisCache(cacheFilePath, 'tag')
+
+    analysisCache.put('doc#Sheet', 'fingerprint', {'HeadersRowNumber': 1})
+    assert not os.path.exists(cacheFilePath)
+
+    analysisCache.save()
+    # the temporary file replaced the cache file
+    assert os.listdir(os.path.dirname(cacheFilePath)) == ['analysisCache.json']
+    assert AnalysisCache(cacheFilePath, 'tag').get('doc#Sheet', 'fingerprint') == \
+        {'HeadersRowNumber': 1}
+
+    # another fingerprint or environment does not match
+    assert AnalysisCache(cacheFilePath, 'tag').get('doc#Sheet', 'other') is None
+    assert AnalysisCache(cacheFilePath, 'other').get('doc#Sheet', 'fingerprint') is None
+
+
+def test_analysisIsRestored(tmpdir):
+    cacheFilePath = str(tmpdir.join('analysisCache.json'))
+    _, requestParams = analyze(cacheFilePath, CELLS)
+    requestParams.context.analysisCache.save()
+
+    sheet, restoredParams = analyze(cacheFilePath, CELLS)
+
+    # the ambiguous units are not validated again
+    assert 'validateUnits' not in sheet.callCounts
+    assert restoredParams.getAnalysisState() == requestParams.getAnalysisState()
+    assert [(table.headersToLocMap, dataRowsRanges)
+            for table, dataRowsRanges in restoredParams.getTablesRanges()] == \
+        [(table.headersToLocMap, dataRowsRanges)
+         for table, dataRowsRanges in requestParams.getTablesRanges()]
+
+    # the restored analysis is enough for the actions
+    SheetPropertiesActions(restoredParams).readAndSetTables(restoredParams.getTablesRanges())
+    assert sheet.aliases == {'C2': 'length', 'C3': 'width', 'B7': 'height'}
+    assert sheet.displayUnits == {'C3': 'mm'}
+
+
+def test_changedSheetIsAnalyzedAgain(tmpdir):
+    cacheFilePath = str(tmpdir.join('analysisCache.json'))
+    _, requestParams = analyze(cacheFilePath, CELLS)
+    requestParams.context.analysisCache.save()
+
+    sheet, _ = analyze(cacheFilePath, dict(CELLS, A4='depth'))
+
+    assert sheet.callCounts['validateUnits'] == 1
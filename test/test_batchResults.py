@@ -0,0 +1,26 @@
+# test_batchResults.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.batchResults import BatchResults
+
+
+def makeDocumentResults(filePath, status, summaries):
+    """Returns the results of a document whose sheets have the given summaries"""
+    return {'File': filePath, 'Status': status, 'Reason': '', 'Saved': False, 'Changes': [],
+            'Sheets': [{'Sheet': 'Sheet{0}'.format(index), 'Status': BatchResults.STATUS_DONE,
+                        'Reason': '', 'Summary': summary}
+                       for index, summary in enumerate(summaries, 1)]}
+
+
+def test_composeResults():
+    documentsResults = [
+        makeDocumentResults('a.FCStd', BatchResults.STATUS_DONE,
+                            [{'Unchanged': 1, 'Set': 2, 'Cleared': 0},
+                             {'Unchanged': 0, 'Set': 1, 'Cleared': 3}]),
+        makeDocumentResults('b.FCStd', BatchResults.STATUS_ERROR, []),
+        makeDocumentResults('c.FCStd', BatchResults.STATUS_SKIPPED, [])]
+
+    results = BatchResults.composeResults('set', documentsResults)
+
+    assert results == {'Action': 'set', 'Documents': documentsResults, 'Errors': 1,
+                       'Totals': {'Unchanged': 1, 'Set': 3, 'Cleared': 3}}
@@ -0,0 +1,47 @@
+# test_callProfiler.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import pytest
+
+from SheetProperties.callProfiler import CallProfiler
+
+
+def test_callsAreAttributedToTheCurrentPhase():
+    profiler = CallProfiler()
+    getLength = profiler.wrap('len', len)
+
+    assert getLength('abc') == 3
+    with profiler.phase(CallProfiler.PHASE_SET):
+        assert profiler.call('len', len, 'ab') == 2
+        assert profiler.call('len', len, 'a') == 1
+
+    assert profiler.currentPhase == CallProfiler.PHASE_OTHER
+    summary = profiler.getSummary()
+    assert summary[CallProfiler.PHASE_OTHER]['len']['Count'] == 1
+    assert summary[CallProfiler.PHASE_SET]['len']['Count'] == 2
+    assert sorted(argument for _, argument in summary[CallProfiler.PHASE_SET]['len']['Slowest']) \
+        == ['a', 'ab']
+
+
+def test_failedCallsAreRecorded():
+    profiler = CallProfiler()
+
+    with pytest.raises(ZeroDivisionError):
+        profiler.call('divide', lambda number: number / 0, 1)
+
+    assert profiler.stats[CallProfiler.PHASE_OTHER]['divide']['Count'] == 1
+
+
+def test_slowestCallsAreBounded():
+    profiler = CallProfiler()
+    for seconds in [0.3, 0.1, 0.5, 0.2, 0.4]:
+        profiler.record('getContents', seconds, 'A{0}'.format(int(seconds * 10)))
+
+    callSummary = profiler.getSummary()[CallProfiler.PHASE_OTHER]['getContents']
+    assert callSummary['Count'] == 5
+    assert callSummary['Seconds'] == pytest.approx(1.5)
+    assert callSummary['Slowest'] == [[0.5, 'A5'], [0.4, 'A4'], [0.3, 'A3']]
+    assert profiler.formatSummary()[0] == CallProfiler.PHASE_OTHER + ':'
+
+    profiler.reset()
+    assert profiler.getSummary() == {}
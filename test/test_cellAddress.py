@@ -0,0 +1,30 @@
+# test_cellAddress.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import pytest
+
+from SheetProperties.cellAddress import CellAddress
+
+
+@pytest.mark.parametrize('col, colName', [(1, 'A'), (26, 'Z'), (27, 'AA'), (28, 'AB'),
+                                          (702, 'ZZ'), (703, 'AAA'), (18279, 'AAAA')])
+def test_columnNameRoundTrip(col, colName):
+    assert CellAddress.getColumnName(col) == colName
+    assert CellAddress.getColumnNumber(colName) == col
+
+
+def test_locationRoundTrip():
+    assert CellAddress.fromLocation('AB27') == (27, 28)
+    assert CellAddress(27, 28).toLocation() == 'AB27'
+    assert CellAddress(70000, 1).toLocation() == 'A70000'
+
+
+@pytest.mark.parametrize('cellLoc', ['A', '12', '', 'a1'])
+def test_fromLocationRejectsInvalidLocations(cellLoc):
+    with pytest.raises(ValueError):
+        CellAddress.fromLocation(cellLoc)
+
+
+def test_getColumnLocations():
+    assert CellAddress.getColumnLocations(3, range(7, 10)) == ['C7', 'C8', 'C9']
+    assert CellAddress.getColumnLocations(3, []) == []
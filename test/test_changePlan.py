@@ -0,0 +1,38 @@
+# test_changePlan.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import csv
+import io
+import json
+
+from SheetProperties.changePlan import ChangePlan
+
+
+def makePlan():
+    """Returns a plan of a change of each kind but cleared"""
+    changePlan = ChangePlan('model.FCStd')
+    changePlan.addChange('Sheet1', 'C2', 'Alias', '', 'length', ChangePlan.CHANGE_SET, 'A2')
+    changePlan.addChange('Sheet1', 'C3', 'Units', 'mm', 'mm', ChangePlan.CHANGE_UNCHANGED, 'B3')
+    changePlan.addChange('Sheet1', 'C4', 'Units', '', '', ChangePlan.CHANGE_IGNORED,
+                         'Invalid units: m;s')
+    return changePlan
+
+
+def test_summary():
+    assert makePlan().getSummary() == {ChangePlan.CHANGE_SET: 1, ChangePlan.CHANGE_CLEARED: 0,
+                                       ChangePlan.CHANGE_UNCHANGED: 1,
+                                       ChangePlan.CHANGE_IGNORED: 1}
+
+
+def test_formats(tmpdir):
+    changePlan = makePlan()
+
+    assert json.loads(changePlan.toJSON()) == changePlan.changes
+    rows = list(csv.DictReader(io.StringIO(changePlan.toCSV())))
+    assert rows == changePlan.changes
+    assert rows[0]['File'] == 'model.FCStd'
+
+    filePath = str(tmpdir.join('changes.csv'))
+    changePlan.write(filePath)
+    with open(filePath, newline='') as planFile:
+        assert planFile.readline().rstrip('\n') == ','.join(ChangePlan.FIELDS)
@@ -0,0 +1,58 @@
+# test_inMemorySheetBackend.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+
+
+def test_contents():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias', 'B2': '10', 'C3': ''})
+
+    assert sorted(sheet.getCellLocations()) == ['A1', 'B2']
+    assert sheet.getContents('B2') == '10'
+    assert sheet.getContents('Z9') == ''
+    assert sheet.callCounts == {'getCellLocations': 1, 'getContents': 2}
+
+
+def test_cellLocationsNotReported():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias'})
+    sheet.reportsCellLocations = False
+
+    assert sheet.getCellLocations() is None
+
+
+def test_cacheKey():
+    assert InMemorySheetBackend('Sheet', documentName='Doc').getCacheKey() == 'Doc#Sheet'
+
+
+def test_properties():
+    sheet = InMemorySheetBackend()
+    sheet.setAlias('C2', 'length')
+    sheet.setDisplayUnit('C2', 'mm')
+    assert (sheet.getAlias('C2'), sheet.getDisplayUnit('C2')) == ('length', 'mm')
+
+    sheet.setAlias('C2', '')
+    sheet.setDisplayUnit('C2', '')
+    assert (sheet.getAlias('C2'), sheet.getDisplayUnit('C2')) == (None, None)
+
+
+def test_validateUnits():
+    sheet = InMemorySheetBackend()
+
+    assert sheet.validateUnits('10 mm')
+    assert not sheet.validateUnits('10 bogus')
+
+
+def test_transactions():
+    sheet = InMemorySheetBackend()
+    sheet.openTransaction('First')
+    sheet.setAlias('C2', 'length')
+    sheet.commitTransaction()
+
+    sheet.openTransaction('Second')
+    sheet.setAlias('C3', 'width')
+    sheet.abortTransaction()
+    sheet.recompute()
+
+    assert sheet.aliases == {'C2': 'length'}
+    assert sheet.committedTransactions == ['First']
+    assert sheet.recomputeCount == 1
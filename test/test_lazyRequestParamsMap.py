@@ -0,0 +1,51 @@
+# test_lazyRequestParamsMap.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+from SheetProperties.sheetsContext import SheetsContext
+
+CELLS = {'A1': 'Alias', 'B1': 'Value', 'A2': 'length'}
+
+
+def test_sheetsAreAnalyzedOnFirstLookup():
+    sheets = [InMemorySheetBackend('Sheet1', CELLS), InMemorySheetBackend('Sheet2', CELLS)]
+    context = SheetsContext(sheets)
+    requestParamsMap = context.sheetToRequestParamsMap
+    assert [sheet.callCounts for sheet in sheets] == [{}, {}]
+
+    requestParams = requestParamsMap[sheets[0]]
+
+    assert requestParams.hasValidHeaders
+    assert requestParamsMap.pendingSheets == [sheets[1]]
+    assert sheets[1].callCounts == {}
+
+    # the next lookups do not analyze the sheet again
+    getCellLocationsCalls = sheets[0].callCounts['getCellLocations']
+    assert requestParamsMap[sheets[0]] is requestParams
+    assert sheets[0].callCounts['getCellLocations'] == getCellLocationsCalls
+    assert sheets[1] not in requestParamsMap
+
+
+def test_prefetchAnalyzesThePendingSheets():
+    sheets = [InMemorySheetBackend('Sheet1', CELLS), InMemorySheetBackend('Sheet2', CELLS)]
+    requestParamsMap = SheetsContext(sheets).sheetToRequestParamsMap
+    requestParams = requestParamsMap[sheets[1]]
+
+    while requestParamsMap.prefetchNext():
+        pass
+
+    assert requestParamsMap.pendingSheets == []
+    assert requestParamsMap[sheets[1]] is requestParams
+    assert requestParamsMap[sheets[0]].hasValidHeaders
+
+
+def test_abandonedAnalysisLeavesNoResults():
+    sheet = InMemorySheetBackend('Sheet', CELLS)
+    requestParamsMap = SheetsContext([sheet]).sheetToRequestParamsMap
+
+    analysis = requestParamsMap.iterAnalysis(sheet)
+    next(analysis)
+    analysis.close()
+
+    assert sheet not in requestParamsMap
+    assert requestParamsMap.pendingSheets == [sheet]
@@ -0,0 +1,81 @@
+# test_parallelBatchDriver.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import sys
+
+from SheetProperties.parallelBatchDriver import ParallelBatchDriver
+from SheetProperties.batchResults import BatchResults
+
+# a worker standing for SheetPropertiesBatch.py. the name of the document tells
+# the worker what to do
+WORKER_SCRIPT = '''
+import os, sys, json, time
+args = json.loads(os.environ['SHEET_PROPERTIES_BATCH_ARGS'])
+action, filePath, outputPath = args[0], args[1], args[3]
+if filePath == 'hang.FCStd':
+    time.sleep(30)
+if filePath == 'crash.FCStd':
+    sys.stderr.write('Segmentation fault')
+    sys.exit(3)
+summary = {'Unchanged': 1, 'Set': 2, 'Cleared': 0}
+document = {'File': filePath, 'Status': 'done', 'Reason': ' '.join(args[4:]),
+            'Saved': '--no-save' not in args, 'Changes': [],
+            'Sheets': [{'Sheet': 'Sheet1', 'Status': 'done', 'Reason': '',
+                        'Summary': summary}]}
+with open(outputPath, 'w') as outputFile:
+    json.dump({'Action': action, 'Documents': [document]}, outputFile)
+'''
+
+
+def makeDriver(tmpdir, **options):
+    """Returns a driver running the stand-in worker script with this interpreter"""
+    scriptPath = tmpdir.join('worker.py')
+    scriptPath.write(WORKER_SCRIPT)
+    return ParallelBatchDriver('set', [sys.executable], str(scriptPath), jobs=2, **options)
+
+
+def test_resultsInTheOrderOfTheFiles(tmpdir):
+    driver = makeDriver(tmpdir, save=False, dryRun=True)
+
+    results = driver.run(['a.FCStd', 'b.FCStd'])
+
+    assert [documentResults['File'] for documentResults in results['Documents']] == \
+        ['a.FCStd', 'b.FCStd']
+    # the options are passed to the workers
+    assert [documentResults['Reason'] for documentResults in results['Documents']] == \
+        ['--no-save --dry-run'] * 2
+    assert results['Errors'] == 0
+    assert results['Totals'] == {'Unchanged': 2, 'Set': 4, 'Cleared': 0}
+
+
+def test_workerErrors(tmpdir):
+    driver = makeDriver(tmpdir, timeout=5)
+
+    results = driver.run(['crash.FCStd', 'a.FCStd'])
+
+    crashResults = results['Documents'][0]
+    assert crashResults['Status'] == BatchResults.STATUS_ERROR
+    assert crashResults['Reason'] == \
+        'Worker exited with code 3 without results (Segmentation fault)'
+    assert results['Documents'][1]['Status'] == BatchResults.STATUS_DONE
+    assert results['Errors'] == 1
+
+
+def test_workerTimeout(tmpdir):
+    driver = makeDriver(tmpdir, timeout=0.5)
+
+    results = driver.run(['hang.FCStd'])
+
+    assert results['Documents'] == [{'File': 'hang.FCStd', 'Status': BatchResults.STATUS_ERROR,
+                                     'Reason': 'Timed out after 0.5 seconds', 'Saved': False,
+                                     'Sheets': [], 'Changes': []}]
+    assert results['Totals'] == {'Unchanged': 0, 'Set': 0, 'Cleared': 0}
+
+
+def test_workerNotStarted(tmpdir):
+    driver = ParallelBatchDriver('clear', [str(tmpdir.join('missing'))], 'worker.py')
+
+    results = driver.run(['a.FCStd'])
+
+    assert results['Action'] == 'clear'
+    assert results['Documents'][0]['Reason'].startswith('Failed to start a worker')
@@ -0,0 +1,40 @@
+# test_profilingSheetBackend.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+from SheetProperties.profilingSheetBackend import ProfilingSheetBackend
+from SheetProperties.callProfiler import CallProfiler
+from SheetProperties.sheetsContext import SheetsContext
+
+
+def test_callsAreDelegatedAndRecorded():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias'})
+    profiler = CallProfiler()
+    profilingSheet = ProfilingSheetBackend(sheet, profiler)
+
+    profilingSheet.openTransaction('Set sheet properties')
+    profilingSheet.setAlias('B2', 'length')
+    profilingSheet.commitTransaction()
+
+    assert profilingSheet.Label == 'Sheet'
+    assert profilingSheet.getCacheKey() == sheet.getCacheKey()
+    assert profilingSheet.getContents('A1') == 'Alias'
+    assert profilingSheet.getAlias('B2') == 'length'
+    assert profilingSheet.getCellFromAlias('length') == 'B2'
+    assert sheet.committedTransactions == ['Set sheet properties']
+    otherStats = profiler.stats[CallProfiler.PHASE_OTHER]
+    assert {callName: callStats['Count'] for callName, callStats in otherStats.items()} == \
+        {'sheet.openTransaction': 1, 'sheet.setAlias': 1, 'sheet.commitTransaction': 1,
+         'sheet.getContents': 1, 'sheet.getAlias': 1, 'sheet.getCellFromAlias': 1}
+
+
+def test_contextProfilesTheAnalysisPhases():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias', 'B1': 'Value', 'A2': 'length'})
+    profiler = CallProfiler()
+    context = SheetsContext([sheet], profiler=profiler)
+
+    requestParams = context.sheetToRequestParamsMap[sheet]
+
+    assert isinstance(requestParams.sheetBackend, ProfilingSheetBackend)
+    assert 'sheet.getCellLocations' in profiler.stats[CallProfiler.PHASE_SNAPSHOT]
+    assert 'validateAliasColumn' in profiler.stats[CallProfiler.PHASE_RANGE_DISCOVERY]
@@ -0,0 +1,35 @@
+# test_propertyLayout.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import pytest
+
+from SheetProperties.propertyLayout import PropertyLayout
+
+
+def makeLayout():
+    """Returns a layout of one table with a property of each kind"""
+    layout = PropertyLayout('Sheet1', ['Units', 'Alias'])
+    layout.addTable({'Alias': 'A1', 'Units': 'B1', 'Value': 'C1'}, [{'From': 2, 'To': 3}])
+    layout.addProperties('C2', {'Alias': 'length', 'Units': 'mm'})
+    layout.addProperties('C3', {'Units': 'kg/m^3'})
+    return layout
+
+
+@pytest.mark.parametrize('toFormat, fromFormat', [('toJSON', 'fromJSON'), ('toCSV', 'fromCSV')])
+def test_formatsRoundTrip(toFormat, fromFormat):
+    layout = makeLayout()
+
+    readLayout = getattr(PropertyLayout, fromFormat)(getattr(layout, toFormat)())
+
+    assert readLayout.sheetLabel == layout.sheetLabel
+    assert readLayout.propertyHeaders == layout.propertyHeaders
+    assert readLayout.tables == layout.tables
+    # the empty properties of the CSV format are missing properties
+    assert readLayout.properties == layout.properties
+
+
+def test_csvWithoutFieldsLineIsRejected():
+    content = makeLayout().toCSV().partition('\n')[2]
+
+    with pytest.raises(ValueError):
+        PropertyLayout.fromCSV(content)
@@ -0,0 +1,151 @@
+# test_requestParameters.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+from SheetProperties.sheetsContext import SheetsContext
+
+
+def analyze(cells):
+    """Returns the request parameters of an in-memory sheet of the given cells"""
+    sheet = InMemorySheetBackend('Sheet', cells)
+    return SheetsContext([sheet]).sheetToRequestParamsMap[sheet]
+
+
+def getTablesSummary(requestParams):
+    """Returns the headers locations and the data rows ranges of every table"""
+    return [(table.headersToLocMap, dataRowsRanges)
+            for table, dataRowsRanges in requestParams.getTablesRanges()]
+
+
+def test_singleTable():
+    requestParams = analyze({'A3': 'Alias', 'B3': 'Units', 'C3': 'Value',
+                             'A4': 'length', 'B4': 'mm', 'C4': '10',
+                             'A5': 'width', 'B5': 'mm', 'C5': '20',
+                             'A7': 'height', 'C7': '30'})
+
+    assert requestParams.hasValidHeaders
+    assert requestParams.headersRowNumber == 3
+    assert getTablesSummary(requestParams) == \
+        [({'Alias': 'A3', 'Units': 'B3', 'Value': 'C3'},
+          [{'From': 4, 'To': 5}, {'From': 7, 'To': 7}])]
+
+
+def test_missingMandatoryHeader():
+    requestParams = analyze({'A1': 'Units', 'B1': 'Value', 'A2': 'mm'})
+
+    assert not requestParams.hasValidHeaders
+
+
+def test_headersBeyondTheSearchWindow():
+    cells = {'CX250': 'Alias', 'CY250': 'Value', 'CX251': 'far', 'CX252': 'away'}
+    requestParams = analyze(cells)
+
+    # the cells reported by the sheet are not limited to the search window
+    assert getTablesSummary(requestParams) == \
+        [({'Alias': 'CX250', 'Units': '', 'Value': 'CY250'}, [{'From': 251, 'To': 252}])]
+
+    # otherwise, only the search window is searched
+    sheet = InMemorySheetBackend('Sheet', cells)
+    sheet.reportsCellLocations = False
+    assert not SheetsContext([sheet]).sheetToRequestParamsMap[sheet].hasValidHeaders
+
+
+def test_duplicatedHeader():
+    requestParams = analyze({'A1': 'Alias', 'B1': 'alias', 'C1': 'Value'})
+
+    assert not requestParams.hasValidHeaders
+    assert requestParams.invalidHeadersReason == 'Found a duplicated header: Alias'
+
+
+def test_dataEndsAtEndOfDataHint():
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value', 'A2': 'first'})
+    lastRow = 2 + requestParams.END_DATA_HINT + 1
+    requestParams.sheetBackend.setContents('A{0}'.format(lastRow), 'beyond')
+    requestParams.refresh()
+
+    assert requestParams.dataRowsRanges == [{'From': 2, 'To': 2}]
+
+
+def test_groupDataRowsRanges():
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value'})
+    scannedChunks = [(range(2, 5), [True, False, True]),
+                     (range(5, 8), [True, True, False])]
+
+    assert list(requestParams.iterGroupDataRowsRanges(scannedChunks)) == \
+        [([{'From': 2, 'To': 2}], 5), ([{'From': 4, 'To': 6}], 8)]
+
+    # the range still open at the end of the search range is closed last
+    assert list(requestParams.iterGroupDataRowsRanges([(range(2, 4), [False, True])])) == \
+        [([], 4), ([{'From': 3, 'To': 3}], 4)]
+
+    # no range is open at the end of the search range
+    assert list(requestParams.iterGroupDataRowsRanges([(range(2, 4), [False, False])])) == \
+        [([], 4)]
+
+
+def test_tablesStackedVertically():
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value', 'A2': 'a', 'A3': 'b',
+                             'A6': 'Alias', 'B6': 'Units', 'C6': 'Value',
+                             'A7': 'c', 'B7': 'kg'})
+
+    assert getTablesSummary(requestParams) == \
+        [({'Alias': 'A1', 'Units': '', 'Value': 'B1'}, [{'From': 2, 'To': 3}]),
+         ({'Alias': 'A6', 'Units': 'B6', 'Value': 'C6'}, [{'From': 7, 'To': 7}])]
+
+
+def test_tablesSideBySide():
+    # the Units header of the right table is not given to the left one
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value', 'A2': 'a',
+                             'D1': 'Units', 'E1': 'Alias', 'F1': 'Value',
+                             'D2': 'kg', 'E2': 'b'})
+
+    assert getTablesSummary(requestParams) == \
+        [({'Alias': 'A1', 'Units': '', 'Value': 'B1'}, [{'From': 2, 'To': 2}]),
+         ({'Alias': 'E1', 'Units': 'D1', 'Value': 'F1'}, [{'From': 2, 'To': 2}])]
+
+
+def test_tableWithColumnGap():
+    # a column gap not followed by all the mandatory headers does not start a table
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value', 'D1': 'Units',
+                             'A2': 'a', 'D2': 'mm'})
+
+    assert getTablesSummary(requestParams) == \
+        [({'Alias': 'A1', 'Units': 'D1', 'Value': 'B1'}, [{'From': 2, 'To': 2}])]
+
+
+def test_tablesWithColumnGapStackedVertically():
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value', 'D1': 'Units',
+                             'A2': 'a', 'D2': 'mm',
+                             'A6': 'Alias', 'B6': 'Value', 'D6': 'Units',
+                             'A7': 'b', 'D7': 'kg'})
+
+    assert getTablesSummary(requestParams) == \
+        [({'Alias': 'A1', 'Units': 'D1', 'Value': 'B1'}, [{'From': 2, 'To': 2}]),
+         ({'Alias': 'A6', 'Units': 'D6', 'Value': 'B6'}, [{'From': 7, 'To': 7}])]
+
+
+def test_headerNameInDataIsNotATable():
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value', 'A2': 'Value', 'A3': 'b',
+                             'D1': 'Alias', 'E1': 'Value', 'D2': 'c'})
+
+    assert requestParams.hasValidHeaders
+    assert [table.headersRowNumber for table, dataRowsRanges
+            in requestParams.getTablesRanges()] == [1, 1]
+    assert requestParams.dataRowsRanges == [{'From': 2, 'To': 3}]
+
+
+def test_refreshReinspectsChangedRows():
+    requestParams = analyze({'A1': 'Alias', 'B1': 'Value', 'A2': 'a', 'A4': 'b'})
+    sheet = requestParams.sheetBackend
+    assert requestParams.dataRowsRanges == [{'From': 2, 'To': 2}, {'From': 4, 'To': 4}]
+
+    assert not requestParams.refresh()
+
+    sheet.setContents('A3', 'c')
+    assert requestParams.refresh()
+    assert requestParams.dataRowsRanges == [{'From': 2, 'To': 4}]
+
+    # a changed header name searches the headers again
+    sheet.setContents('B1', 'Values')
+    assert requestParams.refresh()
+    assert not requestParams.hasValidHeaders
@@ -0,0 +1,266 @@
+# test_sheetPropertiesActions.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import pytest
+
+from SheetProperties.utils import Utils
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+from SheetProperties.sheetsContext import SheetsContext
+from SheetProperties.sheetPropertiesActions import SheetPropertiesActions
+from SheetProperties.propertyLayout import PropertyLayout
+from SheetProperties.preconditionError import PreconditionError
+from SheetProperties.changePlan import ChangePlan
+
+TABLE_CELLS = {'A1': 'Alias', 'B1': 'Units', 'C1': 'Value',
+               'A2': 'length', 'B2': 'mm', 'C2': '10',
+               'A3': 'A1', 'B3': 'kg / m^3', 'C3': '20',
+               'A5': 'width', 'B5': 'm;s', 'C5': '30'}
+ALIAS_CELLS = {'A1': 'Alias', 'B1': 'Value', 'A2': 'length', 'A3': 'width'}
+
+
+def getActions(cells):
+    """Returns the sheet and the actions on the sheet of a new context of the given cells"""
+    sheet = InMemorySheetBackend('Sheet1', cells)
+    requestParams = SheetsContext([sheet]).sheetToRequestParamsMap[sheet]
+    return sheet, SheetPropertiesActions(requestParams)
+
+
+def setTables(context, sheet, diffMode=True):
+    """Sets the properties of all the tables of a sheet and returns the summary"""
+    requestParams = context.sheetToRequestParamsMap[sheet]
+    actions = SheetPropertiesActions(requestParams, diffMode)
+    return actions.readAndSetTables(requestParams.getTablesRanges())
+
+
+def test_setProperties():
+    sheet = InMemorySheetBackend('Sheet', TABLE_CELLS)
+    context = SheetsContext([sheet])
+
+    summary = setTables(context, sheet)
+
+    # the invalid alias and units are ignored, the valid units are normalized
+    assert sheet.aliases == {'C2': 'length', 'C5': 'width'}
+    assert sheet.displayUnits == {'C2': 'mm', 'C3': 'kg/m^3'}
+    assert summary == {'Unchanged': 0, 'Set': 4, 'Cleared': 0}
+    assert sheet.committedTransactions == ['Set sheet properties']
+    assert sheet.recomputeCount == 1
+
+
+def test_diffModeSkipsUnchangedProperties():
+    sheet = InMemorySheetBackend('Sheet', TABLE_CELLS)
+    context = SheetsContext([sheet])
+    setTables(context, sheet)
+    setAliasCalls = sheet.callCounts['setAlias']
+
+    summary = setTables(context, sheet)
+
+    assert summary == {'Unchanged': 4, 'Set': 0, 'Cleared': 0}
+    assert sheet.callCounts['setAlias'] == setAliasCalls
+    # nothing to write: neither a transaction nor a recompute
+    assert sheet.committedTransactions == ['Set sheet properties']
+    assert sheet.recomputeCount == 1
+
+
+def test_withoutDiffModeAllPropertiesAreWritten():
+    sheet = InMemorySheetBackend('Sheet', TABLE_CELLS)
+    context = SheetsContext([sheet])
+    setTables(context, sheet, diffMode=False)
+
+    summary = setTables(context, sheet, diffMode=False)
+
+    assert summary == {'Unchanged': 0, 'Set': 4, 'Cleared': 0}
+
+
+def test_clearPropertiesIncludingGapRows():
+    sheet = InMemorySheetBackend('Sheet', TABLE_CELLS)
+    context = SheetsContext([sheet])
+    setTables(context, sheet)
+    sheet.aliases['C4'] = 'stale'
+    requestParams = context.sheetToRequestParamsMap[sheet]
+
+    summary = SheetPropertiesActions(requestParams).clearTables(requestParams.getTablesRanges())
+
+    assert sheet.aliases == {}
+    assert sheet.displayUnits == {}
+    assert summary == {'Unchanged': 3, 'Set': 0, 'Cleared': 5}
+
+
+def test_planDoesNotChangeTheSheet():
+    sheet, actions = getActions(TABLE_CELLS)
+
+    changePlan = actions.planReadAndSetTables(actions.requestParams.getTablesRanges(),
+                                              ChangePlan('model.FCStd'))
+
+    assert sheet.aliases == {} and sheet.displayUnits == {}
+    assert changePlan.getSummary() == {ChangePlan.CHANGE_SET: 4, ChangePlan.CHANGE_CLEARED: 0,
+                                       ChangePlan.CHANGE_UNCHANGED: 0,
+                                       ChangePlan.CHANGE_IGNORED: 2}
+    assert {change['File'] for change in changePlan.changes} == {'model.FCStd'}
+
+    # the preview of the form plans the same changes one chunk at a time
+    steps = actions.iterPlanReadAndSetTables(actions.requestParams.getTablesRanges())
+    assert Utils.runSteps(steps).changes == \
+        [dict(change, File='') for change in changePlan.changes]
+
+
+def test_writesAreMarkedAsOwnWrites():
+    sheet = InMemorySheetBackend('Sheet', TABLE_CELLS)
+    context = SheetsContext([sheet])
+    writesMarks = []
+    setAlias = sheet.setAlias
+
+    def recordingSetAlias(cellLoc, alias):
+        writesMarks.append(context.isApplyingWrites())
+        setAlias(cellLoc, alias)
+
+    sheet.setAlias = recordingSetAlias
+    setTables(context, sheet)
+
+    assert writesMarks == [True, True]
+    assert not context.isApplyingWrites()
+
+
+def test_failedWriteRollsBackTheWrites():
+    sheet = InMemorySheetBackend('Sheet', TABLE_CELLS)
+    context = SheetsContext([sheet])
+
+    setAlias = sheet.setAlias
+
+    def failingSetAlias(cellLoc, alias):
+        if alias == 'width':
+            raise ValueError('Invalid alias: ' + alias)
+        setAlias(cellLoc, alias)
+
+    sheet.setAlias = failingSetAlias
+
+    with pytest.raises(ValueError):
+        setTables(context, sheet)
+
+    # the properties written before the failure are rolled back, and nothing is recomputed
+    assert sheet.callCounts['setAlias'] == 1
+    assert sheet.aliases == {}
+    assert sheet.displayUnits == {}
+    assert sheet.callCounts['abortTransaction'] == 1
+    assert sheet.committedTransactions == []
+    assert sheet.recomputeCount == 0
+    assert not context.isApplyingWrites()
+
+
+def test_cancelledActionRollsBackTheWrites():
+    sheet, actions = getActions(TABLE_CELLS)
+    actions.CHUNK_CELLS = 1
+    task = actions.iterReadAndSetTables(actions.requestParams.getTablesRanges())
+
+    # cancelled while inspecting the target cells: nothing was written
+    next(task)
+    task.close()
+    assert 'openTransaction' not in sheet.callCounts
+
+    # cancelled while writing: the writes applied so far are rolled back
+    task = actions.iterReadAndSetTables(actions.requestParams.getTablesRanges())
+    while sheet.callCounts.get('setDisplayUnit', 0) < 1:
+        next(task)
+    task.close()
+    assert sheet.aliases == {} and sheet.displayUnits == {}
+    assert sheet.callCounts['abortTransaction'] == 1
+    assert sheet.committedTransactions == []
+    assert sheet.recomputeCount == 0
+
+
+def test_sameAliasInDifferentSheets():
+    sheets = [InMemorySheetBackend('Sheet1', ALIAS_CELLS),
+              InMemorySheetBackend('Sheet2', ALIAS_CELLS)]
+    context = SheetsContext(sheets)
+    for sheet in sheets:
+        setTables(context, sheet)
+
+    assert [sheet.aliases for sheet in sheets] == [{'B2': 'length', 'B3': 'width'}] * 2
+
+
+def test_sameAliasInTheSameSheetIsIgnored():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias', 'B1': 'Value', 'A2': 'length',
+                                           'A3': 'length', 'A4': 'width'})
+    context = SheetsContext([sheet])
+
+    setTables(context, sheet)
+
+    assert sheet.aliases == {'B4': 'width'}
+    assert context.aliasIndex.getConflicts('Sheet') == \
+        {'length': ['Sheet.B2', 'Sheet.B3']}
+
+
+def test_staleAliasIsClearedBeforeSet():
+    # the aliases of moved rows are still set on their former target cells
+    sheet = InMemorySheetBackend('Sheet', ALIAS_CELLS)
+    sheet.aliases.update({'B3': 'length', 'D9': 'width'})
+    context = SheetsContext([sheet])
+
+    summary = setTables(context, sheet)
+
+    assert sheet.aliases == {'B2': 'length', 'B3': 'width'}
+    assert summary == {'Unchanged': 0, 'Set': 2, 'Cleared': 2}
+    assert sheet.committedTransactions == ['Set sheet properties']
+
+
+def test_staleAliasInPlan():
+    sheet = InMemorySheetBackend('Sheet', ALIAS_CELLS)
+    sheet.aliases['D9'] = 'length'
+    context = SheetsContext([sheet])
+    requestParams = context.sheetToRequestParamsMap[sheet]
+
+    changePlan = SheetPropertiesActions(requestParams).planReadAndSetTables(
+        requestParams.getTablesRanges())
+
+    assert [(change['Cell'], change['Change']) for change in changePlan.changes] == \
+        [('B2', 'Set'), ('D9', 'Cleared'), ('B3', 'Set')]
+    assert sheet.aliases == {'D9': 'length'}
+
+
+def test_layoutRoundTrip(tmpdir):
+    sheet, actions = getActions(TABLE_CELLS)
+    layout = actions.exportLayout(actions.requestParams.getTablesRanges())
+    assert layout.properties == [{'Cell': 'C2', 'Alias': 'length', 'Units': 'mm'},
+                                 {'Cell': 'C3', 'Units': 'kg/m^3'},
+                                 {'Cell': 'C5', 'Alias': 'width'}]
+
+    for fileName in ['Sheet1.layout.json', 'Sheet1.layout.csv']:
+        filePath = str(tmpdir.join(fileName))
+        layout.write(filePath)
+        readLayout = PropertyLayout.read(filePath)
+        assert readLayout.properties == layout.properties
+        assert readLayout.tables == layout.tables
+
+    # a fresh sheet of the same content gets the same properties from the layout
+    sheet, actions = getActions(TABLE_CELLS)
+    actions.applyLayout(readLayout)
+    assert sheet.aliases == {'C2': 'length', 'C5': 'width'}
+    assert sheet.displayUnits == {'C2': 'mm', 'C3': 'kg/m^3'}
+
+
+def test_layoutValuesAreValidated():
+    sheet, actions = getActions(TABLE_CELLS)
+    layout = PropertyLayout('Sheet1', ['Units', 'Alias'],
+                            properties=[{'Cell': 'C2', 'Alias': 'A1', 'Units': 'm;s'},
+                                        {'Cell': 'C3', 'Alias': 'twice'},
+                                        {'Cell': 'C4', 'Alias': 'twice'},
+                                        {'Cell': 'C5', 'Alias': 'width', 'Units': 'mm'}])
+
+    summary = actions.applyLayout(layout)
+
+    assert sheet.aliases == {'C5': 'width'}
+    assert sheet.displayUnits == {'C5': 'mm'}
+    assert summary == {'Unchanged': 0, 'Set': 2, 'Cleared': 0}
+
+
+def test_layoutOfAnotherSheetIsRejected():
+    _, actions = getActions(TABLE_CELLS)
+    layout = actions.exportLayout(actions.requestParams.getTablesRanges())
+    layout.sheetLabel = 'Other'
+
+    with pytest.raises(PreconditionError):
+        actions.applyLayout(layout)
+
+    layout.sheetLabel = 'Sheet1'
+    layout.tables[0]['headersToLocMap']['Units'] = 'B2'
+    with pytest.raises(PreconditionError):
+        actions.applyLayout(layout)
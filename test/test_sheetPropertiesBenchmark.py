@@ -0,0 +1,60 @@
+# test_sheetPropertiesBenchmark.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import os
+import importlib.util
+
+# the benchmark is a script, not a module of the package
+BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmark',
+                              'sheetPropertiesBenchmark.py')
+benchmarkSpec = importlib.util.spec_from_file_location('sheetPropertiesBenchmark',
+                                                       BENCHMARK_PATH)
+benchmark = importlib.util.module_from_spec(benchmarkSpec)
+benchmarkSpec.loader.exec_module(benchmark)
+
+
+def makeResults(seconds, calls, rows=100):
+    """Returns the results of a single shape and phase"""
+    return {'Rows': rows,
+            'Shapes': {'sparse': {'Set': {'Seconds': seconds, 'Calls': calls,
+                                          'PeakBytes': 0}}}}
+
+
+def test_noRegression():
+    baseline = makeResults(1.0, {'getContents': 10})
+
+    # within the tolerance, and fewer calls
+    assert benchmark.compareResults(makeResults(1.2, {'getContents': 5}), baseline, 0.25) == []
+
+
+def test_regressions():
+    baseline = makeResults(1.0, {'getContents': 10})
+
+    regressions = benchmark.compareResults(
+        makeResults(1.5, {'getContents': 11, 'setAlias': 1}), baseline, 0.25)
+
+    assert regressions == ['sparse/Set: 1.5000s instead of 1.0000s',
+                           'sparse/Set: 11 getContents() calls instead of 10',
+                           'sparse/Set: 1 setAlias() calls instead of 0']
+
+
+def test_baselineOfAnotherSize():
+    baseline = makeResults(1.0, {}, rows=200)
+
+    assert benchmark.compareResults(makeResults(1.0, {}), baseline, 0.25) == \
+        ['Baseline was measured with 200 rows, not 100']
+
+
+def test_shapesAndPhasesMissingFromTheBaselineAreIgnored():
+    baseline = {'Rows': 100, 'Shapes': {'sparse': {}}}
+    results = makeResults(1.0, {'getContents': 1})
+    results['Shapes']['wide'] = results['Shapes']['sparse']
+
+    assert benchmark.compareResults(results, baseline, 0.25) == []
+
+
+def test_runShape():
+    results = benchmark.runShape('multiTables', 20, 1)
+
+    assert sorted(results) == sorted(benchmark.PHASES)
+    assert all(phaseResults['Seconds'] is not None for phaseResults in results.values())
@@ -0,0 +1,77 @@
+# test_sheetSnapshot.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.inMemorySheetBackend import InMemorySheetBackend
+from SheetProperties.sheetSnapshot import SheetSnapshot
+
+
+def takeSnapshot(cells, maxSearchRow=100, maxSearchCol=10):
+    """Returns a snapshot of an in-memory sheet of the given cells"""
+    return SheetSnapshot(InMemorySheetBackend('Sheet', cells), maxSearchRow, maxSearchCol)
+
+
+def test_locate():
+    snapshot = takeSnapshot({'C2': 'Alias', 'A1': 'Value', 'B1': 'alias', 'A3': 'Units'})
+
+    # case insensitive, in row-major order
+    assert snapshot.locate('ALIAS') == [(1, 2), (2, 3)]
+    assert snapshot.locate('Value') == [(1, 1)]
+    assert snapshot.locate('Cell') == []
+
+
+def test_readsOnlyTheReportedCells():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias', 'ZZ500': 'far'})
+
+    snapshot = SheetSnapshot(sheet, 100, 10)
+
+    # the search window is not used when the sheet reports its non-empty cells
+    assert snapshot.getContents(500, 702) == 'far'
+    assert (snapshot.maxRow, snapshot.maxCol) == (500, 702)
+    assert sheet.callCounts['getContents'] == 2
+
+
+def test_fallbackWindowWhenCellsAreNotReported():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias', 'C4': 'in', 'D4': 'out', 'A6': 'out'})
+    sheet.reportsCellLocations = False
+
+    snapshot = SheetSnapshot(sheet, 5, 3)
+
+    assert list(snapshot.iterCells()) == [(1, 1, 'Alias'), (4, 3, 'in')]
+    assert sheet.callCounts['getContents'] == 5 * 3
+
+
+def test_changedCellsInFallbackWindow():
+    sheet = InMemorySheetBackend('Sheet', {'A1': 'Alias', 'B2': 'mm', 'C3': 'kept'})
+    sheet.reportsCellLocations = False
+    snapshot = SheetSnapshot(sheet, 5, 3)
+
+    sheet.setContents('B2', '')
+    sheet.setContents('A4', 'added')
+    sheet.setContents('C3', 'changed')
+    # out of the window, the change is not seen
+    sheet.setContents('D1', 'out')
+    newSnapshot = SheetSnapshot(sheet, 5, 3)
+
+    assert snapshot.getChangedCells(newSnapshot) == {(2, 2), (4, 1), (3, 3)}
+    assert newSnapshot.getChangedCells(snapshot) == {(2, 2), (4, 1), (3, 3)}
+    assert snapshot.fingerprint() != newSnapshot.fingerprint()
+
+
+def test_fingerprint():
+    cells = {'A1': 'Alias', 'B1': 'Value', 'A2': 'length'}
+    snapshot = takeSnapshot(cells)
+
+    assert takeSnapshot(dict(reversed(list(cells.items())))).fingerprint() == \
+        snapshot.fingerprint()
+    assert takeSnapshot(dict(cells, A2='width')).fingerprint() != snapshot.fingerprint()
+    assert snapshot.getChangedCells(takeSnapshot(cells)) == set()
+
+
+def test_deferredRead():
+    sheet = InMemorySheetBackend('Sheet', {'A{0}'.format(row): str(row) for row in range(1, 6)})
+    snapshot = SheetSnapshot(sheet, 100, 10, deferRead=True)
+    snapshot.CHUNK_CELLS = 2
+    assert snapshot.maxRow == 0
+
+    assert list(snapshot.iterReadCells()) == [(2, 5), (4, 5)]
+    assert snapshot.getColumnContents(1, 4, 8) == ['4', '5', '', '']
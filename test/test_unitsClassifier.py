@@ -0,0 +1,40 @@
+# test_unitsClassifier.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+import pytest
+
+from SheetProperties.unitsClassifier import UnitsClassifier
+
+
+@pytest.mark.parametrize('units, normalizedUnits', [('10', '10'), (' mm ', 'mm'),
+                                                    ('10 mm', '10 mm'),
+                                                    ('kg / m^3', 'kg/m^3'),
+                                                    ('9.81 m/s^2', '9.81 m/s^2')])
+def test_validUnits(units, normalizedUnits):
+    assert UnitsClassifier.classify(units) == (UnitsClassifier.VALID, normalizedUnits)
+
+
+@pytest.mark.parametrize('units', ['10 mm!', 'm;s', 'kg{m}'])
+def test_invalidCharacters(units):
+    assert UnitsClassifier.classify(units)[0] == UnitsClassifier.INVALID
+
+
+@pytest.mark.parametrize('units', ['pi', 'e', '2 pi', 'mm*e', 'bogus/pi'])
+def test_constantsAreNotUnits(units):
+    assert UnitsClassifier.classify(units)[0] == UnitsClassifier.INVALID
+
+
+@pytest.mark.parametrize('units', ['', 'bogus', '10 xx', '1 m 20 cm', '(m)'])
+def test_ambiguousUnits(units):
+    # the units the grammar cannot decide, unknown names included, are left to FreeCAD
+    assert UnitsClassifier.classify(units)[0] == UnitsClassifier.AMBIGUOUS
+
+
+def test_normalize():
+    assert UnitsClassifier.normalize(' 9.81  m / s^2 ') == '9.81 m/s^2'
+
+
+def test_classifyColumn():
+    unitsList = ['mm', 'bogus', 'm;s', 'pi']
+    assert UnitsClassifier.classifyColumn(unitsList) == \
+        [UnitsClassifier.classify(units) for units in unitsList]
@@ -0,0 +1,49 @@
+# test_validationCache.py
+# LGPL license; Copyright (C) 2018 Uri Benchetrit
+
+from SheetProperties.validationCache import ValidationCache
+
+
+class RecordingValidation:
+    """Column validation recording the contents it is called with"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, contents):
+        self.calls.append(list(contents))
+        return [content.upper() if content != 'bad' else None for content in contents]
+
+
+def test_hitsAndMisses():
+    validationCache = ValidationCache()
+    validation = RecordingValidation()
+
+    assert validationCache.validateColumn('Alias', ['a', 'bad'], validation) == \
+        {'a': 'A', 'bad': None}
+    assert validationCache.validateColumn('Alias', ['a', 'b', 'bad'], validation) == \
+        {'a': 'A', 'b': 'B', 'bad': None}
+    # the same content of another header is another result
+    validationCache.validateColumn('Units', ['a'], validation)
+
+    assert validation.calls == [['a', 'bad'], ['b'], ['a']]
+    assert (validationCache.hits, validationCache.misses) == (2, 4)
+
+    validationCache.clear()
+    assert (validationCache.hits, validationCache.misses) == (0, 0)
+    assert len(validationCache.results) == 0
+
+
+def test_leastRecentlyUsedResultsAreEvicted():
+    validationCache = ValidationCache(maxEntries=2)
+    validation = RecordingValidation()
+    validationCache.validateColumn('Alias', ['a'], validation)
+    validationCache.validateColumn('Alias', ['b'], validation)
+
+    # using 'a' again makes 'b' the least recently used result
+    validationCache.validateColumn('Alias', ['a'], validation)
+    validationCache.validateColumn('Alias', ['c'], validation)
+
+    assert list(validationCache.results) == [('Alias', 'a'), ('Alias', 'c')]
+    validationCache.validateColumn('Alias', ['b'], validation)
+    assert validation.calls == [['a'], ['b'], ['c'], ['b']]